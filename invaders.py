@@ -4,9 +4,24 @@
 # ahuynh86@csu.fullerton.edu
 # Project
 
+import argparse
 import sys
 import game
+import replay
 
-if __name__ == "__main__":
-    sys.exit(game.MyVideoGame().run())
 
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description='Space Invaders')
+    parser.add_argument('--seed', type=replay.seed_argument, default=None,
+                        help='seed for every random number generator, '
+                             f'from 0 to {replay.MAX_SEED}')
+    parser.add_argument('--record', default=None,
+                        help='record the session to this file for replay.py')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    recorder = replay.Recorder(args.record) if args.record else None
+    sys.exit(game.MyVideoGame(seed=args.seed, recorder=recorder).run())
@@ -1,43 +1,63 @@
 """Demonstrate how to use sprite sheets to perform some simple animations in PyGame."""
 
-import os.path
 import pygame
+import atlas
 
 # Adapted aliens.py in pygame/examples
 # https://github.com/pygame/pygame/blob/main/examples/aliens.py
 class Explosion(pygame.sprite.Sprite):
     """Play an explosion sprite."""
 
-    main_dir = os.path.split(os.path.abspath(__file__))[0]
-    data_dir = os.path.join(main_dir, 'data')
-    image_path = os.path.join(data_dir, 'sun1.bmp')
-
     defaultlife = 12
     animcycle = 3
     images = []
 
-    def __init__(self, actor):
-        # super() leads to the wrong place?
-        # super().__init__(self, self.containers)
-        pygame.sprite.Sprite.__init__(self, self.containers)
-        try:
-            surface = pygame.image.load(Explosion.image_path)
-        except pygame.error as pygame_error:
-            raise SystemExit(
-                f'Could not load image "{Explosion.image_path}" {pygame.get_error()}'
-            ) from pygame_error
-        img = surface.convert()
+    def __init__(self, actor=None, pool=None):
+        """Start an explosion on actor, or build an idle one for pool.
+
+        An explosion built with an actor joins Explosion.containers and is
+        killed when it ends; one built for a SpritePool is started with
+        reset() and handed back to the pool instead.
+        """
+        pygame.sprite.Sprite.__init__(self)
         if not Explosion.images:
-            Explosion.images = [img, pygame.transform.flip(img, 1, 1)]
+            Explosion.load_images()
+        self.image = self.images[0]
+        self.rect = self.image.get_rect()
+        self.life = 0
+        self._actor = None
+        self._pool = pool
+        if actor is not None:
+            self.add(self.containers)
+            self.reset(actor)
+
+    def reset(self, actor):
+        """Restart the animation centered on actor."""
+        if self._actor is not None:
+            self._actor.is_exploding = False
         self.image = self.images[0]
-        self.rect = self.image.get_rect(center=actor.rect.center)
+        self.rect.center = actor.rect.center
         self.life = Explosion.defaultlife
         self._actor = actor
 
+    @classmethod
+    def load_images(cls):
+        """Decode the explosion frames once for every explosion."""
+        try:
+            cls.images = [atlas.image('sun1'), atlas.image('sun1.flipped')]
+        except pygame.error as pygame_error:
+            raise SystemExit(
+                f'Could not load the explosion images {pygame.get_error()}'
+            ) from pygame_error
+
     def update(self):
         """Update the animation."""
         self.life = self.life - 1
         self.image = self.images[self.life // Explosion.animcycle % 2]
         if self.life <= 0:
-            self.kill()
             self._actor.is_exploding = False
+            self._actor = None
+            if self._pool is not None:
+                self._pool.release(self)
+            else:
+                self.kill()
@@ -1,6 +1,10 @@
 """Assests for the scenes."""
 
+import collections
+import concurrent.futures
 import os
+import threading
+import pygame
 
 main_dir = os.path.split(os.path.abspath(__file__))[0]
 data_dir = os.path.join(main_dir, "data")
@@ -17,6 +21,21 @@ asset_dict = {
     'fire': 'Fueguito_magia_copia.png'
 }
 
+image_extensions = ('.png', '.bmp', '.gif', '.jpg', '.jpeg')
+
+# Music tracks; audio.AudioManager decodes them when a scene needs one,
+# rather than the Preloader at start-up.
+music_keys = ('soundtrack', 'music-grid', 'music-grid.BJ', 'goofy_ahh')
+
+# Decoded assets keyed by (kind, asset, ...), least recently used first.
+_cache = collections.OrderedDict()
+_cache_sizes = {}
+_cache_bytes = 0
+_budget = 64 * 1024 * 1024
+
+# Background decodes not yet handed to the cache, keyed by (kind, asset).
+_pending = {}
+
 
 def get(key):
     """Gets needed sound from asset_dict"""
@@ -24,4 +43,296 @@ def get(key):
     assert value
     if value:
         value = os.path.join(data_dir, value)
-    return value
\ No newline at end of file
+    return value
+
+
+def is_image(key):
+    """Return True if the asset is an image."""
+    return asset_dict[key].lower().endswith(image_extensions)
+
+
+def is_music(key):
+    """Return True if the asset is a streamed music track."""
+    return key in music_keys
+
+
+def set_budget(max_bytes):
+    """Set how many bytes of decoded assets the cache may hold."""
+    global _budget
+    _budget = max_bytes
+    _evict()
+
+
+def cache_info():
+    """Return the number of cached assets, their size and the budget."""
+    return {'entries': len(_cache), 'bytes': _cache_bytes, 'budget': _budget}
+
+
+def clear_cache():
+    """Drop every decoded asset."""
+    global _cache_bytes
+    _cache.clear()
+    _cache_sizes.clear()
+    _cache_bytes = 0
+
+
+def _evict(keep=None):
+    """Drop least recently used assets until the cache fits the budget."""
+    global _cache_bytes
+    for key in list(_cache):
+        if _cache_bytes <= _budget:
+            break
+        if key == keep:
+            continue
+        del _cache[key]
+        _cache_bytes -= _cache_sizes.pop(key)
+
+
+def _lookup(key):
+    """Return a cached asset and mark it as recently used, or None."""
+    value = _cache.get(key)
+    if value is not None:
+        _cache.move_to_end(key)
+    return value
+
+
+def _store(key, value, size):
+    """Add a decoded asset to the cache."""
+    global _cache_bytes
+    _cache[key] = value
+    _cache_sizes[key] = size
+    _cache_bytes += size
+    _evict(keep=key)
+    return value
+
+
+def _surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+def _sound_bytes(sound):
+    mixer_info = pygame.mixer.get_init()
+    if not mixer_info:
+        return len(sound.get_raw())
+    (frequency, size, channels) = mixer_info
+    return int(sound.get_length() * frequency) * (abs(size) // 8) * channels
+
+
+def _take_pending(cache_key):
+    """Return the result of a background decode, or None if there is none."""
+    future = _pending.pop(cache_key, None)
+    if future is None:
+        return None
+    return future.result()
+
+
+# Adapted from the pygame examples
+def _decode_image(key, colorkey=None, scale=1):
+    image = _take_pending(('image', key))
+    if image is None:
+        image = pygame.image.load(get(key))
+    return _prepare_image(image, colorkey, scale)
+
+
+def _prepare_image(image, colorkey=None, scale=1):
+    """Convert a decoded image to the display format, then scale and
+    colorkey it; the decoded image is left unchanged."""
+    image = image.convert()
+
+    if scale != 1:
+        size = image.get_size()
+        size = (int(size[0] * scale), int(size[1] * scale))
+        image = pygame.transform.scale(image, size)
+
+    if colorkey is not None:
+        if colorkey == -1:
+            colorkey = image.get_at((0, 0))
+        image.set_colorkey(colorkey, pygame.RLEACCEL)
+    return image
+
+
+def load_image(key, scale=1, colorkey=None):
+    """Return the display format surface for an image asset.
+
+    The image is decoded once; later calls with the same scale and
+    colorkey return the cached surface, which must not be modified.
+    """
+    cache_key = ('image', key, scale, colorkey)
+    image = _lookup(cache_key)
+    if image is None:
+        image = _decode_image(key, colorkey, scale)
+        _store(cache_key, image, _surface_bytes(image))
+    return image
+
+
+def take_image(key, scale=1, colorkey=None):
+    """Return a display format surface for an image asset that is not
+    kept in the cache, for images copied elsewhere such as into an atlas.
+
+    A copy already in the cache is removed from it and returned.
+    """
+    global _cache_bytes
+    cache_key = ('image', key, scale, colorkey)
+    image = _cache.pop(cache_key, None)
+    if image is not None:
+        _cache_bytes -= _cache_sizes.pop(cache_key)
+        return image
+    return _decode_image(key, colorkey, scale)
+
+
+def cached_sound(key):
+    """Return the cached Sound for an audio asset, or None if it is not
+    cached; nothing is decoded."""
+    return _lookup(('sound', key))
+
+
+def store_sound(key, sound):
+    """Add a Sound decoded elsewhere, such as on a background thread, to
+    the cache, counting it against the budget."""
+    return _store(('sound', key), sound, _sound_bytes(sound))
+
+
+def load_sound(key):
+    """Return the decoded Sound for an audio asset, decoding it once."""
+    cache_key = ('sound', key)
+    sound = _lookup(cache_key)
+    if sound is None:
+        sound = _take_pending(cache_key)
+        if sound is None:
+            sound = pygame.mixer.Sound(get(key))
+        _store(cache_key, sound, _sound_bytes(sound))
+    return sound
+
+
+def cache_key(entry):
+    """Return the cache key of a preload() entry."""
+    if isinstance(entry, tuple):
+        return ('image',) + entry
+    if is_image(entry):
+        return ('image', entry, 1, None)
+    return ('sound', entry)
+
+
+def preload(entries):
+    """Decode a list of assets ahead of time.
+
+    Each entry is an asset key, or for images a (key, scale, colorkey)
+    tuple matching a later load_image call.
+    """
+    for entry in entries:
+        key = entry[0] if isinstance(entry, tuple) else entry
+        if ('image', key) in _pending or ('sound', key) in _pending:
+            # Being decoded in the background; resolved on first use.
+            continue
+        if isinstance(entry, tuple):
+            load_image(*entry)
+        elif is_image(entry):
+            load_image(entry)
+        else:
+            load_sound(entry)
+
+
+class Preloader:
+    """Decode assets on a thread pool ahead of their first use.
+
+    Entries are given as for preload(). Each asset is decoded once by a
+    worker thread, since pygame's decoders release the GIL for much of
+    their work, and every variant listed for it is then converted to the
+    display format on the main thread, either by poll() or by the first
+    load_image() call that needs it.
+    """
+
+    def __init__(self, entries=None, max_workers=None):
+        if entries is None:
+            entries = [key for key in asset_dict if not is_music(key)]
+        # Cache keys of the variants wanted, by asset key.
+        self._variants = {}
+        for entry in entries:
+            key = cache_key(entry)
+            variants = self._variants.setdefault(key[1], [])
+            if key not in variants:
+                variants.append(key)
+        self._max_workers = max_workers
+        self._executor = None
+        self._futures = {}
+        self._failed = {}
+        self._completed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total(self):
+        """Return the number of assets to decode."""
+        return len(self._variants)
+
+    @property
+    def completed(self):
+        """Return the number of assets decoded so far."""
+        with self._lock:
+            return self._completed
+
+    @property
+    def progress(self):
+        """Return the fraction of assets decoded, from 0.0 to 1.0."""
+        if not self._variants:
+            return 1.0
+        return self.completed / len(self._variants)
+
+    @property
+    def failed(self):
+        """Return the assets that could not be decoded and why."""
+        return self._failed
+
+    def _finished(self, future):
+        with self._lock:
+            self._completed += 1
+
+    def start(self):
+        """Begin decoding in the background."""
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            self._max_workers, thread_name_prefix='preload')
+        for key in self._variants:
+            if is_image(key):
+                pending_key = ('image', key)
+                decode = pygame.image.load
+            else:
+                pending_key = ('sound', key)
+                decode = pygame.mixer.Sound
+            future = self._executor.submit(decode, get(key))
+            future.add_done_callback(self._finished)
+            self._futures[key] = future
+            _pending[pending_key] = future
+        self._executor.shutdown(wait=False)
+
+    def poll(self):
+        """Move finished decodes into the cache; return the progress."""
+        for (key, future) in list(self._futures.items()):
+            if not future.done():
+                continue
+            del self._futures[key]
+            kind = 'image' if is_image(key) else 'sound'
+            if _pending.get((kind, key)) is not future:
+                # Already taken by a load_image() or load_sound() call.
+                continue
+            del _pending[(kind, key)]
+            try:
+                decoded = future.result()
+                for variant in self._variants[key]:
+                    if variant in _cache:
+                        continue
+                    if kind == 'image':
+                        image = _prepare_image(decoded, variant[3], variant[2])
+                        _store(variant, image, _surface_bytes(image))
+                    else:
+                        _store(variant, decoded, _sound_bytes(decoded))
+            except (pygame.error, OSError) as error:
+                self._failed[key] = error
+        return self.progress
+
+    def is_done(self):
+        """Return True once every asset has been decoded and cached."""
+        return not self._futures and self.completed == self.total
+
+    def wait(self):
+        """Block until every asset is decoded and cached."""
+        concurrent.futures.wait(list(self._futures.values()))
+        self.poll()
@@ -0,0 +1,148 @@
+"""Pack sprite images into a few shared sheets."""
+
+import pygame
+import assets
+
+# (name, asset, scale, colorkey, flip_x, flip_y) for every packed image;
+# only images that are drawn belong here.
+SPRITES = (
+    ('dragon', 'dragon', 1, -1, False, False),
+    ('sun1', 'sun1', 1, None, False, False),
+    ('sun1.flipped', 'sun1', 1, None, True, True),
+)
+
+_default = None
+
+
+def shelf_pack(sizes, sheet_size, padding=1):
+    """Assign each (width, height) a sheet number and position.
+
+    Images are placed left to right on shelves as tall as their tallest
+    image, tallest images first. An image too big for a sheet gets a sheet
+    of its own. Returns the placements in the order of sizes, and the size
+    each sheet actually needs.
+    """
+    (sheet_width, sheet_height) = sheet_size
+    order = sorted(range(len(sizes)), key=lambda index: -sizes[index][1])
+    placements = [None] * len(sizes)
+    sheets = []
+    (x, y, shelf_height) = (0, 0, 0)
+    current = None
+    for index in order:
+        (width, height) = sizes[index]
+        if width > sheet_width or height > sheet_height:
+            placements[index] = (len(sheets), 0, 0)
+            sheets.append([width, height])
+            continue
+        if current is not None and x + width > sheet_width:
+            (x, y, shelf_height) = (0, y + shelf_height + padding, 0)
+        if current is None or y + height > sheet_height:
+            current = len(sheets)
+            sheets.append([0, 0])
+            (x, y, shelf_height) = (0, 0, 0)
+        placements[index] = (current, x, y)
+        sheets[current][0] = max(sheets[current][0], x + width)
+        sheets[current][1] = max(sheets[current][1], y + height)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+    return (placements, [tuple(size) for size in sheets])
+
+
+class Atlas:
+    """Images packed into display format sheets, with a rect per image.
+
+    Colorkeyed images become transparent pixels on per-pixel alpha sheets,
+    so images with different colorkeys can share a sheet. image() returns
+    a subsurface, which shares the sheet's pixels.
+    """
+
+    def __init__(self, images, sheet_size=(1024, 1024), padding=1):
+        names = list(images)
+        sizes = [images[name].get_size() for name in names]
+        (placements, sheet_sizes) = shelf_pack(sizes, sheet_size, padding)
+        self._sheets = []
+        for size in sheet_sizes:
+            sheet = pygame.Surface(size, pygame.SRCALPHA)
+            if pygame.display.get_surface() is not None:
+                sheet = sheet.convert_alpha()
+            sheet.fill((0, 0, 0, 0))
+            self._sheets.append(sheet)
+        self._regions = {}
+        self._images = {}
+        for (name, size, (sheet, x, y)) in zip(names, sizes, placements):
+            rect = pygame.Rect((x, y), size)
+            self._sheets[sheet].blit(images[name], rect)
+            self._regions[name] = (sheet, rect)
+
+    @property
+    def sheets(self):
+        """Return the sheet surfaces."""
+        return self._sheets
+
+    def __contains__(self, name):
+        return name in self._regions
+
+    def __len__(self):
+        return len(self._regions)
+
+    def region(self, name):
+        """Return the sheet surface and the rect of a packed image."""
+        (sheet, rect) = self._regions[name]
+        return (self._sheets[sheet], rect)
+
+    def image(self, name):
+        """Return a packed image as a subsurface of its sheet."""
+        image = self._images.get(name)
+        if image is None:
+            (sheet, rect) = self.region(name)
+            image = sheet.subsurface(rect)
+            self._images[name] = image
+        return image
+
+    def info(self):
+        """Return the number of images and sheets, and the sheets' bytes."""
+        return {
+            'images': len(self._regions),
+            'sheets': len(self._sheets),
+            'bytes': sum(sheet.get_pitch() * sheet.get_height()
+                         for sheet in self._sheets),
+        }
+
+
+def load_sprites(sprites=SPRITES):
+    """Load and prepare the images named in a SPRITES style table.
+
+    The images are only needed until they are packed, so they are
+    decoded without being kept in the assets cache.
+    """
+    images = {}
+    sources = {}
+    for (name, key, scale, colorkey, flip_x, flip_y) in sprites:
+        image = sources.get((key, scale, colorkey))
+        if image is None:
+            image = sources[(key, scale, colorkey)] = assets.take_image(
+                key, scale, colorkey)
+        if flip_x or flip_y:
+            image = pygame.transform.flip(image, flip_x, flip_y)
+        images[name] = image
+    return images
+
+
+def preload_entries(sprites=SPRITES):
+    """Return the assets.preload() entries of the images in a SPRITES
+    style table."""
+    return tuple(dict.fromkeys((key, scale, colorkey)
+                               for (_, key, scale, colorkey, _, _) in sprites))
+
+
+def default_atlas():
+    """Return the atlas of every sprite in SPRITES, building it once."""
+    global _default
+    if _default is None:
+        _default = Atlas(load_sprites())
+    return _default
+
+
+def image(name):
+    """Return a packed image from the default atlas."""
+    return default_atlas().image(name)
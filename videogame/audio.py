@@ -0,0 +1,188 @@
+"""Music and sound effect playback for the scenes."""
+
+import concurrent.futures
+import warnings
+import pygame
+import assets
+
+_default = None
+
+
+class AudioManager:
+    """Play music tracks and sound effects on a fixed set of channels.
+
+    Music tracks are decoded into Sounds in the background when a scene
+    asks for them, and kept in the assets cache under its byte budget, so
+    entering a scene again does not re-decode its track unless it was
+    evicted. Two reserved channels alternate between tracks so changing
+    tracks is a crossfade done by the mixer, without blocking. Sound
+    effects play on a fixed pool of voices; when every voice is busy a new
+    effect takes over the oldest voice of the lowest priority not above
+    its own, or is dropped.
+    """
+
+    def __init__(self, voices=8, music_volume=0.2, fade_ms=500):
+        self._enabled = bool(pygame.mixer.get_init())
+        self._music_volume = music_volume
+        self._fade_ms = fade_ms
+        self._decoding = {}
+        self._failed = set()
+        self._sounds = {}
+        self._executor = None
+        self._music = []
+        self._music_index = 0
+        self._current_track = None
+        self._wanted_track = None
+        self._voices = []
+        # (priority, start order) of the effect on each voice.
+        self._voice_state = []
+        self._plays = 0
+        self._dropped = 0
+        self._stolen = 0
+        if not self._enabled:
+            return
+        channels = 2 + voices
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        # Keep Sound.play() from picking any of the managed channels.
+        pygame.mixer.set_reserved(channels)
+        self._music = [pygame.mixer.Channel(0), pygame.mixer.Channel(1)]
+        self._voices = [pygame.mixer.Channel(index) for index in range(2, channels)]
+        self._voice_state = [(0, 0)] * voices
+
+    @property
+    def enabled(self):
+        """Return False if there is no mixer to play on."""
+        return self._enabled
+
+    @property
+    def current_track(self):
+        """Return the key of the track playing or about to play."""
+        return self._wanted_track
+
+    def preload(self, keys):
+        """Decode music tracks on a background thread, unless cached."""
+        if not self._enabled:
+            return
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                1, thread_name_prefix='audio')
+        for key in keys:
+            if (key in self._decoding or key in self._failed or
+                    assets.cached_sound(key) is not None):
+                continue
+            self._decoding[key] = self._executor.submit(pygame.mixer.Sound,
+                                                        assets.get(key))
+
+    def _collect(self):
+        """Move finished background decodes into the track table."""
+        for (key, future) in list(self._decoding.items()):
+            if not future.done():
+                continue
+            del self._decoding[key]
+            try:
+                assets.store_sound(key, future.result())
+            except (pygame.error, OSError) as error:
+                self._failed.add(key)
+                warnings.warn(f'Cannot load music "{key}": {error}',
+                              RuntimeWarning)
+
+    def is_pending(self):
+        """Return True while a requested track is still being decoded."""
+        return (self._wanted_track is not None and
+                self._wanted_track != self._current_track and
+                self._wanted_track not in self._failed)
+
+    def play_music(self, key):
+        """Crossfade to a looping track.
+
+        If the track is still being decoded it starts once update() finds
+        it ready, so the caller never waits on the decoder.
+        """
+        if not self._enabled:
+            return
+        self._wanted_track = key
+        self._current_track = None
+        self.preload([key])
+        self.update()
+
+    def stop_music(self, fade_ms=None):
+        """Fade the music out without waiting for it to finish."""
+        if not self._enabled:
+            return
+        if fade_ms is None:
+            fade_ms = self._fade_ms
+        self._wanted_track = self._current_track = None
+        for channel in self._music:
+            if channel.get_busy():
+                channel.fadeout(fade_ms)
+
+    def _start_track(self, key, track):
+        self._music[self._music_index].fadeout(self._fade_ms)
+        self._music_index = 1 - self._music_index
+        channel = self._music[self._music_index]
+        channel.set_volume(self._music_volume)
+        channel.play(track, loops=-1, fade_ms=self._fade_ms)
+        self._current_track = key
+
+    def update(self):
+        """Start a requested track whose decode has finished; call once a
+        frame."""
+        if not self._enabled:
+            return
+        self._collect()
+        if self.is_pending() and self._wanted_track not in self._decoding:
+            track = assets.cached_sound(self._wanted_track)
+            if track is None:
+                # Evicted before it could start; decode it again.
+                self.preload([self._wanted_track])
+            else:
+                self._start_track(self._wanted_track, track)
+
+    def play_sfx(self, key, priority=0, volume=1.0):
+        """Play a sound effect on a free or stolen voice; return the
+        channel, or None if the effect was dropped."""
+        if not self._enabled:
+            return None
+        sound = self._sounds.get(key)
+        if sound is None:
+            sound = self._sounds[key] = assets.load_sound(key)
+        voice = None
+        for (index, channel) in enumerate(self._voices):
+            if not channel.get_busy():
+                voice = index
+                break
+        if voice is None:
+            # Steal the oldest of the lowest priority effects playing.
+            voice = min(range(len(self._voices)),
+                        key=lambda index: self._voice_state[index])
+            if self._voice_state[voice][0] > priority:
+                self._dropped += 1
+                return None
+            self._stolen += 1
+        self._plays += 1
+        self._voice_state[voice] = (priority, self._plays)
+        channel = self._voices[voice]
+        channel.set_volume(volume)
+        channel.play(sound)
+        return channel
+
+    def info(self):
+        """Return the cached tracks and the effects played, stolen and
+        dropped."""
+        return {
+            'tracks': sorted(key for key in assets.music_keys
+                             if assets.cached_sound(key) is not None),
+            'decoding': sorted(self._decoding),
+            'plays': self._plays,
+            'stolen': self._stolen,
+            'dropped': self._dropped,
+        }
+
+
+def default_manager():
+    """Return the shared AudioManager, creating it on first use."""
+    global _default
+    if _default is None:
+        _default = AudioManager()
+    return _default
@@ -0,0 +1,327 @@
+#! /usr/bin/env python3
+"""Headless, deterministic benchmark of the AlienScene game loop.
+
+Runs the game under SDL's dummy video and audio drivers with a fixed
+seed and a scripted input timeline, for a fixed number of frames and
+without waiting on the clock. Prints per-frame timings, the memory used
+per entity, what each frame allocates, module import times and how fast
+the simulation steps without drawing as JSON.
+
+    python benchmark.py --frames 1200 --rows 40 --columns 60 --alien-width 8
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# The dummy drivers have to be chosen before pygame is initialized.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+import game  # noqa: E402
+import perf  # noqa: E402
+import player  # noqa: E402
+import projectile  # noqa: E402
+import rgbcolors  # noqa: E402
+import scene  # noqa: E402
+import simulation  # noqa: E402
+import swarm  # noqa: E402
+
+# Repeating input timeline: (frames, key held or None for idle).
+TIMELINE = (
+    (45, pygame.K_LEFT),
+    (30, None),
+    (90, pygame.K_RIGHT),
+    (30, None),
+    (45, pygame.K_LEFT),
+)
+
+
+def scripted_events(frame, fire_every):
+    """Return the events the scripted player sends on a frame."""
+    events = []
+    period = sum(length for (length, _) in TIMELINE)
+    position = frame % period
+    start = 0
+    previous_key = TIMELINE[-1][1]
+    for (length, key) in TIMELINE:
+        if position == start:
+            if previous_key is not None:
+                events.append(pygame.event.Event(pygame.KEYUP, key=previous_key))
+            if key is not None:
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+            break
+        previous_key = key
+        start += length
+    if fire_every and frame % fire_every == 0:
+        events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+    return events
+
+
+def build_scene(video_game, args):
+    """Build the AlienScene being measured."""
+    scene.AlienScene.score = 0
+    alien_scene = scene.AlienScene(video_game.screen,
+                                   video_game.scene_graph,
+                                   args.rows,
+                                   args.columns,
+                                   args.alien_width,
+                                   seed=args.seed)
+    alien_scene.invalidate()
+    return alien_scene
+
+
+def run_frame(alien_scene, events, timestep, frame_ms, timer):
+    """Run one frame of the game loop, timing each phase."""
+    timer.begin_frame('AlienScene')
+    for event in events:
+        alien_scene.process_event(event)
+    timer.mark('events')
+    for _ in range(timestep.advance(frame_ms)):
+        alien_scene.delta_time = timestep.step_ms
+        alien_scene.update_scene()
+    alien_scene.alpha = timestep.alpha
+    timer.mark('update')
+    alien_scene.draw()
+    timer.mark('draw')
+    alien_scene.render_updates()
+    timer.mark('render')
+    pygame.display.update(alien_scene.dirty_rects())
+    timer.mark('present')
+    timer.end_frame(alien_scene.entity_counts())
+
+
+def traced_bytes(build):
+    """Return the bytes still allocated by build() once it returns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def entity_memory(count=1000):
+    """Return the bytes used per entity by each entity representation."""
+    def aliens():
+        return [player.Alien(index, index, 10, rgbcolors.red)
+                for index in range(count)]
+
+    def alien_swarm():
+        alien_swarm = swarm.AlienSwarm(player.Formation())
+        alien_swarm.add_grid(1, count, 10, 5)
+        return alien_swarm
+
+    def projectiles():
+        return projectile.ProjectilePool(count)
+
+    return {
+        'alien_object': traced_bytes(aliens) / count,
+        'swarm_alien': traced_bytes(alien_swarm) / count,
+        'projectile_slot': traced_bytes(projectiles) / count,
+    }
+
+
+def measure_allocations(alien_scene, first_frame, frames, fire_every, timestep,
+                        frame_ms):
+    """Continue the run under tracemalloc and summarize what each frame
+    allocates.
+
+    Reports the transient bytes each frame allocates above what was live
+    when it started, and the bytes and blocks each frame leaves behind.
+    """
+    if frames <= 0:
+        return None
+    # A one frame window so the timer's own history does not count as
+    # retained memory.
+    timer = perf.FrameTimer(window=1)
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    transient = []
+    for frame in range(first_frame, first_frame + frames):
+        events = scripted_events(frame, fire_every)
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        run_frame(alien_scene, events, timestep, frame_ms, timer)
+        transient.append(tracemalloc.get_traced_memory()[1] - current)
+    end_bytes = tracemalloc.get_traced_memory()[0]
+    end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in end.compare_to(start, 'filename'))
+    return {
+        'frames': frames,
+        'transient_bytes': perf.summarize(transient),
+        'retained_bytes': (end_bytes - start_bytes) / frames,
+        'retained_blocks': blocks / frames,
+    }
+
+
+def import_time(module, repeat):
+    """Return the median self and cumulative microseconds a fresh
+    interpreter spends importing module, from python -X importtime."""
+    (self_times, cumulative_times) = ([], [])
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True)
+        for line in result.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module:
+                self_times.append(int(fields[0].split(':')[1]))
+                cumulative_times.append(int(fields[1]))
+    return {
+        'self': statistics.median(self_times),
+        'cumulative': statistics.median(cumulative_times),
+    }
+
+
+def scripted_actions(step, fire_every):
+    """Return the simulation.AlienSimulation action flags the scripted
+    player uses on a step, following TIMELINE one step per frame."""
+    period = sum(length for (length, _) in TIMELINE)
+    position = step % period
+    action = simulation.NOOP
+    for (length, key) in TIMELINE:
+        if position < length:
+            if key == pygame.K_LEFT:
+                action = simulation.LEFT
+            elif key == pygame.K_RIGHT:
+                action = simulation.RIGHT
+            break
+        position -= length
+    if fire_every and step % fire_every == 0:
+        action |= simulation.FIRE
+    return action
+
+
+def simulation_throughput(args, steps, games, fire_every):
+    """Return how many steps per second games simulated games advance in
+    lockstep, with no display; finished games start again."""
+    vector = simulation.VectorAlienSimulation(
+        games, num_rows=args.rows, aliens_per_row=args.columns,
+        alien_width=args.alien_width, simulation_rate=args.sim_rate)
+    vector.reset(args.seed)
+    (played, finished, advanced) = (0, 0, 0)
+    start = time.perf_counter()
+    while advanced < steps:
+        (_, _, dones) = vector.step(scripted_actions(played, fire_every))
+        played += 1
+        advanced += games - finished
+        finished = int(dones.sum())
+        if finished == games:
+            vector.reset(args.seed + played)
+            finished = 0
+    seconds = time.perf_counter() - start
+    return {
+        'games': games,
+        'steps': advanced,
+        'steps_per_second': advanced / seconds,
+    }
+
+
+def run(args):
+    """Run the benchmark and return the report."""
+    random.seed(args.seed)
+    video_game = game.MyVideoGame()
+    alien_scene = build_scene(video_game, args)
+    aliens_at_start = alien_scene.alien_count()
+    fire_every = 0
+    if args.fire_rate > 0:
+        fire_every = max(1, round(args.frame_rate / args.fire_rate))
+    frame_ms = 1000 / args.frame_rate
+    timestep = game.FixedTimestep(args.sim_rate)
+    timer = perf.FrameTimer(window=args.frames)
+    valid_frames = None
+    for frame in range(args.frames):
+        run_frame(alien_scene, scripted_events(frame, fire_every), timestep,
+                  frame_ms, timer)
+        if valid_frames is None and not alien_scene.is_valid():
+            valid_frames = frame + 1
+    report = {
+        'frames': args.frames,
+        'seed': args.seed,
+        'aliens_at_start': aliens_at_start,
+        'aliens_at_end': alien_scene.alien_count(),
+        'fire_rate': args.fire_rate,
+        'sim_rate': args.sim_rate,
+        'score': scene.AlienScene.score,
+        'frames_until_scene_ended': valid_frames,
+        'entities_at_end': timer.entity_counts,
+        'bytes_per_entity': entity_memory(),
+    }
+    report['allocations_per_frame'] = measure_allocations(
+        alien_scene, args.frames, args.alloc_frames, fire_every, timestep,
+        frame_ms)
+    if args.import_repeat > 0:
+        report['import_us'] = {
+            module: import_time(module, args.import_repeat)
+            for module in ('rgbcolors', 'scene')
+        }
+    if args.sim_steps > 0:
+        report['simulation'] = simulation_throughput(
+            args, args.sim_steps, args.sim_games, fire_every)
+    for (phase, summary) in timer.stats('AlienScene').items():
+        report[f'{phase}_ms'] = summary
+    pygame.quit()
+    return report
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=1200,
+                        help='number of frames to run')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for every random number generator')
+    parser.add_argument('--rows', type=int, default=None,
+                        help='rows of aliens in the formation')
+    parser.add_argument('--columns', type=int, default=None,
+                        help='aliens per row in the formation')
+    parser.add_argument('--alien-width', type=int, default=40,
+                        help='width of one alien in pixels')
+    parser.add_argument('--fire-rate', type=float, default=6,
+                        help='player shots per second; 0 to never fire')
+    parser.add_argument('--frame-rate', type=float, default=60,
+                        help='drawn frames per second')
+    parser.add_argument('--sim-rate', type=float, default=120,
+                        help='simulation steps per second')
+    parser.add_argument('--alloc-frames', type=int, default=120,
+                        help='frames run afterwards under tracemalloc; 0 to skip')
+    parser.add_argument('--import-repeat', type=int, default=5,
+                        help='fresh interpreters used to time imports; 0 to skip')
+    parser.add_argument('--sim-steps', type=int, default=20000,
+                        help='steps run without drawing to time the '
+                             'simulation; 0 to skip')
+    parser.add_argument('--sim-games', type=int, default=16,
+                        help='games stepped in lockstep when timing the '
+                             'simulation')
+    parser.add_argument('--output', default=None,
+                        help='write the JSON report here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark from the command line."""
+    args = parse_args(argv)
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            output.write(report + '\n')
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
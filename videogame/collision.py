@@ -0,0 +1,82 @@
+"""Collision helpers for the scenes."""
+
+
+class SpatialGrid:
+    """Uniform grid that buckets objects by the cells their rect covers.
+
+    Objects are only re-bucketed when the set of cells they cover changes,
+    so a query costs about the same no matter how many objects are stored.
+    """
+
+    def __init__(self, cell_size=50):
+        self._cell_size = cell_size
+        self._cells = {}
+        self._object_cells = {}
+
+    @property
+    def cell_size(self):
+        """Return the width and height of a cell."""
+        return self._cell_size
+
+    def _cell_range(self, rect):
+        """Return the (left, top, right, bottom) cell indices covered by rect."""
+        size = self._cell_size
+        return (
+            int(rect.left // size),
+            int(rect.top // size),
+            int((rect.right - 1) // size),
+            int((rect.bottom - 1) // size),
+        )
+
+    def _cells_in(self, cell_range):
+        """Yield every cell key in an inclusive cell range."""
+        (left, top, right, bottom) = cell_range
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                yield (cell_x, cell_y)
+
+    def insert(self, obj, rect):
+        """Add obj to every cell its rect covers."""
+        cell_range = self._cell_range(rect)
+        self._object_cells[obj] = cell_range
+        for key in self._cells_in(cell_range):
+            self._cells.setdefault(key, {})[obj] = None
+
+    def remove(self, obj):
+        """Remove obj from the grid."""
+        cell_range = self._object_cells.pop(obj, None)
+        if cell_range is None:
+            return
+        for key in self._cells_in(cell_range):
+            bucket = self._cells.get(key)
+            if bucket is not None:
+                bucket.pop(obj, None)
+                if not bucket:
+                    del self._cells[key]
+
+    def move(self, obj, rect):
+        """Update obj's cells; does nothing if it is still in the same cells."""
+        if self._object_cells.get(obj) == self._cell_range(rect):
+            return
+        self.remove(obj)
+        self.insert(obj, rect)
+
+    def query(self, rect):
+        """Return the objects sharing a cell with rect, in insertion order."""
+        found = {}
+        for key in self._cells_in(self._cell_range(rect)):
+            bucket = self._cells.get(key)
+            if bucket:
+                found.update(bucket)
+        return list(found)
+
+    def clear(self):
+        """Remove every object from the grid."""
+        self._cells.clear()
+        self._object_cells.clear()
+
+    def __len__(self):
+        return len(self._object_cells)
+
+    def __contains__(self, obj):
+        return obj in self._object_cells
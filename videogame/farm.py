@@ -0,0 +1,250 @@
+#! /usr/bin/env python3
+"""Play many headless AlienScene games in parallel for tuning.
+
+Every combination of the parameter values given on the command line is
+played once per seed by a scripted or random player, across a pool of
+worker processes. Each game's outcome, score, frames survived and frame
+times go to a CSV file, and the totals per parameter set to a JSON
+report.
+
+    python farm.py --rows 4 6 --fire-chance 1e-5 2e-5 --seeds 50 \\
+        --policy scripted random --csv games.csv --json summary.json
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+# The dummy drivers have to be chosen before pygame is initialized.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+import benchmark  # noqa: E402
+import game  # noqa: E402
+import perf  # noqa: E402
+import scene  # noqa: E402
+
+# Outcome of a game by the scene AlienScene asks for when it ends.
+OUTCOMES = {'4': 'win', '2': 'loss'}
+
+# Parameters swept, as passed to scene.AlienScene.
+PARAMETERS = ('rows', 'columns', 'alien_width', 'fire_chance', 'descent_speed')
+
+POLICIES = ('scripted', 'random')
+
+
+class _Outcome:
+    """Stands in for the SceneManager and remembers where the game went."""
+
+    def __init__(self):
+        self.next_scene = None
+
+    def set_next_scene(self, key):
+        """Record the scene the game asked for."""
+        self.next_scene = key
+
+
+def _init_worker():
+    """Start pygame headless in a worker process."""
+    pygame.init()
+    pygame.display.set_mode((800, 800))
+
+
+def random_events(rng, held):
+    """Return a random player's events for one frame; held is a one item
+    list with the arrow key being held, or None."""
+    events = []
+    if rng.random() < .05:
+        if held[0] is not None:
+            events.append(pygame.event.Event(pygame.KEYUP, key=held[0]))
+        held[0] = rng.choice((pygame.K_LEFT, pygame.K_RIGHT, None))
+        if held[0] is not None:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=held[0]))
+    if rng.random() < .1:
+        events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+    return events
+
+
+def play(game_spec):
+    """Play one game headless and return its result.
+
+    game_spec holds the PARAMETERS, the seed, the policy, the frame and
+    simulation rates, max_frames and whether to draw.
+    """
+    random.seed(game_spec['seed'])
+    rng = random.Random(game_spec['seed'])
+    outcome = _Outcome()
+    scene.AlienScene.score = 0
+    alien_scene = scene.AlienScene(pygame.display.get_surface(), outcome,
+                                   game_spec['rows'], game_spec['columns'],
+                                   game_spec['alien_width'],
+                                   seed=game_spec['seed'],
+                                   fire_chance=game_spec['fire_chance'],
+                                   descent_speed=game_spec['descent_speed'])
+    alien_scene.invalidate()
+    aliens_at_start = alien_scene.alien_count()
+    frame_ms = 1000 / game_spec['frame_rate']
+    timestep = game.FixedTimestep(game_spec['sim_rate'])
+    timer = perf.FrameTimer(window=game_spec['max_frames'])
+    fire_every = max(1, round(game_spec['frame_rate'] / 6))
+    held = [None]
+    frames = 0
+    while frames < game_spec['max_frames'] and alien_scene.is_valid():
+        if game_spec['policy'] == 'random':
+            events = random_events(rng, held)
+        else:
+            events = benchmark.scripted_events(frames, fire_every)
+        timer.begin_frame('AlienScene')
+        for event in events:
+            alien_scene.process_event(event)
+        for _ in range(timestep.advance(frame_ms)):
+            alien_scene.delta_time = timestep.step_ms
+            alien_scene.update_scene()
+        alien_scene.alpha = timestep.alpha
+        timer.mark('update')
+        if game_spec['draw']:
+            alien_scene.draw()
+            alien_scene.render_updates()
+            alien_scene.dirty_rects()
+            timer.mark('draw')
+        timer.end_frame()
+        frames += 1
+    frame_stats = perf.summarize(timer.frame_times)
+    result = {name: game_spec[name] for name in PARAMETERS}
+    result.update({
+        'seed': game_spec['seed'],
+        'policy': game_spec['policy'],
+        'outcome': OUTCOMES.get(outcome.next_scene, 'timeout'),
+        'frames': frames,
+        'score': scene.AlienScene.score,
+        'aliens_at_start': aliens_at_start,
+        'aliens_at_end': alien_scene.alien_count(),
+        'frame_ms_mean': frame_stats['mean'],
+        'frame_ms_p99': frame_stats['p99'],
+        'frame_ms_max': frame_stats['max'],
+    })
+    return result
+
+
+def game_specs(args):
+    """Return a game spec for every parameter combination, policy and seed."""
+    specs = []
+    grid = itertools.product(args.rows, args.columns, args.alien_width,
+                             args.fire_chance, args.descent_speed, args.policy)
+    for values in grid:
+        for seed in range(args.first_seed, args.first_seed + args.seeds):
+            spec = dict(zip(PARAMETERS + ('policy',), values))
+            spec.update(seed=seed, frame_rate=args.frame_rate,
+                        sim_rate=args.sim_rate, max_frames=args.max_frames,
+                        draw=args.draw)
+            specs.append(spec)
+    return specs
+
+
+def summarize(results):
+    """Return win rate, score and survival totals per parameter set."""
+    groups = {}
+    for result in results:
+        key = tuple(result[name] for name in PARAMETERS + ('policy',))
+        groups.setdefault(key, []).append(result)
+    summary = []
+    for (key, games) in groups.items():
+        entry = dict(zip(PARAMETERS + ('policy',), key))
+        count = len(games)
+        entry.update({
+            'games': count,
+            'win_rate': sum(result['outcome'] == 'win' for result in games) / count,
+            'loss_rate': sum(result['outcome'] == 'loss' for result in games) / count,
+            'mean_score': sum(result['score'] for result in games) / count,
+            'mean_frames': sum(result['frames'] for result in games) / count,
+            'frame_ms_p99': max(result['frame_ms_p99'] for result in games),
+        })
+        summary.append(entry)
+    return summary
+
+
+def run(args):
+    """Play every game and return the results in spec order."""
+    specs = game_specs(args)
+    with concurrent.futures.ProcessPoolExecutor(
+            args.workers, initializer=_init_worker) as executor:
+        return list(executor.map(play, specs, chunksize=args.chunksize))
+
+
+def write_csv(results, path):
+    """Write one row per game."""
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.DictWriter(output, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[None],
+                        help='rows of aliens in the formation')
+    parser.add_argument('--columns', type=int, nargs='+', default=[None],
+                        help='aliens per row in the formation')
+    parser.add_argument('--alien-width', type=int, nargs='+', default=[40],
+                        help='width of one alien in pixels')
+    parser.add_argument('--fire-chance', type=float, nargs='+', default=[None],
+                        help='shots per alien per millisecond')
+    parser.add_argument('--descent-speed', type=float, nargs='+', default=[None],
+                        help='formation descent in pixels per millisecond')
+    parser.add_argument('--policy', choices=POLICIES, nargs='+',
+                        default=['scripted'], help='how the player plays')
+    parser.add_argument('--seeds', type=int, default=10,
+                        help='games per parameter set, one per seed')
+    parser.add_argument('--first-seed', type=int, default=0,
+                        help='seed of the first game in each set')
+    parser.add_argument('--max-frames', type=int, default=3600,
+                        help='frames before a game counts as a timeout')
+    parser.add_argument('--frame-rate', type=float, default=60,
+                        help='frames per second of game time')
+    parser.add_argument('--sim-rate', type=float, default=120,
+                        help='simulation steps per second')
+    parser.add_argument('--draw', action='store_true',
+                        help='draw every frame as well as simulating it')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes; one per core by default')
+    parser.add_argument('--chunksize', type=int, default=4,
+                        help='games handed to a worker at a time')
+    parser.add_argument('--csv', default=None, help='write one row per game here')
+    parser.add_argument('--json', default=None,
+                        help='write the summary per parameter set here '
+                             'instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run a parameter sweep from the command line."""
+    args = parse_args(argv)
+    start = time.perf_counter()
+    results = run(args)
+    report = {
+        'games': len(results),
+        'seconds': time.perf_counter() - start,
+        'summary': summarize(results),
+    }
+    if args.csv and results:
+        write_csv(results, args.csv)
+    text = json.dumps(report, indent=2)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
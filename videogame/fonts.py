@@ -0,0 +1,153 @@
+"""Resolve system font names once and share the Font objects."""
+
+import atexit
+import json
+import os
+import pygame
+
+TABLE_VERSION = 2
+
+# Where fonts get installed; a new font changes the modification time of
+# one of these or of a directory directly inside it.
+FONT_DIRS = (
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    '/Library/Fonts',
+    '/System/Library/Fonts',
+    os.path.join(os.path.expanduser('~'), '.fonts'),
+    os.path.join(os.path.expanduser('~'), '.local', 'share', 'fonts'),
+    os.path.join(os.path.expanduser('~'), 'Library', 'Fonts'),
+    os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'),
+)
+
+_default = None
+
+
+def default_table_path():
+    """Return where the resolved font table is kept between runs."""
+    cache_home = os.environ.get('XDG_CACHE_HOME',
+                                os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'space-invaders', 'fonts.json')
+
+
+def font_dirs_mtime(font_dirs=FONT_DIRS):
+    """Return the latest modification time of the font directories and
+    the directories directly inside them, 0 if there are none."""
+    latest = 0
+    for font_dir in font_dirs:
+        try:
+            latest = max(latest, os.stat(font_dir).st_mtime)
+            with os.scandir(font_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        latest = max(latest, entry.stat().st_mtime)
+        except OSError:
+            continue
+    return latest
+
+
+class FontRegistry:
+    """Map font family names to files, and (file, size) pairs to Fonts.
+
+    pygame.font.SysFont() searches the system font table on every call,
+    and building that table runs fc-list on Linux. The registry looks each
+    name up once per run, remembers the file it resolved to (None for
+    pygame's default font) and, with a table path, save() keeps them so
+    later runs skip the system font table. Names that fell back to the
+    default font are only trusted while the font directories are
+    unchanged, so a font installed later is found. Fonts are shared, so
+    several names resolving to the same file share one Font per size.
+    """
+
+    def __init__(self, table_path=None):
+        self._table_path = table_path
+        self._paths = {}
+        self._fonts = {}
+        self._dirty = False
+        self._font_dirs_mtime = None
+        if table_path is not None:
+            self._font_dirs_mtime = font_dirs_mtime()
+            self._load_table()
+
+    def _load_table(self):
+        try:
+            with open(self._table_path, encoding='utf-8') as table_file:
+                table = json.load(table_file)
+        except (OSError, ValueError):
+            return
+        if table.get('version') != TABLE_VERSION:
+            return
+        fallbacks_current = table.get('font_dirs_mtime') == self._font_dirs_mtime
+        for (name, path) in table.get('fonts', {}).items():
+            # A font installed or uninstalled since the table was saved
+            # is looked up again.
+            if path is None:
+                if fallbacks_current:
+                    self._paths[name] = None
+            elif os.path.exists(path):
+                self._paths[name] = path
+
+    def save(self):
+        """Write the resolved font table if it changed; return True if
+        it was written."""
+        if self._table_path is None or not self._dirty:
+            return False
+        try:
+            os.makedirs(os.path.dirname(self._table_path), exist_ok=True)
+            with open(self._table_path, 'w', encoding='utf-8') as table_file:
+                json.dump({'version': TABLE_VERSION,
+                           'font_dirs_mtime': self._font_dirs_mtime,
+                           'fonts': self._paths},
+                          table_file, indent=1, sort_keys=True)
+        except OSError:
+            return False
+        self._dirty = False
+        return True
+
+    def resolve(self, name):
+        """Return the font file for a family name, or None for the default."""
+        if not name:
+            return None
+        try:
+            return self._paths[name]
+        except KeyError:
+            pass
+        path = pygame.font.match_font(name)
+        self._paths[name] = path
+        self._dirty = True
+        return path
+
+    def font(self, name, size):
+        """Return the shared Font for a family name and size."""
+        path = self.resolve(name)
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(path, size)
+            self._fonts[key] = font
+        return font
+
+    def info(self):
+        """Return the number of resolved names and of loaded fonts."""
+        return {'names': len(self._paths), 'fonts': len(self._fonts)}
+
+    def clear(self):
+        """Drop the loaded fonts; resolved names are kept."""
+        self._fonts.clear()
+
+
+def default_registry():
+    """Return the shared FontRegistry, reading its table on first use; the
+    table is saved when the program exits."""
+    global _default
+    if _default is None:
+        _default = FontRegistry(default_table_path())
+        atexit.register(_default.save)
+    return _default
+
+
+def font(name, size):
+    """Return a Font from the shared FontRegistry."""
+    return default_registry().font(name, size)
@@ -9,9 +9,15 @@
 
 """Game objects to create PyGame based games."""
 
+import functools
+import random
 import warnings
 
 import pygame
+import assets
+import atlas
+import audio
+import perf
 import scene
 
 def display_info():
@@ -21,12 +27,61 @@ def display_info():
     print(pygame.display.Info())
 
 
+def wait_for_events(timeout):
+    """Block until an event arrives or timeout milliseconds pass; return
+    the pending events."""
+    event = pygame.event.wait(timeout)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+
 # If you're interested in using abstract base classes, feel free to rewrite
 # these classes.
 # For more information about Python Abstract Base classes, see
 # https://docs.python.org/3.8/library/abc.html
 
 
+class FixedTimestep:
+    """Turn variable frame times into a whole number of fixed simulation steps.
+
+    Frame time is accumulated and paid out in steps of 1000 / rate
+    milliseconds. At most max_steps are run per frame, so a slow frame
+    cannot snowball; leftover time becomes the interpolation fraction
+    used when drawing.
+    """
+
+    def __init__(self, rate=120, max_steps=5):
+        self._step_ms = 1000 / rate
+        self._max_steps = max_steps
+        self._accumulator = 0.0
+
+    @property
+    def step_ms(self):
+        """Return the milliseconds simulated by one step."""
+        return self._step_ms
+
+    @property
+    def alpha(self):
+        """Return how far the current frame is between the last two steps."""
+        return self._accumulator / self._step_ms
+
+    def reset(self):
+        """Forget any accumulated time."""
+        self._accumulator = 0.0
+
+    def advance(self, frame_ms):
+        """Add a frame's time and return the number of steps to run."""
+        self._accumulator += frame_ms
+        steps = int(self._accumulator // self._step_ms)
+        if steps > self._max_steps:
+            # Drop the backlog rather than trying to catch up.
+            steps = self._max_steps
+            self._accumulator = self._step_ms * steps
+        self._accumulator -= steps * self._step_ms
+        return steps
+
+
 class VideoGame:
     """Base class for creating PyGame games."""
 
@@ -50,6 +105,11 @@ class VideoGame:
             warnings.warn("Sound disabled.", RuntimeWarning)
         self._scene_graph = None
 
+    @property
+    def screen(self):
+        """Return the display surface."""
+        return self._screen
+
     @property
     def scene_graph(self):
         """Return the scene graph representing all the scenes in the game."""
@@ -67,10 +127,31 @@ class VideoGame:
 class MyVideoGame(VideoGame):
     """Show a colored window with a colored message and a polygon."""
 
-    def __init__(self):
-        """Init the Pygame demo."""
+    def __init__(self, simulation_rate=120, max_steps=5, seed=None,
+                 recorder=None):
+        """Init the Pygame demo.
+
+        The game is simulated at simulation_rate steps per second no
+        matter how fast frames are drawn, running at most max_steps
+        steps per frame. Every random number comes from seed, chosen at
+        random if it is None. A replay.Recorder, if given, logs the
+        session so it can be replayed.
+        """
         super().__init__(window_title = 'Hello')
-        self._scene_graph = scene.SceneManager()
+        self._simulation_rate = simulation_rate
+        self._timestep = FixedTimestep(simulation_rate, max_steps)
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self._seed = seed
+        random.seed(seed)
+        self._recorder = recorder
+        if recorder is not None:
+            recorder.begin(seed, simulation_rate)
+        # Decode sprites and sound effects while the scenes are built.
+        self._preloader = assets.Preloader(self.preload_entries())
+        self._preloader.start()
+        self._audio = audio.default_manager()
+        self._scene_graph = scene.SceneManager(keep_resident=('0', '1'))
         self.build_scene_graph()
 
         self._main_dir = None
@@ -78,48 +159,138 @@ class MyVideoGame(VideoGame):
         # print(f"Our main directory is {self._main_dir}")
         # print(f"Our data directory is {self._data_dir}")
 
+    @property
+    def seed(self):
+        """Return the seed every random number in the game comes from."""
+        return self._seed
+
+    @property
+    def simulation_rate(self):
+        """Return the simulation steps per second."""
+        return self._simulation_rate
+
+    @property
+    def preloader(self):
+        """Return the background asset preloader."""
+        return self._preloader
+
+    def preload_entries(self):
+        """Return the assets the preloader decodes: the sprite atlas's
+        images and what every scene lists in preload_assets."""
+        entries = list(atlas.preload_entries())
+        for scene_class in (scene.PolygonTitleScene, scene.AlienScene,
+                            scene.GameOverScene, scene.GameOver2Scene,
+                            scene.GameWinScene):
+            entries.extend(scene_class.preload_assets)
+        return entries
+
     def build_scene_graph(self):
-        """Build scene graph for the game demo."""
+        """Build scene graph for the game demo.
+
+        Scenes are built the first time they are reached; only the title
+        and the game itself stay resident after they are left.
+        """
         self._scene_graph.add(
             [
-            scene.PolygonTitleScene(self._screen,
-                                    self._scene_graph,
-                                    'Space Invaders'),
-            scene.AlienScene(self._screen,
-                             self._scene_graph),
-            scene.GameOverScene(self._screen,
-                                self._scene_graph,
-                                'Game Over. T^T'),
-            scene.GameOver2Scene(self._screen,
-                                self._scene_graph,
-                                'World Overrun!'),
-            scene.GameWinScene(self._screen,
-                                self._scene_graph,
-                                'You have won!'),             
+            functools.partial(scene.PolygonTitleScene,
+                              self._screen,
+                              self._scene_graph,
+                              'Space Invaders'),
+            functools.partial(scene.AlienScene,
+                              self._screen,
+                              self._scene_graph,
+                              seed=self._seed),
+            functools.partial(scene.GameOverScene,
+                              self._screen,
+                              self._scene_graph,
+                              'Game Over. T^T'),
+            functools.partial(scene.GameOver2Scene,
+                              self._screen,
+                              self._scene_graph,
+                              'World Overrun!'),
+            functools.partial(scene.GameWinScene,
+                              self._screen,
+                              self._scene_graph,
+                              'You have won!'),
             ]
         )
+        # The title needs none of the preloaded assets, so it is shown
+        # straight away while they decode behind it.
         self._scene_graph.set_next_scene('0')
 
     def run(self):
         """Run the game; the main game loop."""
+        timer = perf.FrameTimer()
+        overlay = perf.PerfOverlay(timer)
         scene_iterator = iter(self.scene_graph)
         current_scene = next(scene_iterator)
         while not self._game_is_over:
             current_scene.start_scene()
+            scene_name = type(current_scene).__name__
+            # Simulation steps run by this scene; recorded events are
+            # stamped with it so a replay does not depend on frame times.
+            scene_steps = 0
+            if self._recorder is not None:
+                self._recorder.start_scene()
+            self._clock.tick()
+            self._timestep.reset()
+            # A scene's first frame is shown without waiting out a frame.
+            first_frame = True
             while current_scene.is_valid():
-                current_scene.delta_time = self._clock.tick(
-                    current_scene.frame_rate()
-                )
-                for event in pygame.event.get():
+                if current_scene.is_idle() and not overlay.visible:
+                    # Nothing on screen changes until an event arrives, so
+                    # sleep instead of redrawing; the time slept is not
+                    # simulated.
+                    timeout = current_scene.idle_timeout
+                    if self._audio.is_pending():
+                        # Wake up soon to start the music once it is decoded.
+                        timeout = min(timeout, 50)
+                    events = wait_for_events(timeout)
+                    self._clock.tick()
+                    self._timestep.reset()
+                    frame_ms = 0
+                elif first_frame:
+                    frame_ms = self._clock.tick()
+                    events = pygame.event.get()
+                else:
+                    frame_ms = self._clock.tick(current_scene.frame_rate())
+                    events = pygame.event.get()
+                first_frame = False
+                timer.begin_frame(scene_name)
+                self._audio.update()
+                # Preloaded assets move into the cache as they arrive.
+                self._preloader.poll()
+                for event in events:
+                    if self._recorder is not None:
+                        self._recorder.record(scene_steps, event)
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                        overlay.toggle()
                     current_scene.process_event(event)
-                current_scene.update_scene()
+                timer.mark('events')
+                for _ in range(self._timestep.advance(frame_ms)):
+                    current_scene.delta_time = self._timestep.step_ms
+                    current_scene.update_scene()
+                    scene_steps += 1
+                current_scene.alpha = self._timestep.alpha
+                timer.mark('update')
                 current_scene.draw()
+                timer.mark('draw')
                 current_scene.render_updates()
-                pygame.display.update()
+                overlay_rect = overlay.draw(self._screen)
+                if overlay_rect:
+                    current_scene.mark_drawn(overlay_rect)
+                timer.mark('render')
+                pygame.display.update(current_scene.dirty_rects())
+                timer.mark('present')
+                timer.end_frame(current_scene.entity_counts())
             current_scene.end_scene()
+            if self._recorder is not None:
+                self._recorder.end_scene(scene_steps)
             try:
                 current_scene = next(scene_iterator)
             except:
                 self._game_is_over = True
+        if self._recorder is not None:
+            self._recorder.close()
         pygame.quit()
         return 0
@@ -0,0 +1,111 @@
+#! /usr/bin/env python3
+"""Check that VectorAlienSimulation plays exactly as AlienSimulation.
+
+Both simulations are stepped with the same seeds and random actions over
+several formation and fire rate settings, and every observation, reward
+and done flag has to match exactly. The exit status is 1 at the first
+difference, with the setting, game and step it happened at.
+
+    python lockstep.py --games 8 --episodes 3
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np  # noqa: E402
+import simulation  # noqa: E402
+
+# Settings compared, as passed to both simulations: the default game,
+# fast fire and descent, odd alien and hit box sizes, and a formation
+# large enough to be won.
+CONFIGURATIONS = (
+    {},
+    {'fire_chance': 2e-4},
+    {'fire_chance': 1e-3, 'descent_speed': .05},
+    {'num_rows': 3, 'aliens_per_row': 20, 'alien_width': 17},
+    {'alien_width': 31, 'fire_chance': 5e-4},
+    {'num_rows': 12, 'aliens_per_row': 14, 'alien_width': 20, 'fire_chance': 0},
+    {'player_size': (65, 33), 'fire_chance': 3e-4},
+)
+
+
+def random_actions(rng, habits):
+    """Return action flags per game: mostly each game's habit, otherwise
+    a random action."""
+    count = len(habits)
+    return np.where(rng.random(count) < .7, habits,
+                    rng.integers(8, size=count))
+
+
+def compare(settings, games, seed, max_steps):
+    """Play games of both simulations in lockstep; return (steps, None)
+    or (steps, description of the first difference)."""
+    rng = np.random.default_rng(seed)
+    vector = simulation.VectorAlienSimulation(games, **settings)
+    singles = [simulation.AlienSimulation(seed=seed + index, **settings)
+               for index in range(games)]
+    observations = vector.reset(seed)
+    for (index, single) in enumerate(singles):
+        if not np.array_equal(observations[index], single.observation()):
+            return (0, f'game {index} differs after reset')
+    habits = rng.integers(8, size=games)
+    steps = 0
+    while steps < max_steps:
+        actions = random_actions(rng, habits)
+        playing = [not single.done for single in singles]
+        (observations, rewards, dones) = vector.step(actions)
+        steps += 1
+        for (index, single) in enumerate(singles):
+            if not playing[index]:
+                continue
+            (observation, reward, done) = single.step(int(actions[index]))
+            if not (np.array_equal(observations[index], observation) and
+                    rewards[index] == reward and dones[index] == done):
+                return (steps, f'game {index} differs at step {steps}: '
+                               f'{observations[index].tolist()} '
+                               f'{rewards[index]} {dones[index]} != '
+                               f'{observation.tolist()} {reward} {done}')
+        if dones.all():
+            break
+    if vector.outcomes() != [single.outcome for single in singles]:
+        return (steps, 'outcomes differ')
+    return (steps, None)
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=6,
+                        help='games stepped together per setting')
+    parser.add_argument('--episodes', type=int, default=1,
+                        help='times each setting is played from new seeds')
+    parser.add_argument('--max-steps', type=int, default=6000,
+                        help='steps after which an episode is cut short')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first game')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Compare the simulations from the command line."""
+    args = parse_args(argv)
+    total = 0
+    for (number, settings) in enumerate(CONFIGURATIONS):
+        for episode in range(args.episodes):
+            seed = args.seed + 1000 * number + 100 * episode
+            (steps, difference) = compare(settings, args.games, seed,
+                                          args.max_steps)
+            total += steps
+            if difference is not None:
+                print(f'{settings} seed {seed}: {difference}')
+                return 1
+            print(f'{settings} seed {seed}: {steps} steps match')
+    print(f'{total} lockstep steps match')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
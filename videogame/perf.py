@@ -0,0 +1,231 @@
+"""Frame timing instrumentation and an on-screen performance overlay."""
+
+import collections
+import time
+import pygame
+import rgbcolors
+import text
+
+# Upper edges, in milliseconds, of the frame time histogram buckets.
+BUCKET_EDGES = (1, 2, 4, 8, 12, 17, 25, 33, 50, 100, float('inf'))
+
+
+def percentile(samples, fraction):
+    """Return the nearest-rank percentile of a sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, int(round(fraction * len(samples))) - 1))
+    return samples[rank]
+
+
+def summarize(samples):
+    """Return p50/p95/p99, mean and max of timings in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'p50': percentile(ordered, .50),
+        'p95': percentile(ordered, .95),
+        'p99': percentile(ordered, .99),
+        'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+        'max': ordered[-1] if ordered else 0.0,
+    }
+
+
+def bucket(milliseconds):
+    """Return the index of the histogram bucket for a timing."""
+    for (index, edge) in enumerate(BUCKET_EDGES):
+        if milliseconds < edge:
+            return index
+    return len(BUCKET_EDGES) - 1
+
+
+class RollingHistogram:
+    """The most recent timings of one phase, with bucket counts kept in step."""
+
+    def __init__(self, window):
+        self._samples = collections.deque(maxlen=window)
+        self._counts = [0] * len(BUCKET_EDGES)
+
+    def add(self, milliseconds):
+        """Record a timing, forgetting the oldest one if the window is full."""
+        if len(self._samples) == self._samples.maxlen:
+            self._counts[bucket(self._samples[0])] -= 1
+        self._samples.append(milliseconds)
+        self._counts[bucket(milliseconds)] += 1
+
+    @property
+    def samples(self):
+        """Return the timings in the window, oldest first."""
+        return self._samples
+
+    @property
+    def counts(self):
+        """Return the number of timings in each bucket."""
+        return self._counts
+
+    def summary(self):
+        """Return the percentiles of the timings in the window."""
+        return summarize(self._samples)
+
+
+class FrameTimer:
+    """Timestamp each phase of the game loop and keep rolling statistics.
+
+    Call begin_frame(), then mark() after each phase, then end_frame().
+    Timings are kept per scene so a hitch can be traced to the phase and
+    scene it came from.
+    """
+
+    phases = ('events', 'update', 'draw', 'render', 'present')
+
+    def __init__(self, window=240, clock=time.perf_counter):
+        self._window = window
+        self._clock = clock
+        self._histograms = {}
+        self._frame_times = collections.deque(maxlen=window)
+        self._frame_intervals = collections.deque(maxlen=window)
+        self._entity_counts = {}
+        self._scene_name = None
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+
+    def _histogram(self, scene_name, phase):
+        key = (scene_name, phase)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = RollingHistogram(self._window)
+            self._histograms[key] = histogram
+        return histogram
+
+    def begin_frame(self, scene_name):
+        """Start timing a frame of the named scene."""
+        now = self._clock()
+        if self._frame_start:
+            self._frame_intervals.append((now - self._frame_start) * 1000)
+        self._scene_name = scene_name
+        self._frame_start = self._last_mark = now
+
+    def mark(self, phase):
+        """Record the time since the previous mark as phase."""
+        now = self._clock()
+        self._histogram(self._scene_name, phase).add((now - self._last_mark) * 1000)
+        self._last_mark = now
+
+    def end_frame(self, entity_counts=None):
+        """Finish the frame and record the scene's entity counts."""
+        frame_time = (self._clock() - self._frame_start) * 1000
+        self._frame_times.append(frame_time)
+        self._histogram(self._scene_name, 'frame').add(frame_time)
+        if entity_counts is not None:
+            self._entity_counts = entity_counts
+
+    @property
+    def frame_times(self):
+        """Return the most recent frame times in milliseconds, oldest first."""
+        return self._frame_times
+
+    @property
+    def entity_counts(self):
+        """Return the entity counts reported with the last frame."""
+        return self._entity_counts
+
+    def histogram(self, phase, scene_name=None):
+        """Return the rolling histogram of a phase for a scene."""
+        if scene_name is None:
+            scene_name = self._scene_name
+        return self._histogram(scene_name, phase)
+
+    def stats(self, scene_name=None):
+        """Return the percentiles of every phase recorded for a scene."""
+        if scene_name is None:
+            scene_name = self._scene_name
+        return {
+            phase: histogram.summary()
+            for ((name, phase), histogram) in self._histograms.items()
+            if name == scene_name
+        }
+
+    def fps(self):
+        """Return the frame rate measured between recent frame starts."""
+        if not self._frame_intervals:
+            return 0.0
+        mean = sum(self._frame_intervals) / len(self._frame_intervals)
+        return 1000 / mean if mean else 0.0
+
+
+class PerfOverlay:
+    """Toggleable overlay showing FPS, a frame time sparkline and the
+    per-phase breakdown of a FrameTimer."""
+
+    def __init__(self, timer, position=(10, 50), size=(300, 160),
+                 refresh_ms=250):
+        self._timer = timer
+        self._rect = pygame.Rect(position, size)
+        self._refresh_ms = refresh_ms
+        self._visible = False
+        self._lines = []
+        self._last_refresh = 0
+
+    @property
+    def rect(self):
+        """Return the screen area the overlay covers."""
+        return self._rect
+
+    @property
+    def visible(self):
+        """Return True if the overlay is shown."""
+        return self._visible
+
+    def toggle(self):
+        """Show or hide the overlay."""
+        self._visible = not self._visible
+        self._last_refresh = 0
+
+    def _refresh_text(self):
+        """Re-render the text lines; done a few times a second, not per frame."""
+        timer = self._timer
+        lines = [f'{timer.fps():5.1f} FPS']
+        stats = timer.stats()
+        for phase in FrameTimer.phases:
+            if phase in stats:
+                summary = stats[phase]
+                lines.append(f'{phase:>8} {summary["mean"]:6.2f} ms'
+                            f'  p99 {summary["p99"]:6.2f}')
+        counts = ' '.join(f'{name}:{count}'
+                          for (name, count) in timer.entity_counts.items())
+        if counts:
+            lines.append(counts)
+        self._lines = [text.render(None, 18, line, rgbcolors.white)
+                       for line in lines]
+
+    def _draw_sparkline(self, screen, area):
+        """Draw the recent frame times as a line, 33 ms at the top."""
+        times = list(self._timer.frame_times)
+        if len(times) < 2:
+            return
+        step = area.width / (len(times) - 1)
+        points = [
+            (area.left + index * step,
+             area.bottom - min(frame_time, 33.3) / 33.3 * area.height)
+            for (index, frame_time) in enumerate(times)
+        ]
+        pygame.draw.lines(screen, rgbcolors.green, False, points)
+
+    def draw(self, screen):
+        """Draw the overlay; return the area drawn, or None if hidden."""
+        if not self._visible:
+            return None
+        now = pygame.time.get_ticks()
+        if not self._lines or now - self._last_refresh >= self._refresh_ms:
+            self._refresh_text()
+            self._last_refresh = now
+        screen.fill(rgbcolors.black, self._rect)
+        top = self._rect.top + 4
+        for line in self._lines:
+            screen.blit(line, (self._rect.left + 4, top))
+            top += line.get_height()
+        sparkline = pygame.Rect(self._rect.left + 4, top + 4,
+                                self._rect.width - 8,
+                                self._rect.bottom - top - 8)
+        if sparkline.height > 0:
+            self._draw_sparkline(screen, sparkline)
+        return self._rect
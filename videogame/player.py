@@ -1,112 +1,203 @@
 """Player objects for the scenes."""
 
-import math
 from random import randint
+import numpy as np
 import pygame
 import rgbcolors
-import assets
-
-
-# Taken from the pygame examples
-def load_image(filename, colorkey=None, scale=1):
-    image = pygame.image.load(filename)
-    image = image.convert()
-
-    size = image.get_size()
-    size = (size[0] * scale, size[1] * scale)
-    image = pygame.transform.scale(image, size)
-
-    if colorkey is not None:
-        if colorkey == -1:
-            colorkey = image.get_at((0, 0))
-        image.set_colorkey(colorkey, pygame.RLEACCEL)
-    return image, image.get_rect()
+import atlas
+import sprites
 
 
 class Player(pygame.sprite.Sprite):
-    """Class representing player with a bounding rect."""
+    """Class representing player with a bounding rect.
+
+    The player's position is played by simulation.AlienSimulation; the
+    sprite follows it with place() and draws between steps.
+    """
 
     def __init__(self, position):
         pygame.sprite.Sprite.__init__(self)
-        self.image, self.rect = load_image(assets.get('dragon'), -1)
+        self.image = atlas.image('dragon')
+        self.rect = self.image.get_rect()
         self._position = position
+        self._previous_position = pygame.math.Vector2(position)
+        self._draw_position = pygame.math.Vector2(position)
         self.rect.center = self._position
         self._radius = 25
         self._color = rgbcolors.purple2
-        self._velocity = pygame.math.Vector2(0, 0)
+
+    def place(self, position):
+        """Move the simulated position to position, as played elsewhere."""
+        self._previous_position.update(self._position)
+        self._position.update(position)
+        self.rect.center = self._position
+
+    def interpolate(self, alpha):
+        """Place the sprite between its last two simulated positions."""
+        self._draw_position = self._previous_position.lerp(self._position, alpha)
+        self.rect.center = self._draw_position
 
     def update(self):
         "Updates"
-        newv = self._position.x + self._velocity.x
-        if newv > 0 and newv < 800:
-            self._position += self._velocity
-        self.rect.center = self._position
+        self.rect.center = self._draw_position
 
     @property
     def position(self):
         """Returns position"""
         return self._position
 
-    def stop(self):
-        """Stops movement"""
-        self._velocity = pygame.math.Vector2(0, 0)
+    def draw(self, screen):
+        """Draw the Player to screen."""
+        pygame.draw.circle(screen, self._color, self._draw_position, self._radius)
 
-    def move_left(self):
-        """Moves left"""
-        self._velocity = pygame.math.Vector2(-10, 0)
 
-    def move_right(self):
-        """Moves right"""
-        self._velocity = pygame.math.Vector2(10, 0)
+class Formation:
+    """Shared offset and velocity for a whole swarm of aliens.
 
-    def draw(self, screen):
-        """Draw the Player to screen."""
-        pygame.draw.circle(screen, self._color, self._position, self._radius)
+    Aliens store their center relative to the formation, so moving the
+    swarm is a single update of the offset no matter how many are left.
+    """
 
+    DESCEND = 'descend'
+    DRIFT_LEFT = 'drift left'
+    DRIFT_RIGHT = 'drift right'
 
-class Bullet:
-    """Class for Player's bullets"""
-    def __init__(self, position, target_position, speed):
-        self._position = pygame.math.Vector2(position)
-        self._target_position = pygame.math.Vector2(target_position)
-        self._speed = speed
-        self._color = rgbcolors.mult_color(self._speed, rgbcolors.blue)
-        self._radius = 10
+    # (descent below which the phase applies, phase)
+    schedule = ((230, DRIFT_RIGHT), (430, DRIFT_LEFT), (None, DRIFT_RIGHT))
+
+    def __init__(self, descent_speed=.015, drift_speed=.024, bounds=(0, 800)):
+        """Speeds are in pixels per millisecond."""
+        self._offset = pygame.math.Vector2(0, 0)
+        self._previous_offset = pygame.math.Vector2(0, 0)
+        self._velocity = pygame.math.Vector2(0, 0)
+        self._descent_speed = descent_speed
+        self._drift_speed = drift_speed
+        self._bounds = bounds
+        self._extent = pygame.Rect(0, 0, 0, 0)
+        self._phase = Formation.DRIFT_RIGHT
 
     @property
-    def rect(self):
-        """Return bounding rect."""
-        left = self._position.x - self._radius
-        top = self._position.y - self._radius
-        width = 2 * self._radius
-        return pygame.Rect(left, top, width, width)
+    def offset(self):
+        """Return the offset shared by every alien in the formation."""
+        return self._offset
 
-    def should_die(self):
-        """If bullet should disappear"""
-        squared_distance = (self._position -
-                            self._target_position).length_squared()
-        return math.isclose(squared_distance, 0.0, rel_tol=1e-01)
+    @property
+    def velocity(self):
+        """Return the velocity applied on the last update."""
+        return self._velocity
 
-    def update(self, delta_time):
-        """Updates bullet postion"""
-        self._position.move_towards_ip(self._target_position,
-                                       self._speed * delta_time)
+    @property
+    def phase(self):
+        """Return the current movement phase."""
+        return self._phase
 
-    def draw(self, screen):
-        """Draw the circle to screen."""
-        pygame.draw.circle(screen, self._color, self._position, self._radius)
+    @property
+    def descent_speed(self):
+        """Return how fast the formation descends."""
+        return self._descent_speed
 
+    @property
+    def drift_speed(self):
+        """Return how fast the formation drifts sideways."""
+        return self._drift_speed
+
+    @property
+    def bounds(self):
+        """Return the (left, right) screen x the formation stays within."""
+        return self._bounds
+
+    @property
+    def extent(self):
+        """Return the bounding rect of the formation in screen coordinates."""
+        return self._extent.move(self._offset.x, self._offset.y)
+
+    def interpolated_offset(self, alpha):
+        """Return the offset between the last two updates."""
+        return self._previous_offset.lerp(self._offset, alpha)
+
+    def interpolated_extent(self, alpha):
+        """Return the bounding rect at the interpolated offset."""
+        offset = self.interpolated_offset(alpha)
+        return self._extent.move(offset.x, offset.y)
 
-class Alien(pygame.sprite.Sprite):
-    """Class representing an alien ship with a bounding rect."""
+    def set_extent(self, rect):
+        """Set the bounding rect of the aliens, relative to the formation."""
+        self._extent = pygame.Rect(rect)
 
-    def __init__(self, center_x, center_y, radius, color, name="None"):
+    def update(self, delta_time):
+        """Move the whole formation by delta_time milliseconds."""
+        self._previous_offset.update(self._offset)
+        extent = self.extent
+        drift = float(formation_drift(self._offset.y, extent.left, extent.right,
+                                      self._drift_speed, self._bounds,
+                                      delta_time))
+        if drift > 0:
+            self._phase = Formation.DRIFT_RIGHT
+        elif drift < 0:
+            self._phase = Formation.DRIFT_LEFT
+        else:
+            self._phase = Formation.DESCEND
+        self._velocity.update(drift, self._descent_speed)
+        self._offset += self._velocity * delta_time
+
+
+def formation_drift(offset_y, extent_left, extent_right, drift_speed, bounds,
+                    delta_time):
+    """Return the sideways speed of formations that have descended
+    offset_y, whose extents span extent_left to extent_right on screen.
+
+    The speed follows Formation.schedule and is 0 where drifting for
+    delta_time would leave bounds. Takes single values or arrays, one
+    entry per formation.
+    """
+    drifts = {Formation.DRIFT_RIGHT: drift_speed,
+              Formation.DRIFT_LEFT: -drift_speed,
+              Formation.DESCEND: 0.0}
+    # Past the last entry the formation only descends; earlier entries
+    # take precedence, so they are applied last.
+    drift = 0.0
+    for (until, phase) in reversed(Formation.schedule):
+        if until is None:
+            drift = drifts[phase]
+        else:
+            drift = np.where(offset_y < until, drifts[phase], drift)
+    move = drift * delta_time
+    (left, right) = bounds
+    return np.where((extent_left + move < left) | (extent_right + move > right),
+                    0.0, drift)
+
+
+class Alien:
+    """Class representing an alien ship with a bounding rect.
+
+    When the alien belongs to a formation its center is stored relative to
+    the formation and turned into screen coordinates on access. The rects
+    and center returned are kept by the alien and updated in place, so
+    reading them does not allocate; copy them to keep a value.
+    """
+
+    __slots__ = ('_center_x', '_center_y', '_radius', '_color', '_name',
+                 '_formation', '_is_exploding', '_local_rect', '_rect',
+                 '_center')
+
+    def __init__(self, center_x, center_y, radius, color, name="None",
+                 formation=None):
         self._center_x = center_x
         self._center_y = center_y
         self._radius = radius
         self._color = color
         self._name = name
+        self._formation = formation
         self._is_exploding = False
+        width = 2 * radius
+        self._local_rect = pygame.Rect(center_x - radius, center_y - radius,
+                                       width, width)
+        # Without a formation the screen and local rects are the same.
+        if formation is None:
+            self._rect = self._local_rect
+        else:
+            self._rect = self._local_rect.copy()
+        self._center = None
 
     @property
     def radius(self):
@@ -116,15 +207,38 @@ class Alien(pygame.sprite.Sprite):
     @property
     def center(self):
         """Return the circle's center."""
-        return pygame.Vector2(self._center_x, self._center_y)
+        if self._center is None:
+            self._center = pygame.Vector2()
+        (center_x, center_y) = (self._center_x, self._center_y)
+        if self._formation is not None:
+            offset = self._formation.offset
+            center_x += offset.x
+            center_y += offset.y
+        self._center.update(center_x, center_y)
+        return self._center
+
+    @property
+    def local_rect(self):
+        """Return bounding rect relative to the formation."""
+        return self._local_rect
 
     @property
     def rect(self):
         """Return bounding rect."""
-        left = self._center_x - self._radius
-        top = self._center_y - self._radius
-        width = 2 * self._radius
-        return pygame.Rect(left, top, width, width)
+        rect = self._rect
+        if self._formation is not None:
+            offset = self._formation.offset
+            rect.topleft = (self._local_rect.left + offset.x,
+                            self._local_rect.top + offset.y)
+        return rect
+
+    def move(self, delta_x, delta_y):
+        """Move the alien, relative to its formation if it has one."""
+        self._center_x += delta_x
+        self._center_y += delta_y
+        radius = self._radius
+        self._local_rect.topleft = (self._center_x - radius,
+                                    self._center_y - radius)
 
     @property
     def width(self):
@@ -147,7 +261,8 @@ class Alien(pygame.sprite.Sprite):
 
     def draw(self, screen):
         """Draw the circle to screen."""
-        pygame.draw.circle(screen, self._color, self.center, self._radius)
+        rect = self.rect
+        screen.blit(sprites.circle(self._radius, self._color), rect)
 
     def __repr__(self):
         """Circle stringify."""
@@ -155,47 +270,19 @@ class Alien(pygame.sprite.Sprite):
         {self._radius}, {self._color}, "{self._name}")'
 
 
-class AlienBullet:
-    """Class for Alien's bullets"""
-    def __init__(self, position, target_position, speed):
-        self._position = pygame.math.Vector2(position)
-        self._target_position = pygame.math.Vector2(target_position)
-        self._speed = speed
-        self._color = rgbcolors.mult_color(self._speed, rgbcolors.red)
-        self._radius = 10
-
-    @property
-    def rect(self):
-        """Return bounding rect."""
-        left = self._position.x - self._radius
-        top = self._position.y - self._radius
-        width = 2 * self._radius
-        return pygame.Rect(left, top, width, width)
-
-    def should_die(self):
-        """If bullet should disappear"""
-        squared_distance = (self._position -
-                            self._target_position).length_squared()
-        return math.isclose(squared_distance, 0.0, rel_tol=1e-01)
-
-    def update(self, delta_time):
-        """Update alien bullet position"""
-        self._position.move_towards_ip(self._target_position,
-                                       self._speed * delta_time)
-
-    def draw(self, screen):
-        """Draw the circle to screen."""
-        pygame.draw.circle(screen, self._color, self._position, self._radius)
-
-
 class Shield:
     """Class representing player with a bounding rect."""
 
+    __slots__ = ('_position', '_radius', '_color', '_velocity', '_rects')
+
     def __init__(self, position):
         self._position = position
         self._radius = 25
         self._color = rgbcolors.purple2
         self._velocity = pygame.math.Vector2(0, 0)
+        self._rects = (pygame.Rect(200, 600, 50, 25),
+                       pygame.Rect(375, 600, 50, 25),
+                       pygame.Rect(550, 600, 50, 25))
 
     @property
     def radius(self):
@@ -207,11 +294,12 @@ class Shield:
         """Returns position"""
         return self._position
 
+    @property
+    def rects(self):
+        """Return the rects of the shield blocks."""
+        return self._rects
+
     def draw(self, screen):
         """Draw the Player to screen."""
-        pygame.draw.rect(screen, self._color,
-                         pygame.Rect(200, 600, 50, 25))
-        pygame.draw.rect(screen, self._color,
-                         pygame.Rect(375, 600, 50, 25))
-        pygame.draw.rect(screen, self._color,
-                         pygame.Rect(550, 600, 50, 25))
+        for rect in self._rects:
+            pygame.draw.rect(screen, self._color, rect)
@@ -0,0 +1,90 @@
+"""Pools of pre-allocated sprites for short lived effects."""
+
+import collections
+
+# What SpritePool.spawn() does when every sprite is in use.
+GROW = 'grow'
+DROP = 'drop'
+RECYCLE = 'recycle'
+
+
+class SpritePool:
+    """Hand out pre-allocated sprites instead of creating and killing them.
+
+    factory(pool=pool) builds a sprite; spawn(*args) calls its reset(*args)
+    and adds it to group, and the sprite gives itself back with
+    pool.release(sprite) when it expires. When every sprite is in use the
+    overflow policy decides: GROW builds another, DROP spawns nothing and
+    RECYCLE takes over the oldest active sprite.
+    """
+
+    def __init__(self, factory, size, group=None, overflow=GROW):
+        if overflow not in (GROW, DROP, RECYCLE):
+            raise ValueError(f'unknown overflow policy {overflow!r}')
+        self._factory = factory
+        self._group = group
+        self._overflow = overflow
+        self._free = [factory(pool=self) for _ in range(size)]
+        # Active sprites, oldest first.
+        self._active = collections.OrderedDict()
+        self._created = size
+        self._dropped = 0
+        self._recycled = 0
+
+    @property
+    def overflow(self):
+        """Return the overflow policy."""
+        return self._overflow
+
+    @property
+    def active(self):
+        """Return the sprites in use, oldest first."""
+        return self._active.keys()
+
+    def __len__(self):
+        """Return the number of sprites in use."""
+        return len(self._active)
+
+    def spawn(self, *args):
+        """Reset and activate a sprite; return it, or None if dropped."""
+        if self._free:
+            sprite = self._free.pop()
+        elif self._overflow == GROW:
+            sprite = self._factory(pool=self)
+            self._created += 1
+        elif self._overflow == RECYCLE and self._active:
+            (sprite, _) = self._active.popitem(last=False)
+            self._recycled += 1
+        else:
+            self._dropped += 1
+            return None
+        sprite.reset(*args)
+        self._active[sprite] = None
+        if self._group is not None:
+            self._group.add(sprite)
+        return sprite
+
+    def release(self, sprite):
+        """Take a sprite back for reuse."""
+        if sprite not in self._active:
+            return
+        del self._active[sprite]
+        if self._group is not None:
+            self._group.remove(sprite)
+        self._free.append(sprite)
+
+    def clear(self):
+        """Take back every active sprite."""
+        for sprite in list(self._active):
+            self.release(sprite)
+
+    def info(self):
+        """Return how many sprites are active, free, built, dropped and
+        recycled."""
+        return {
+            'active': len(self._active),
+            'free': len(self._free),
+            'created': self._created,
+            'dropped': self._dropped,
+            'recycled': self._recycled,
+        }
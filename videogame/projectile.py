@@ -0,0 +1,159 @@
+"""Pooled, array backed projectiles for the player and the aliens."""
+
+import numpy as np
+
+PLAYER = 0
+ALIEN = 1
+
+
+def step_towards(x, y, target_x, target_y, speed, delta_time):
+    """Return (x, y, arrived) after moving points towards their targets
+    at speed for delta_time; points that arrive are left where they were."""
+    delta_x = target_x - x
+    delta_y = target_y - y
+    distance = np.hypot(delta_x, delta_y)
+    step = speed * delta_time
+    arrived = distance <= step
+    moving = ~arrived
+    scale = step[moving] / distance[moving]
+    x = x.copy()
+    y = y.copy()
+    x[moving] += delta_x[moving] * scale
+    y[moving] += delta_y[moving] * scale
+    return (x, y, arrived)
+
+
+def overlaps_rect(x, y, radius, left, top, right, bottom):
+    """Return whether the box of radius around each point overlaps the
+    rect with the given edges."""
+    return ((x + radius > left) & (x - radius < right) &
+            (y + radius > top) & (y - radius < bottom))
+
+
+class ProjectilePool:
+    """Fixed capacity pool of projectiles moving towards a target.
+
+    Every projectile lives in a slot of a set of parallel arrays; firing
+    reuses a dead slot instead of allocating, and all projectiles are
+    advanced together once per frame.
+    """
+
+    def __init__(self, capacity=512, radius=10):
+        self._capacity = capacity
+        self._radius = radius
+        self._x = np.zeros(capacity, dtype=np.float64)
+        self._y = np.zeros(capacity, dtype=np.float64)
+        self._previous_x = np.zeros(capacity, dtype=np.float64)
+        self._previous_y = np.zeros(capacity, dtype=np.float64)
+        self._target_x = np.zeros(capacity, dtype=np.float64)
+        self._target_y = np.zeros(capacity, dtype=np.float64)
+        self._speed = np.zeros(capacity, dtype=np.float64)
+        self._owner = np.zeros(capacity, dtype=np.uint8)
+        self._alive = np.zeros(capacity, dtype=np.bool_)
+        self._colors = [None] * capacity
+        # Pop from the end so the lowest slots are handed out first.
+        self._free = list(range(capacity - 1, -1, -1))
+
+    @property
+    def capacity(self):
+        """Return the maximum number of live projectiles."""
+        return self._capacity
+
+    @property
+    def radius(self):
+        """Return the radius shared by every projectile."""
+        return self._radius
+
+    @property
+    def x(self):
+        """Return the x coordinate of every slot."""
+        return self._x
+
+    @property
+    def y(self):
+        """Return the y coordinate of every slot."""
+        return self._y
+
+    @property
+    def alive(self):
+        """Return the alive mask."""
+        return self._alive
+
+    def __len__(self):
+        """Return the number of live projectiles."""
+        return self._capacity - len(self._free)
+
+    def count(self, owner):
+        """Return the number of live projectiles fired by owner."""
+        return int(np.count_nonzero(self._alive & (self._owner == owner)))
+
+    def spawn(self, position, target_position, speed, owner, color):
+        """Fire a projectile; return its slot, or -1 if the pool is full."""
+        if not self._free:
+            return -1
+        slot = self._free.pop()
+        self._x[slot] = self._previous_x[slot] = position[0]
+        self._y[slot] = self._previous_y[slot] = position[1]
+        self._target_x[slot] = target_position[0]
+        self._target_y[slot] = target_position[1]
+        self._speed[slot] = speed
+        self._owner[slot] = owner
+        self._colors[slot] = color
+        self._alive[slot] = True
+        return slot
+
+    def release(self, slot):
+        """Return a slot to the pool."""
+        if self._alive[slot]:
+            self._alive[slot] = False
+            self._free.append(slot)
+
+    def live(self, owner=None):
+        """Return the slots of the live projectiles, optionally by owner."""
+        mask = self._alive
+        if owner is not None:
+            mask = mask & (self._owner == owner)
+        return np.flatnonzero(mask)
+
+    def update(self, delta_time):
+        """Move every live projectile towards its target; projectiles that
+        reach their target die."""
+        slots = np.flatnonzero(self._alive)
+        if not len(slots):
+            return
+        self._previous_x[slots] = self._x[slots]
+        self._previous_y[slots] = self._y[slots]
+        (self._x[slots], self._y[slots], arrived) = step_towards(
+            self._x[slots], self._y[slots], self._target_x[slots],
+            self._target_y[slots], self._speed[slots], delta_time)
+        for slot in slots[arrived].tolist():
+            self.release(slot)
+
+    def collide_rect(self, rect, owner):
+        """Return the live slots of owner whose bounding box overlaps rect."""
+        slots = self.live(owner)
+        if not len(slots):
+            return slots
+        overlap = overlaps_rect(self._x[slots], self._y[slots], self._radius,
+                                rect.left, rect.top, rect.right, rect.bottom)
+        return slots[overlap]
+
+    def __iter__(self):
+        """Yield (x, y, radius, color) for each live projectile."""
+        return self.items()
+
+    def items(self, alpha=None):
+        """Yield (x, y, radius, color) for each live projectile, optionally
+        interpolated between its last two updates."""
+        slots = np.flatnonzero(self._alive)
+        x = self._x[slots]
+        y = self._y[slots]
+        if alpha is not None:
+            previous_x = self._previous_x[slots]
+            previous_y = self._previous_y[slots]
+            x = previous_x + (x - previous_x) * alpha
+            y = previous_y + (y - previous_y) * alpha
+        colors = self._colors
+        radius = self._radius
+        for (slot, x, y) in zip(slots.tolist(), x.tolist(), y.tolist()):
+            yield (x, y, radius, colors[slot])
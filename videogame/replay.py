@@ -0,0 +1,212 @@
+#! /usr/bin/env python3
+"""Record game sessions and replay them faster than real time.
+
+A recording holds the game's seed and simulation rate, then for every
+scene played the keyboard and quit events it received, each stamped
+with the number of simulation steps the scene had run when it arrived.
+Replaying feeds the same events to the same scenes at the same steps,
+so it reproduces the session no matter how fast frames are drawn.
+
+    python ../invaders.py --record session.rec
+    python replay.py session.rec --profile session.prof
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import struct
+import sys
+import time
+import pygame
+import game
+import scene
+
+MAGIC = b'SIRP'
+# Version 1 recordings start with the loading screen the game no longer
+# shows; it changed nothing, so it is skipped when they are read.
+VERSION = 2
+
+# Magic, format version, seed and simulation steps per second.
+HEADER = struct.Struct('<4sHQd')
+
+# Seeds a recording can hold.
+MAX_SEED = 2 ** 64 - 1
+# Scene step, event type, key and modifiers.
+RECORD = struct.Struct('<IHiH')
+
+# Record types marking where a scene starts and ends; an end record's
+# step is the number of steps the scene ran.
+SCENE_START = 0xFFFE
+SCENE_END = 0xFFFF
+
+RECORDED_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.QUIT)
+
+
+def seed_argument(text):
+    """Parse a command line seed that a recording can hold."""
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid seed: {text!r}') from None
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(
+            f'seed must be between 0 and {MAX_SEED}, not {seed}')
+    return seed
+
+
+class Recorder:
+    """Write a session's seed and input events to a file as it is played."""
+
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+
+    def begin(self, seed, simulation_rate):
+        """Start the recording; called by the game once it has a seed."""
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f'seed must be between 0 and {MAX_SEED} to be '
+                             f'recorded, not {seed}')
+        self._file = open(self._path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, seed, simulation_rate))
+
+    def start_scene(self):
+        """Mark the start of a scene."""
+        self._file.write(RECORD.pack(0, SCENE_START, 0, 0))
+
+    def record(self, step, event):
+        """Record an event the current scene received before step."""
+        if event.type not in RECORDED_EVENTS:
+            return
+        self._file.write(RECORD.pack(step, event.type,
+                                     getattr(event, 'key', 0),
+                                     getattr(event, 'mod', 0)))
+
+    def end_scene(self, steps):
+        """Mark the end of a scene that ran steps simulation steps."""
+        self._file.write(RECORD.pack(steps, SCENE_END, 0, 0))
+
+    def close(self):
+        """Finish the recording."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Recording:
+    """A session read back from a file."""
+
+    def __init__(self, seed, simulation_rate, scenes):
+        self.seed = seed
+        self.simulation_rate = simulation_rate
+        # (events, steps) per scene played; events are (step, Event)
+        # pairs and steps is None if the scene never ended.
+        self.scenes = scenes
+
+    @classmethod
+    def load(cls, path):
+        """Read a recording written by Recorder."""
+        with open(path, 'rb') as recording:
+            data = recording.read()
+        (magic, version, seed, simulation_rate) = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError(f'{path} is not a version {VERSION} recording')
+        scenes = []
+        events = None
+        for (step, kind, key, mod) in RECORD.iter_unpack(data[HEADER.size:]):
+            if kind == SCENE_START:
+                events = []
+                scenes.append((events, None))
+            elif kind == SCENE_END:
+                scenes[-1] = (events, step)
+            elif kind == pygame.QUIT:
+                events.append((step, pygame.event.Event(kind)))
+            else:
+                events.append((step, pygame.event.Event(kind, key=key, mod=mod)))
+        if version == 1:
+            scenes = scenes[1:]
+        return cls(seed, simulation_rate, scenes)
+
+
+def replay(recording, render=False):
+    """Play a recording back as fast as possible; return a summary.
+
+    With render, every step is drawn as well as simulated.
+    """
+    video_game = game.MyVideoGame(simulation_rate=recording.simulation_rate,
+                                  seed=recording.seed)
+    # Loading times differ between runs, so finish loading up front.
+    video_game.preloader.wait()
+    scene.AlienScene.score = 0
+    step_ms = 1000 / recording.simulation_rate
+    scene_iterator = iter(video_game.scene_graph)
+    summary = []
+    start = time.perf_counter()
+    for (events, steps) in recording.scenes:
+        try:
+            current_scene = next(scene_iterator)
+        except StopIteration:
+            break
+        current_scene.start_scene()
+        if steps is None:
+            steps = max((step for (step, _) in events), default=0)
+        pending = iter(events)
+        upcoming = next(pending, None)
+        for step in range(steps + 1):
+            while upcoming is not None and upcoming[0] == step:
+                current_scene.process_event(upcoming[1])
+                upcoming = next(pending, None)
+            if step == steps:
+                break
+            current_scene.delta_time = step_ms
+            current_scene.update_scene()
+            if render:
+                current_scene.draw()
+                current_scene.render_updates()
+                pygame.display.update(current_scene.dirty_rects())
+        current_scene.end_scene()
+        summary.append({'scene': type(current_scene).__name__,
+                        'steps': steps, 'events': len(events)})
+    seconds = time.perf_counter() - start
+    total_steps = sum(entry['steps'] for entry in summary)
+    pygame.quit()
+    return {
+        'seed': recording.seed,
+        'scenes': summary,
+        'steps': total_steps,
+        'seconds': seconds,
+        'steps_per_second': total_steps / seconds if seconds else None,
+        'score': scene.AlienScene.score,
+    }
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording', help='file written by invaders.py --record')
+    parser.add_argument('--render', action='store_true',
+                        help='draw every step as well as simulating it')
+    parser.add_argument('--profile', default=None,
+                        help='write cProfile statistics for the replay here')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Replay a recording from the command line."""
+    args = parse_args(argv)
+    # Replays run headless; the drivers are chosen when pygame starts.
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    recording = Recording.load(args.recording)
+    if args.profile:
+        profiler = cProfile.Profile()
+        report = profiler.runcall(replay, recording, args.render)
+        profiler.dump_stats(args.profile)
+    else:
+        report = replay(recording, args.render)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,16 @@
 """A list of RGB colors produced by X11's showrgb command. The color database
-    is probably from an IRIX system circa 2005"""
+    is probably from an IRIX system circa 2005
 
-from pygame import Color
+The colors are kept in one packed table and turned into module attributes
+the first time each is used, so importing the module costs almost
+nothing. Every name is also available without its underscores, as in
+ghost_white and ghostwhite.
+
+The *_colors functions work on whole palettes or pixel arrays at once
+with NumPy, which is imported the first time one of them is used.
+"""
+
+import functools
 
 
 def _clamp(val: int, min_value=0, max_value=255) -> int:
@@ -9,9 +18,15 @@ def _clamp(val: int, min_value=0, max_value=255) -> int:
     return max(min_value, min(val, max_value))
 
 
+@functools.lru_cache(maxsize=1024)
+def _mult_color(scalar, color):
+    return tuple(_clamp(n * scalar) for n in color)
+
+
 def mult_color(scalar, color):
-    """Multiply a color by a scalar"""
-    return tuple(map(lambda n: _clamp(n * scalar), color))
+    """Multiply a color by a scalar; results are memoized per scalar and
+    color."""
+    return _mult_color(scalar, tuple(color))
 
 
 def mult_colr(color_a, color_b):
@@ -41,761 +56,289 @@ def diff_color(color_a, color_b):
     )
 
 
+def _numpy():
+    import numpy
+    return numpy
+
+
+def _saturate(values):
+    """Clamp an array to 0..255 and return it as uint8."""
+    numpy = _numpy()
+    return numpy.clip(values, 0, 255).astype(numpy.uint8)
+
+
+def as_color_array(colors):
+    """Return colors, a color, a palette or a pixel array, as a uint8 array
+    whose last axis is the channels."""
+    numpy = _numpy()
+    return numpy.asarray(colors, dtype=numpy.uint8)
+
+
+def scale_colors(colors, scalar):
+    """Multiply every color by scalar, saturating at 0 and 255.
+
+    scalar may also be an array that broadcasts against colors, such as
+    one factor per color or per channel.
+    """
+    numpy = _numpy()
+    return _saturate(as_color_array(colors) * numpy.asarray(scalar, numpy.float32))
+
+
+def mult_colors(colors_a, colors_b):
+    """Multiply colors channel by channel, saturating at 255."""
+    numpy = _numpy()
+    return _saturate(numpy.asarray(colors_a, numpy.float32) *
+                     numpy.asarray(colors_b, numpy.float32))
+
+
+def sum_colors(colors_a, colors_b):
+    """Add colors channel by channel, saturating at 255."""
+    numpy = _numpy()
+    return _saturate(numpy.asarray(colors_a, numpy.int16) +
+                     numpy.asarray(colors_b, numpy.int16))
+
+
+def diff_colors(colors_a, colors_b):
+    """Subtract colors channel by channel, saturating at 0."""
+    numpy = _numpy()
+    return _saturate(numpy.asarray(colors_a, numpy.int16) -
+                     numpy.asarray(colors_b, numpy.int16))
+
+
+def scale_surface(surface, scalar):
+    """Multiply every pixel of a surface by scalar in place, for example
+    to fade the screen."""
+    from pygame import surfarray
+    pixels = surfarray.pixels3d(surface)
+    pixels[...] = scale_colors(pixels, scalar)
+    del pixels
+
+
 def tuple_to_color(color_tuple):
     """Given a tuple representing a color, return a Pygame color contructed from that tuple."""
+    from pygame import Color
     return Color(*color_tuple)
 
 
-snow = (255, 250, 250)
-ghost_white = (248, 248, 255)
-ghostwhite = (248, 248, 255)
-white_smoke = (245, 245, 245)
-whitesmoke = (245, 245, 245)
-gainsboro = (220, 220, 220)
-floral_white = (255, 250, 240)
-floralwhite = (255, 250, 240)
-old_lace = (253, 245, 230)
-oldlace = (253, 245, 230)
-linen = (250, 240, 230)
-antique_white = (250, 235, 215)
-antiquewhite = (250, 235, 215)
-papaya_whip = (255, 239, 213)
-papayawhip = (255, 239, 213)
-blanched_almond = (255, 235, 205)
-blanchedalmond = (255, 235, 205)
-bisque = (255, 228, 196)
-peach_puff = (255, 218, 185)
-peachpuff = (255, 218, 185)
-navajo_white = (255, 222, 173)
-navajowhite = (255, 222, 173)
-moccasin = (255, 228, 181)
-cornsilk = (255, 248, 220)
-ivory = (255, 255, 240)
-lemon_chiffon = (255, 250, 205)
-lemonchiffon = (255, 250, 205)
-seashell = (255, 245, 238)
-honeydew = (240, 255, 240)
-mint_cream = (245, 255, 250)
-mintcream = (245, 255, 250)
-azure = (240, 255, 255)
-alice_blue = (240, 248, 255)
-aliceblue = (240, 248, 255)
-lavender = (230, 230, 250)
-lavender_blush = (255, 240, 245)
-lavenderblush = (255, 240, 245)
-misty_rose = (255, 228, 225)
-mistyrose = (255, 228, 225)
-white = (255, 255, 255)
-black = (0, 0, 0)
-dark_slate_gray = (47, 79, 79)
-darkslategray = (47, 79, 79)
-dark_slate_grey = (47, 79, 79)
-darkslategrey = (47, 79, 79)
-dim_gray = (105, 105, 105)
-dimgray = (105, 105, 105)
-dim_grey = (105, 105, 105)
-dimgrey = (105, 105, 105)
-slate_gray = (112, 128, 144)
-slategray = (112, 128, 144)
-slate_grey = (112, 128, 144)
-slategrey = (112, 128, 144)
-light_slate_gray = (119, 136, 153)
-lightslategray = (119, 136, 153)
-light_slate_grey = (119, 136, 153)
-lightslategrey = (119, 136, 153)
-gray = (190, 190, 190)
-grey = (190, 190, 190)
-light_grey = (211, 211, 211)
-lightgrey = (211, 211, 211)
-light_gray = (211, 211, 211)
-lightgray = (211, 211, 211)
-midnight_blue = (25, 25, 112)
-midnightblue = (25, 25, 112)
-navy = (0, 0, 128)
-navy_blue = (0, 0, 128)
-navyblue = (0, 0, 128)
-cornflower_blue = (100, 149, 237)
-cornflowerblue = (100, 149, 237)
-dark_slate_blue = (72, 61, 139)
-darkslateblue = (72, 61, 139)
-slate_blue = (106, 90, 205)
-slateblue = (106, 90, 205)
-medium_slate_blue = (123, 104, 238)
-mediumslateblue = (123, 104, 238)
-light_slate_blue = (132, 112, 255)
-lightslateblue = (132, 112, 255)
-medium_blue = (0, 0, 205)
-mediumblue = (0, 0, 205)
-royal_blue = (65, 105, 225)
-royalblue = (65, 105, 225)
-blue = (0, 0, 255)
-dodger_blue = (30, 144, 255)
-dodgerblue = (30, 144, 255)
-deep_sky_blue = (0, 191, 255)
-deepskyblue = (0, 191, 255)
-sky_blue = (135, 206, 235)
-skyblue = (135, 206, 235)
-light_sky_blue = (135, 206, 250)
-lightskyblue = (135, 206, 250)
-steel_blue = (70, 130, 180)
-steelblue = (70, 130, 180)
-light_steel_blue = (176, 196, 222)
-lightsteelblue = (176, 196, 222)
-light_blue = (173, 216, 230)
-lightblue = (173, 216, 230)
-powder_blue = (176, 224, 230)
-powderblue = (176, 224, 230)
-pale_turquoise = (175, 238, 238)
-paleturquoise = (175, 238, 238)
-dark_turquoise = (0, 206, 209)
-darkturquoise = (0, 206, 209)
-medium_turquoise = (72, 209, 204)
-mediumturquoise = (72, 209, 204)
-turquoise = (64, 224, 208)
-cyan = (0, 255, 255)
-light_cyan = (224, 255, 255)
-lightcyan = (224, 255, 255)
-cadet_blue = (95, 158, 160)
-cadetblue = (95, 158, 160)
-medium_aquamarine = (102, 205, 170)
-mediumaquamarine = (102, 205, 170)
-aquamarine = (127, 255, 212)
-dark_green = (0, 100, 0)
-darkgreen = (0, 100, 0)
-dark_olive_green = (85, 107, 47)
-darkolivegreen = (85, 107, 47)
-dark_sea_green = (143, 188, 143)
-darkseagreen = (143, 188, 143)
-sea_green = (46, 139, 87)
-seagreen = (46, 139, 87)
-medium_sea_green = (60, 179, 113)
-mediumseagreen = (60, 179, 113)
-light_sea_green = (32, 178, 170)
-lightseagreen = (32, 178, 170)
-pale_green = (152, 251, 152)
-palegreen = (152, 251, 152)
-spring_green = (0, 255, 127)
-springgreen = (0, 255, 127)
-lawn_green = (124, 252, 0)
-lawngreen = (124, 252, 0)
-green = (0, 255, 0)
-chartreuse = (127, 255, 0)
-medium_spring_green = (0, 250, 154)
-mediumspringgreen = (0, 250, 154)
-green_yellow = (173, 255, 47)
-greenyellow = (173, 255, 47)
-lime_green = (50, 205, 50)
-limegreen = (50, 205, 50)
-yellow_green = (154, 205, 50)
-yellowgreen = (154, 205, 50)
-forest_green = (34, 139, 34)
-forestgreen = (34, 139, 34)
-olive_drab = (107, 142, 35)
-olivedrab = (107, 142, 35)
-dark_khaki = (189, 183, 107)
-darkkhaki = (189, 183, 107)
-khaki = (240, 230, 140)
-pale_goldenrod = (238, 232, 170)
-palegoldenrod = (238, 232, 170)
-light_goldenrod_yellow = (250, 250, 210)
-lightgoldenrodyellow = (250, 250, 210)
-light_yellow = (255, 255, 224)
-lightyellow = (255, 255, 224)
-yellow = (255, 255, 0)
-gold = (255, 215, 0)
-light_goldenrod = (238, 221, 130)
-lightgoldenrod = (238, 221, 130)
-goldenrod = (218, 165, 32)
-dark_goldenrod = (184, 134, 11)
-darkgoldenrod = (184, 134, 11)
-rosy_brown = (188, 143, 143)
-rosybrown = (188, 143, 143)
-indian_red = (205, 92, 92)
-indianred = (205, 92, 92)
-saddle_brown = (139, 69, 19)
-saddlebrown = (139, 69, 19)
-sienna = (160, 82, 45)
-peru = (205, 133, 63)
-burlywood = (222, 184, 135)
-beige = (245, 245, 220)
-wheat = (245, 222, 179)
-sandy_brown = (244, 164, 96)
-sandybrown = (244, 164, 96)
-tan = (210, 180, 140)
-chocolate = (210, 105, 30)
-firebrick = (178, 34, 34)
-brown = (165, 42, 42)
-dark_salmon = (233, 150, 122)
-darksalmon = (233, 150, 122)
-salmon = (250, 128, 114)
-light_salmon = (255, 160, 122)
-lightsalmon = (255, 160, 122)
-orange = (255, 165, 0)
-dark_orange = (255, 140, 0)
-darkorange = (255, 140, 0)
-coral = (255, 127, 80)
-light_coral = (240, 128, 128)
-lightcoral = (240, 128, 128)
-tomato = (255, 99, 71)
-orange_red = (255, 69, 0)
-orangered = (255, 69, 0)
-red = (255, 0, 0)
-hot_pink = (255, 105, 180)
-hotpink = (255, 105, 180)
-deep_pink = (255, 20, 147)
-deeppink = (255, 20, 147)
-pink = (255, 192, 203)
-light_pink = (255, 182, 193)
-lightpink = (255, 182, 193)
-pale_violet_red = (219, 112, 147)
-palevioletred = (219, 112, 147)
-maroon = (176, 48, 96)
-medium_violet_red = (199, 21, 133)
-mediumvioletred = (199, 21, 133)
-violet_red = (208, 32, 144)
-violetred = (208, 32, 144)
-magenta = (255, 0, 255)
-violet = (238, 130, 238)
-plum = (221, 160, 221)
-orchid = (218, 112, 214)
-medium_orchid = (186, 85, 211)
-mediumorchid = (186, 85, 211)
-dark_orchid = (153, 50, 204)
-darkorchid = (153, 50, 204)
-dark_violet = (148, 0, 211)
-darkviolet = (148, 0, 211)
-blue_violet = (138, 43, 226)
-blueviolet = (138, 43, 226)
-purple = (160, 32, 240)
-medium_purple = (147, 112, 219)
-mediumpurple = (147, 112, 219)
-thistle = (216, 191, 216)
-snow1 = (255, 250, 250)
-snow2 = (238, 233, 233)
-snow3 = (205, 201, 201)
-snow4 = (139, 137, 137)
-seashell1 = (255, 245, 238)
-seashell2 = (238, 229, 222)
-seashell3 = (205, 197, 191)
-seashell4 = (139, 134, 130)
-antiquewhite1 = (255, 239, 219)
-antiquewhite2 = (238, 223, 204)
-antiquewhite3 = (205, 192, 176)
-antiquewhite4 = (139, 131, 120)
-bisque1 = (255, 228, 196)
-bisque2 = (238, 213, 183)
-bisque3 = (205, 183, 158)
-bisque4 = (139, 125, 107)
-peachpuff1 = (255, 218, 185)
-peachpuff2 = (238, 203, 173)
-peachpuff3 = (205, 175, 149)
-peachpuff4 = (139, 119, 101)
-navajowhite1 = (255, 222, 173)
-navajowhite2 = (238, 207, 161)
-navajowhite3 = (205, 179, 139)
-navajowhite4 = (139, 121, 94)
-lemonchiffon1 = (255, 250, 205)
-lemonchiffon2 = (238, 233, 191)
-lemonchiffon3 = (205, 201, 165)
-lemonchiffon4 = (139, 137, 112)
-cornsilk1 = (255, 248, 220)
-cornsilk2 = (238, 232, 205)
-cornsilk3 = (205, 200, 177)
-cornsilk4 = (139, 136, 120)
-ivory1 = (255, 255, 240)
-ivory2 = (238, 238, 224)
-ivory3 = (205, 205, 193)
-ivory4 = (139, 139, 131)
-honeydew1 = (240, 255, 240)
-honeydew2 = (224, 238, 224)
-honeydew3 = (193, 205, 193)
-honeydew4 = (131, 139, 131)
-lavenderblush1 = (255, 240, 245)
-lavenderblush2 = (238, 224, 229)
-lavenderblush3 = (205, 193, 197)
-lavenderblush4 = (139, 131, 134)
-mistyrose1 = (255, 228, 225)
-mistyrose2 = (238, 213, 210)
-mistyrose3 = (205, 183, 181)
-mistyrose4 = (139, 125, 123)
-azure1 = (240, 255, 255)
-azure2 = (224, 238, 238)
-azure3 = (193, 205, 205)
-azure4 = (131, 139, 139)
-slateblue1 = (131, 111, 255)
-slateblue2 = (122, 103, 238)
-slateblue3 = (105, 89, 205)
-slateblue4 = (71, 60, 139)
-royalblue1 = (72, 118, 255)
-royalblue2 = (67, 110, 238)
-royalblue3 = (58, 95, 205)
-royalblue4 = (39, 64, 139)
-blue1 = (0, 0, 255)
-blue2 = (0, 0, 238)
-blue3 = (0, 0, 205)
-blue4 = (0, 0, 139)
-dodgerblue1 = (30, 144, 255)
-dodgerblue2 = (28, 134, 238)
-dodgerblue3 = (24, 116, 205)
-dodgerblue4 = (16, 78, 139)
-steelblue1 = (99, 184, 255)
-steelblue2 = (92, 172, 238)
-steelblue3 = (79, 148, 205)
-steelblue4 = (54, 100, 139)
-deepskyblue1 = (0, 191, 255)
-deepskyblue2 = (0, 178, 238)
-deepskyblue3 = (0, 154, 205)
-deepskyblue4 = (0, 104, 139)
-skyblue1 = (135, 206, 255)
-skyblue2 = (126, 192, 238)
-skyblue3 = (108, 166, 205)
-skyblue4 = (74, 112, 139)
-lightskyblue1 = (176, 226, 255)
-lightskyblue2 = (164, 211, 238)
-lightskyblue3 = (141, 182, 205)
-lightskyblue4 = (96, 123, 139)
-slategray1 = (198, 226, 255)
-slategray2 = (185, 211, 238)
-slategray3 = (159, 182, 205)
-slategray4 = (108, 123, 139)
-lightsteelblue1 = (202, 225, 255)
-lightsteelblue2 = (188, 210, 238)
-lightsteelblue3 = (162, 181, 205)
-lightsteelblue4 = (110, 123, 139)
-lightblue1 = (191, 239, 255)
-lightblue2 = (178, 223, 238)
-lightblue3 = (154, 192, 205)
-lightblue4 = (104, 131, 139)
-lightcyan1 = (224, 255, 255)
-lightcyan2 = (209, 238, 238)
-lightcyan3 = (180, 205, 205)
-lightcyan4 = (122, 139, 139)
-paleturquoise1 = (187, 255, 255)
-paleturquoise2 = (174, 238, 238)
-paleturquoise3 = (150, 205, 205)
-paleturquoise4 = (102, 139, 139)
-cadetblue1 = (152, 245, 255)
-cadetblue2 = (142, 229, 238)
-cadetblue3 = (122, 197, 205)
-cadetblue4 = (83, 134, 139)
-turquoise1 = (0, 245, 255)
-turquoise2 = (0, 229, 238)
-turquoise3 = (0, 197, 205)
-turquoise4 = (0, 134, 139)
-cyan1 = (0, 255, 255)
-cyan2 = (0, 238, 238)
-cyan3 = (0, 205, 205)
-cyan4 = (0, 139, 139)
-darkslategray1 = (151, 255, 255)
-darkslategray2 = (141, 238, 238)
-darkslategray3 = (121, 205, 205)
-darkslategray4 = (82, 139, 139)
-aquamarine1 = (127, 255, 212)
-aquamarine2 = (118, 238, 198)
-aquamarine3 = (102, 205, 170)
-aquamarine4 = (69, 139, 116)
-darkseagreen1 = (193, 255, 193)
-darkseagreen2 = (180, 238, 180)
-darkseagreen3 = (155, 205, 155)
-darkseagreen4 = (105, 139, 105)
-seagreen1 = (84, 255, 159)
-seagreen2 = (78, 238, 148)
-seagreen3 = (67, 205, 128)
-seagreen4 = (46, 139, 87)
-palegreen1 = (154, 255, 154)
-palegreen2 = (144, 238, 144)
-palegreen3 = (124, 205, 124)
-palegreen4 = (84, 139, 84)
-springgreen1 = (0, 255, 127)
-springgreen2 = (0, 238, 118)
-springgreen3 = (0, 205, 102)
-springgreen4 = (0, 139, 69)
-green1 = (0, 255, 0)
-green2 = (0, 238, 0)
-green3 = (0, 205, 0)
-green4 = (0, 139, 0)
-chartreuse1 = (127, 255, 0)
-chartreuse2 = (118, 238, 0)
-chartreuse3 = (102, 205, 0)
-chartreuse4 = (69, 139, 0)
-olivedrab1 = (192, 255, 62)
-olivedrab2 = (179, 238, 58)
-olivedrab3 = (154, 205, 50)
-olivedrab4 = (105, 139, 34)
-darkolivegreen1 = (202, 255, 112)
-darkolivegreen2 = (188, 238, 104)
-darkolivegreen3 = (162, 205, 90)
-darkolivegreen4 = (110, 139, 61)
-khaki1 = (255, 246, 143)
-khaki2 = (238, 230, 133)
-khaki3 = (205, 198, 115)
-khaki4 = (139, 134, 78)
-lightgoldenrod1 = (255, 236, 139)
-lightgoldenrod2 = (238, 220, 130)
-lightgoldenrod3 = (205, 190, 112)
-lightgoldenrod4 = (139, 129, 76)
-lightyellow1 = (255, 255, 224)
-lightyellow2 = (238, 238, 209)
-lightyellow3 = (205, 205, 180)
-lightyellow4 = (139, 139, 122)
-yellow1 = (255, 255, 0)
-yellow2 = (238, 238, 0)
-yellow3 = (205, 205, 0)
-yellow4 = (139, 139, 0)
-gold1 = (255, 215, 0)
-gold2 = (238, 201, 0)
-gold3 = (205, 173, 0)
-gold4 = (139, 117, 0)
-goldenrod1 = (255, 193, 37)
-goldenrod2 = (238, 180, 34)
-goldenrod3 = (205, 155, 29)
-goldenrod4 = (139, 105, 20)
-darkgoldenrod1 = (255, 185, 15)
-darkgoldenrod2 = (238, 173, 14)
-darkgoldenrod3 = (205, 149, 12)
-darkgoldenrod4 = (139, 101, 8)
-rosybrown1 = (255, 193, 193)
-rosybrown2 = (238, 180, 180)
-rosybrown3 = (205, 155, 155)
-rosybrown4 = (139, 105, 105)
-indianred1 = (255, 106, 106)
-indianred2 = (238, 99, 99)
-indianred3 = (205, 85, 85)
-indianred4 = (139, 58, 58)
-sienna1 = (255, 130, 71)
-sienna2 = (238, 121, 66)
-sienna3 = (205, 104, 57)
-sienna4 = (139, 71, 38)
-burlywood1 = (255, 211, 155)
-burlywood2 = (238, 197, 145)
-burlywood3 = (205, 170, 125)
-burlywood4 = (139, 115, 85)
-wheat1 = (255, 231, 186)
-wheat2 = (238, 216, 174)
-wheat3 = (205, 186, 150)
-wheat4 = (139, 126, 102)
-tan1 = (255, 165, 79)
-tan2 = (238, 154, 73)
-tan3 = (205, 133, 63)
-tan4 = (139, 90, 43)
-chocolate1 = (255, 127, 36)
-chocolate2 = (238, 118, 33)
-chocolate3 = (205, 102, 29)
-chocolate4 = (139, 69, 19)
-firebrick1 = (255, 48, 48)
-firebrick2 = (238, 44, 44)
-firebrick3 = (205, 38, 38)
-firebrick4 = (139, 26, 26)
-brown1 = (255, 64, 64)
-brown2 = (238, 59, 59)
-brown3 = (205, 51, 51)
-brown4 = (139, 35, 35)
-salmon1 = (255, 140, 105)
-salmon2 = (238, 130, 98)
-salmon3 = (205, 112, 84)
-salmon4 = (139, 76, 57)
-lightsalmon1 = (255, 160, 122)
-lightsalmon2 = (238, 149, 114)
-lightsalmon3 = (205, 129, 98)
-lightsalmon4 = (139, 87, 66)
-orange1 = (255, 165, 0)
-orange2 = (238, 154, 0)
-orange3 = (205, 133, 0)
-orange4 = (139, 90, 0)
-darkorange1 = (255, 127, 0)
-darkorange2 = (238, 118, 0)
-darkorange3 = (205, 102, 0)
-darkorange4 = (139, 69, 0)
-coral1 = (255, 114, 86)
-coral2 = (238, 106, 80)
-coral3 = (205, 91, 69)
-coral4 = (139, 62, 47)
-tomato1 = (255, 99, 71)
-tomato2 = (238, 92, 66)
-tomato3 = (205, 79, 57)
-tomato4 = (139, 54, 38)
-orangered1 = (255, 69, 0)
-orangered2 = (238, 64, 0)
-orangered3 = (205, 55, 0)
-orangered4 = (139, 37, 0)
-red1 = (255, 0, 0)
-red2 = (238, 0, 0)
-red3 = (205, 0, 0)
-red4 = (139, 0, 0)
-debianred = (215, 7, 81)
-deeppink1 = (255, 20, 147)
-deeppink2 = (238, 18, 137)
-deeppink3 = (205, 16, 118)
-deeppink4 = (139, 10, 80)
-hotpink1 = (255, 110, 180)
-hotpink2 = (238, 106, 167)
-hotpink3 = (205, 96, 144)
-hotpink4 = (139, 58, 98)
-pink1 = (255, 181, 197)
-pink2 = (238, 169, 184)
-pink3 = (205, 145, 158)
-pink4 = (139, 99, 108)
-lightpink1 = (255, 174, 185)
-lightpink2 = (238, 162, 173)
-lightpink3 = (205, 140, 149)
-lightpink4 = (139, 95, 101)
-palevioletred1 = (255, 130, 171)
-palevioletred2 = (238, 121, 159)
-palevioletred3 = (205, 104, 137)
-palevioletred4 = (139, 71, 93)
-maroon1 = (255, 52, 179)
-maroon2 = (238, 48, 167)
-maroon3 = (205, 41, 144)
-maroon4 = (139, 28, 98)
-violetred1 = (255, 62, 150)
-violetred2 = (238, 58, 140)
-violetred3 = (205, 50, 120)
-violetred4 = (139, 34, 82)
-magenta1 = (255, 0, 255)
-magenta2 = (238, 0, 238)
-magenta3 = (205, 0, 205)
-magenta4 = (139, 0, 139)
-orchid1 = (255, 131, 250)
-orchid2 = (238, 122, 233)
-orchid3 = (205, 105, 201)
-orchid4 = (139, 71, 137)
-plum1 = (255, 187, 255)
-plum2 = (238, 174, 238)
-plum3 = (205, 150, 205)
-plum4 = (139, 102, 139)
-mediumorchid1 = (224, 102, 255)
-mediumorchid2 = (209, 95, 238)
-mediumorchid3 = (180, 82, 205)
-mediumorchid4 = (122, 55, 139)
-darkorchid1 = (191, 62, 255)
-darkorchid2 = (178, 58, 238)
-darkorchid3 = (154, 50, 205)
-darkorchid4 = (104, 34, 139)
-purple1 = (155, 48, 255)
-purple2 = (145, 44, 238)
-purple3 = (125, 38, 205)
-purple4 = (85, 26, 139)
-mediumpurple1 = (171, 130, 255)
-mediumpurple2 = (159, 121, 238)
-mediumpurple3 = (137, 104, 205)
-mediumpurple4 = (93, 71, 139)
-thistle1 = (255, 225, 255)
-thistle2 = (238, 210, 238)
-thistle3 = (205, 181, 205)
-thistle4 = (139, 123, 139)
-gray0 = (0, 0, 0)
-grey0 = (0, 0, 0)
-gray1 = (3, 3, 3)
-grey1 = (3, 3, 3)
-gray2 = (5, 5, 5)
-grey2 = (5, 5, 5)
-gray3 = (8, 8, 8)
-grey3 = (8, 8, 8)
-gray4 = (10, 10, 10)
-grey4 = (10, 10, 10)
-gray5 = (13, 13, 13)
-grey5 = (13, 13, 13)
-gray6 = (15, 15, 15)
-grey6 = (15, 15, 15)
-gray7 = (18, 18, 18)
-grey7 = (18, 18, 18)
-gray8 = (20, 20, 20)
-grey8 = (20, 20, 20)
-gray9 = (23, 23, 23)
-grey9 = (23, 23, 23)
-gray10 = (26, 26, 26)
-grey10 = (26, 26, 26)
-gray11 = (28, 28, 28)
-grey11 = (28, 28, 28)
-gray12 = (31, 31, 31)
-grey12 = (31, 31, 31)
-gray13 = (33, 33, 33)
-grey13 = (33, 33, 33)
-gray14 = (36, 36, 36)
-grey14 = (36, 36, 36)
-gray15 = (38, 38, 38)
-grey15 = (38, 38, 38)
-gray16 = (41, 41, 41)
-grey16 = (41, 41, 41)
-gray17 = (43, 43, 43)
-grey17 = (43, 43, 43)
-gray18 = (46, 46, 46)
-grey18 = (46, 46, 46)
-gray19 = (48, 48, 48)
-grey19 = (48, 48, 48)
-gray20 = (51, 51, 51)
-grey20 = (51, 51, 51)
-gray21 = (54, 54, 54)
-grey21 = (54, 54, 54)
-gray22 = (56, 56, 56)
-grey22 = (56, 56, 56)
-gray23 = (59, 59, 59)
-grey23 = (59, 59, 59)
-gray24 = (61, 61, 61)
-grey24 = (61, 61, 61)
-gray25 = (64, 64, 64)
-grey25 = (64, 64, 64)
-gray26 = (66, 66, 66)
-grey26 = (66, 66, 66)
-gray27 = (69, 69, 69)
-grey27 = (69, 69, 69)
-gray28 = (71, 71, 71)
-grey28 = (71, 71, 71)
-gray29 = (74, 74, 74)
-grey29 = (74, 74, 74)
-gray30 = (77, 77, 77)
-grey30 = (77, 77, 77)
-gray31 = (79, 79, 79)
-grey31 = (79, 79, 79)
-gray32 = (82, 82, 82)
-grey32 = (82, 82, 82)
-gray33 = (84, 84, 84)
-grey33 = (84, 84, 84)
-gray34 = (87, 87, 87)
-grey34 = (87, 87, 87)
-gray35 = (89, 89, 89)
-grey35 = (89, 89, 89)
-gray36 = (92, 92, 92)
-grey36 = (92, 92, 92)
-gray37 = (94, 94, 94)
-grey37 = (94, 94, 94)
-gray38 = (97, 97, 97)
-grey38 = (97, 97, 97)
-gray39 = (99, 99, 99)
-grey39 = (99, 99, 99)
-gray40 = (102, 102, 102)
-grey40 = (102, 102, 102)
-gray41 = (105, 105, 105)
-grey41 = (105, 105, 105)
-gray42 = (107, 107, 107)
-grey42 = (107, 107, 107)
-gray43 = (110, 110, 110)
-grey43 = (110, 110, 110)
-gray44 = (112, 112, 112)
-grey44 = (112, 112, 112)
-gray45 = (115, 115, 115)
-grey45 = (115, 115, 115)
-gray46 = (117, 117, 117)
-grey46 = (117, 117, 117)
-gray47 = (120, 120, 120)
-grey47 = (120, 120, 120)
-gray48 = (122, 122, 122)
-grey48 = (122, 122, 122)
-gray49 = (125, 125, 125)
-grey49 = (125, 125, 125)
-gray50 = (127, 127, 127)
-grey50 = (127, 127, 127)
-gray51 = (130, 130, 130)
-grey51 = (130, 130, 130)
-gray52 = (133, 133, 133)
-grey52 = (133, 133, 133)
-gray53 = (135, 135, 135)
-grey53 = (135, 135, 135)
-gray54 = (138, 138, 138)
-grey54 = (138, 138, 138)
-gray55 = (140, 140, 140)
-grey55 = (140, 140, 140)
-gray56 = (143, 143, 143)
-grey56 = (143, 143, 143)
-gray57 = (145, 145, 145)
-grey57 = (145, 145, 145)
-gray58 = (148, 148, 148)
-grey58 = (148, 148, 148)
-gray59 = (150, 150, 150)
-grey59 = (150, 150, 150)
-gray60 = (153, 153, 153)
-grey60 = (153, 153, 153)
-gray61 = (156, 156, 156)
-grey61 = (156, 156, 156)
-gray62 = (158, 158, 158)
-grey62 = (158, 158, 158)
-gray63 = (161, 161, 161)
-grey63 = (161, 161, 161)
-gray64 = (163, 163, 163)
-grey64 = (163, 163, 163)
-gray65 = (166, 166, 166)
-grey65 = (166, 166, 166)
-gray66 = (168, 168, 168)
-grey66 = (168, 168, 168)
-gray67 = (171, 171, 171)
-grey67 = (171, 171, 171)
-gray68 = (173, 173, 173)
-grey68 = (173, 173, 173)
-gray69 = (176, 176, 176)
-grey69 = (176, 176, 176)
-gray70 = (179, 179, 179)
-grey70 = (179, 179, 179)
-gray71 = (181, 181, 181)
-grey71 = (181, 181, 181)
-gray72 = (184, 184, 184)
-grey72 = (184, 184, 184)
-gray73 = (186, 186, 186)
-grey73 = (186, 186, 186)
-gray74 = (189, 189, 189)
-grey74 = (189, 189, 189)
-gray75 = (191, 191, 191)
-grey75 = (191, 191, 191)
-gray76 = (194, 194, 194)
-grey76 = (194, 194, 194)
-gray77 = (196, 196, 196)
-grey77 = (196, 196, 196)
-gray78 = (199, 199, 199)
-grey78 = (199, 199, 199)
-gray79 = (201, 201, 201)
-grey79 = (201, 201, 201)
-gray80 = (204, 204, 204)
-grey80 = (204, 204, 204)
-gray81 = (207, 207, 207)
-grey81 = (207, 207, 207)
-gray82 = (209, 209, 209)
-grey82 = (209, 209, 209)
-gray83 = (212, 212, 212)
-grey83 = (212, 212, 212)
-gray84 = (214, 214, 214)
-grey84 = (214, 214, 214)
-gray85 = (217, 217, 217)
-grey85 = (217, 217, 217)
-gray86 = (219, 219, 219)
-grey86 = (219, 219, 219)
-gray87 = (222, 222, 222)
-grey87 = (222, 222, 222)
-gray88 = (224, 224, 224)
-grey88 = (224, 224, 224)
-gray89 = (227, 227, 227)
-grey89 = (227, 227, 227)
-gray90 = (229, 229, 229)
-grey90 = (229, 229, 229)
-gray91 = (232, 232, 232)
-grey91 = (232, 232, 232)
-gray92 = (235, 235, 235)
-grey92 = (235, 235, 235)
-gray93 = (237, 237, 237)
-grey93 = (237, 237, 237)
-gray94 = (240, 240, 240)
-grey94 = (240, 240, 240)
-gray95 = (242, 242, 242)
-grey95 = (242, 242, 242)
-gray96 = (245, 245, 245)
-grey96 = (245, 245, 245)
-gray97 = (247, 247, 247)
-grey97 = (247, 247, 247)
-gray98 = (250, 250, 250)
-grey98 = (250, 250, 250)
-gray99 = (252, 252, 252)
-grey99 = (252, 252, 252)
-gray100 = (255, 255, 255)
-grey100 = (255, 255, 255)
-dark_grey = (169, 169, 169)
-darkgrey = (169, 169, 169)
-dark_gray = (169, 169, 169)
-darkgray = (169, 169, 169)
-dark_blue = (0, 0, 139)
-darkblue = (0, 0, 139)
-dark_cyan = (0, 139, 139)
-darkcyan = (0, 139, 139)
-dark_magenta = (139, 0, 139)
-darkmagenta = (139, 0, 139)
-dark_red = (139, 0, 0)
-darkred = (139, 0, 0)
-light_green = (144, 238, 144)
-lightgreen = (144, 238, 144)
+_TABLE = """
+snow:fffafa ghost_white:f8f8ff white_smoke:f5f5f5 gainsboro:dcdcdc
+floral_white:fffaf0 old_lace:fdf5e6 linen:faf0e6 antique_white:faebd7
+papaya_whip:ffefd5 blanched_almond:ffebcd bisque:ffe4c4 peach_puff:ffdab9
+navajo_white:ffdead moccasin:ffe4b5 cornsilk:fff8dc ivory:fffff0
+lemon_chiffon:fffacd seashell:fff5ee honeydew:f0fff0 mint_cream:f5fffa
+azure:f0ffff alice_blue:f0f8ff lavender:e6e6fa lavender_blush:fff0f5
+misty_rose:ffe4e1 white:ffffff black:000000 dark_slate_gray:2f4f4f
+dark_slate_grey:2f4f4f dim_gray:696969 dim_grey:696969 slate_gray:708090
+slate_grey:708090 light_slate_gray:778899 light_slate_grey:778899
+gray:bebebe grey:bebebe light_grey:d3d3d3 light_gray:d3d3d3
+midnight_blue:191970 navy:000080 navy_blue:000080 cornflower_blue:6495ed
+dark_slate_blue:483d8b slate_blue:6a5acd medium_slate_blue:7b68ee
+light_slate_blue:8470ff medium_blue:0000cd royal_blue:4169e1 blue:0000ff
+dodger_blue:1e90ff deep_sky_blue:00bfff sky_blue:87ceeb
+light_sky_blue:87cefa steel_blue:4682b4 light_steel_blue:b0c4de
+light_blue:add8e6 powder_blue:b0e0e6 pale_turquoise:afeeee
+dark_turquoise:00ced1 medium_turquoise:48d1cc turquoise:40e0d0 cyan:00ffff
+light_cyan:e0ffff cadet_blue:5f9ea0 medium_aquamarine:66cdaa
+aquamarine:7fffd4 dark_green:006400 dark_olive_green:556b2f
+dark_sea_green:8fbc8f sea_green:2e8b57 medium_sea_green:3cb371
+light_sea_green:20b2aa pale_green:98fb98 spring_green:00ff7f
+lawn_green:7cfc00 green:00ff00 chartreuse:7fff00
+medium_spring_green:00fa9a green_yellow:adff2f lime_green:32cd32
+yellow_green:9acd32 forest_green:228b22 olive_drab:6b8e23
+dark_khaki:bdb76b khaki:f0e68c pale_goldenrod:eee8aa
+light_goldenrod_yellow:fafad2 light_yellow:ffffe0 yellow:ffff00
+gold:ffd700 light_goldenrod:eedd82 goldenrod:daa520 dark_goldenrod:b8860b
+rosy_brown:bc8f8f indian_red:cd5c5c saddle_brown:8b4513 sienna:a0522d
+peru:cd853f burlywood:deb887 beige:f5f5dc wheat:f5deb3 sandy_brown:f4a460
+tan:d2b48c chocolate:d2691e firebrick:b22222 brown:a52a2a
+dark_salmon:e9967a salmon:fa8072 light_salmon:ffa07a orange:ffa500
+dark_orange:ff8c00 coral:ff7f50 light_coral:f08080 tomato:ff6347
+orange_red:ff4500 red:ff0000 hot_pink:ff69b4 deep_pink:ff1493 pink:ffc0cb
+light_pink:ffb6c1 pale_violet_red:db7093 maroon:b03060
+medium_violet_red:c71585 violet_red:d02090 magenta:ff00ff violet:ee82ee
+plum:dda0dd orchid:da70d6 medium_orchid:ba55d3 dark_orchid:9932cc
+dark_violet:9400d3 blue_violet:8a2be2 purple:a020f0 medium_purple:9370db
+thistle:d8bfd8 snow1:fffafa snow2:eee9e9 snow3:cdc9c9 snow4:8b8989
+seashell1:fff5ee seashell2:eee5de seashell3:cdc5bf seashell4:8b8682
+antiquewhite1:ffefdb antiquewhite2:eedfcc antiquewhite3:cdc0b0
+antiquewhite4:8b8378 bisque1:ffe4c4 bisque2:eed5b7 bisque3:cdb79e
+bisque4:8b7d6b peachpuff1:ffdab9 peachpuff2:eecbad peachpuff3:cdaf95
+peachpuff4:8b7765 navajowhite1:ffdead navajowhite2:eecfa1
+navajowhite3:cdb38b navajowhite4:8b795e lemonchiffon1:fffacd
+lemonchiffon2:eee9bf lemonchiffon3:cdc9a5 lemonchiffon4:8b8970
+cornsilk1:fff8dc cornsilk2:eee8cd cornsilk3:cdc8b1 cornsilk4:8b8878
+ivory1:fffff0 ivory2:eeeee0 ivory3:cdcdc1 ivory4:8b8b83 honeydew1:f0fff0
+honeydew2:e0eee0 honeydew3:c1cdc1 honeydew4:838b83 lavenderblush1:fff0f5
+lavenderblush2:eee0e5 lavenderblush3:cdc1c5 lavenderblush4:8b8386
+mistyrose1:ffe4e1 mistyrose2:eed5d2 mistyrose3:cdb7b5 mistyrose4:8b7d7b
+azure1:f0ffff azure2:e0eeee azure3:c1cdcd azure4:838b8b slateblue1:836fff
+slateblue2:7a67ee slateblue3:6959cd slateblue4:473c8b royalblue1:4876ff
+royalblue2:436eee royalblue3:3a5fcd royalblue4:27408b blue1:0000ff
+blue2:0000ee blue3:0000cd blue4:00008b dodgerblue1:1e90ff
+dodgerblue2:1c86ee dodgerblue3:1874cd dodgerblue4:104e8b steelblue1:63b8ff
+steelblue2:5cacee steelblue3:4f94cd steelblue4:36648b deepskyblue1:00bfff
+deepskyblue2:00b2ee deepskyblue3:009acd deepskyblue4:00688b
+skyblue1:87ceff skyblue2:7ec0ee skyblue3:6ca6cd skyblue4:4a708b
+lightskyblue1:b0e2ff lightskyblue2:a4d3ee lightskyblue3:8db6cd
+lightskyblue4:607b8b slategray1:c6e2ff slategray2:b9d3ee slategray3:9fb6cd
+slategray4:6c7b8b lightsteelblue1:cae1ff lightsteelblue2:bcd2ee
+lightsteelblue3:a2b5cd lightsteelblue4:6e7b8b lightblue1:bfefff
+lightblue2:b2dfee lightblue3:9ac0cd lightblue4:68838b lightcyan1:e0ffff
+lightcyan2:d1eeee lightcyan3:b4cdcd lightcyan4:7a8b8b
+paleturquoise1:bbffff paleturquoise2:aeeeee paleturquoise3:96cdcd
+paleturquoise4:668b8b cadetblue1:98f5ff cadetblue2:8ee5ee
+cadetblue3:7ac5cd cadetblue4:53868b turquoise1:00f5ff turquoise2:00e5ee
+turquoise3:00c5cd turquoise4:00868b cyan1:00ffff cyan2:00eeee cyan3:00cdcd
+cyan4:008b8b darkslategray1:97ffff darkslategray2:8deeee
+darkslategray3:79cdcd darkslategray4:528b8b aquamarine1:7fffd4
+aquamarine2:76eec6 aquamarine3:66cdaa aquamarine4:458b74
+darkseagreen1:c1ffc1 darkseagreen2:b4eeb4 darkseagreen3:9bcd9b
+darkseagreen4:698b69 seagreen1:54ff9f seagreen2:4eee94 seagreen3:43cd80
+seagreen4:2e8b57 palegreen1:9aff9a palegreen2:90ee90 palegreen3:7ccd7c
+palegreen4:548b54 springgreen1:00ff7f springgreen2:00ee76
+springgreen3:00cd66 springgreen4:008b45 green1:00ff00 green2:00ee00
+green3:00cd00 green4:008b00 chartreuse1:7fff00 chartreuse2:76ee00
+chartreuse3:66cd00 chartreuse4:458b00 olivedrab1:c0ff3e olivedrab2:b3ee3a
+olivedrab3:9acd32 olivedrab4:698b22 darkolivegreen1:caff70
+darkolivegreen2:bcee68 darkolivegreen3:a2cd5a darkolivegreen4:6e8b3d
+khaki1:fff68f khaki2:eee685 khaki3:cdc673 khaki4:8b864e
+lightgoldenrod1:ffec8b lightgoldenrod2:eedc82 lightgoldenrod3:cdbe70
+lightgoldenrod4:8b814c lightyellow1:ffffe0 lightyellow2:eeeed1
+lightyellow3:cdcdb4 lightyellow4:8b8b7a yellow1:ffff00 yellow2:eeee00
+yellow3:cdcd00 yellow4:8b8b00 gold1:ffd700 gold2:eec900 gold3:cdad00
+gold4:8b7500 goldenrod1:ffc125 goldenrod2:eeb422 goldenrod3:cd9b1d
+goldenrod4:8b6914 darkgoldenrod1:ffb90f darkgoldenrod2:eead0e
+darkgoldenrod3:cd950c darkgoldenrod4:8b6508 rosybrown1:ffc1c1
+rosybrown2:eeb4b4 rosybrown3:cd9b9b rosybrown4:8b6969 indianred1:ff6a6a
+indianred2:ee6363 indianred3:cd5555 indianred4:8b3a3a sienna1:ff8247
+sienna2:ee7942 sienna3:cd6839 sienna4:8b4726 burlywood1:ffd39b
+burlywood2:eec591 burlywood3:cdaa7d burlywood4:8b7355 wheat1:ffe7ba
+wheat2:eed8ae wheat3:cdba96 wheat4:8b7e66 tan1:ffa54f tan2:ee9a49
+tan3:cd853f tan4:8b5a2b chocolate1:ff7f24 chocolate2:ee7621
+chocolate3:cd661d chocolate4:8b4513 firebrick1:ff3030 firebrick2:ee2c2c
+firebrick3:cd2626 firebrick4:8b1a1a brown1:ff4040 brown2:ee3b3b
+brown3:cd3333 brown4:8b2323 salmon1:ff8c69 salmon2:ee8262 salmon3:cd7054
+salmon4:8b4c39 lightsalmon1:ffa07a lightsalmon2:ee9572 lightsalmon3:cd8162
+lightsalmon4:8b5742 orange1:ffa500 orange2:ee9a00 orange3:cd8500
+orange4:8b5a00 darkorange1:ff7f00 darkorange2:ee7600 darkorange3:cd6600
+darkorange4:8b4500 coral1:ff7256 coral2:ee6a50 coral3:cd5b45 coral4:8b3e2f
+tomato1:ff6347 tomato2:ee5c42 tomato3:cd4f39 tomato4:8b3626
+orangered1:ff4500 orangered2:ee4000 orangered3:cd3700 orangered4:8b2500
+red1:ff0000 red2:ee0000 red3:cd0000 red4:8b0000 debianred:d70751
+deeppink1:ff1493 deeppink2:ee1289 deeppink3:cd1076 deeppink4:8b0a50
+hotpink1:ff6eb4 hotpink2:ee6aa7 hotpink3:cd6090 hotpink4:8b3a62
+pink1:ffb5c5 pink2:eea9b8 pink3:cd919e pink4:8b636c lightpink1:ffaeb9
+lightpink2:eea2ad lightpink3:cd8c95 lightpink4:8b5f65
+palevioletred1:ff82ab palevioletred2:ee799f palevioletred3:cd6889
+palevioletred4:8b475d maroon1:ff34b3 maroon2:ee30a7 maroon3:cd2990
+maroon4:8b1c62 violetred1:ff3e96 violetred2:ee3a8c violetred3:cd3278
+violetred4:8b2252 magenta1:ff00ff magenta2:ee00ee magenta3:cd00cd
+magenta4:8b008b orchid1:ff83fa orchid2:ee7ae9 orchid3:cd69c9
+orchid4:8b4789 plum1:ffbbff plum2:eeaeee plum3:cd96cd plum4:8b668b
+mediumorchid1:e066ff mediumorchid2:d15fee mediumorchid3:b452cd
+mediumorchid4:7a378b darkorchid1:bf3eff darkorchid2:b23aee
+darkorchid3:9a32cd darkorchid4:68228b purple1:9b30ff purple2:912cee
+purple3:7d26cd purple4:551a8b mediumpurple1:ab82ff mediumpurple2:9f79ee
+mediumpurple3:8968cd mediumpurple4:5d478b thistle1:ffe1ff thistle2:eed2ee
+thistle3:cdb5cd thistle4:8b7b8b gray0:000000 grey0:000000 gray1:030303
+grey1:030303 gray2:050505 grey2:050505 gray3:080808 grey3:080808
+gray4:0a0a0a grey4:0a0a0a gray5:0d0d0d grey5:0d0d0d gray6:0f0f0f
+grey6:0f0f0f gray7:121212 grey7:121212 gray8:141414 grey8:141414
+gray9:171717 grey9:171717 gray10:1a1a1a grey10:1a1a1a gray11:1c1c1c
+grey11:1c1c1c gray12:1f1f1f grey12:1f1f1f gray13:212121 grey13:212121
+gray14:242424 grey14:242424 gray15:262626 grey15:262626 gray16:292929
+grey16:292929 gray17:2b2b2b grey17:2b2b2b gray18:2e2e2e grey18:2e2e2e
+gray19:303030 grey19:303030 gray20:333333 grey20:333333 gray21:363636
+grey21:363636 gray22:383838 grey22:383838 gray23:3b3b3b grey23:3b3b3b
+gray24:3d3d3d grey24:3d3d3d gray25:404040 grey25:404040 gray26:424242
+grey26:424242 gray27:454545 grey27:454545 gray28:474747 grey28:474747
+gray29:4a4a4a grey29:4a4a4a gray30:4d4d4d grey30:4d4d4d gray31:4f4f4f
+grey31:4f4f4f gray32:525252 grey32:525252 gray33:545454 grey33:545454
+gray34:575757 grey34:575757 gray35:595959 grey35:595959 gray36:5c5c5c
+grey36:5c5c5c gray37:5e5e5e grey37:5e5e5e gray38:616161 grey38:616161
+gray39:636363 grey39:636363 gray40:666666 grey40:666666 gray41:696969
+grey41:696969 gray42:6b6b6b grey42:6b6b6b gray43:6e6e6e grey43:6e6e6e
+gray44:707070 grey44:707070 gray45:737373 grey45:737373 gray46:757575
+grey46:757575 gray47:787878 grey47:787878 gray48:7a7a7a grey48:7a7a7a
+gray49:7d7d7d grey49:7d7d7d gray50:7f7f7f grey50:7f7f7f gray51:828282
+grey51:828282 gray52:858585 grey52:858585 gray53:878787 grey53:878787
+gray54:8a8a8a grey54:8a8a8a gray55:8c8c8c grey55:8c8c8c gray56:8f8f8f
+grey56:8f8f8f gray57:919191 grey57:919191 gray58:949494 grey58:949494
+gray59:969696 grey59:969696 gray60:999999 grey60:999999 gray61:9c9c9c
+grey61:9c9c9c gray62:9e9e9e grey62:9e9e9e gray63:a1a1a1 grey63:a1a1a1
+gray64:a3a3a3 grey64:a3a3a3 gray65:a6a6a6 grey65:a6a6a6 gray66:a8a8a8
+grey66:a8a8a8 gray67:ababab grey67:ababab gray68:adadad grey68:adadad
+gray69:b0b0b0 grey69:b0b0b0 gray70:b3b3b3 grey70:b3b3b3 gray71:b5b5b5
+grey71:b5b5b5 gray72:b8b8b8 grey72:b8b8b8 gray73:bababa grey73:bababa
+gray74:bdbdbd grey74:bdbdbd gray75:bfbfbf grey75:bfbfbf gray76:c2c2c2
+grey76:c2c2c2 gray77:c4c4c4 grey77:c4c4c4 gray78:c7c7c7 grey78:c7c7c7
+gray79:c9c9c9 grey79:c9c9c9 gray80:cccccc grey80:cccccc gray81:cfcfcf
+grey81:cfcfcf gray82:d1d1d1 grey82:d1d1d1 gray83:d4d4d4 grey83:d4d4d4
+gray84:d6d6d6 grey84:d6d6d6 gray85:d9d9d9 grey85:d9d9d9 gray86:dbdbdb
+grey86:dbdbdb gray87:dedede grey87:dedede gray88:e0e0e0 grey88:e0e0e0
+gray89:e3e3e3 grey89:e3e3e3 gray90:e5e5e5 grey90:e5e5e5 gray91:e8e8e8
+grey91:e8e8e8 gray92:ebebeb grey92:ebebeb gray93:ededed grey93:ededed
+gray94:f0f0f0 grey94:f0f0f0 gray95:f2f2f2 grey95:f2f2f2 gray96:f5f5f5
+grey96:f5f5f5 gray97:f7f7f7 grey97:f7f7f7 gray98:fafafa grey98:fafafa
+gray99:fcfcfc grey99:fcfcfc gray100:ffffff grey100:ffffff dark_grey:a9a9a9
+dark_gray:a9a9a9 dark_blue:00008b dark_cyan:008b8b dark_magenta:8b008b
+dark_red:8b0000 light_green:90ee90
+"""
+
+# Canonical names, the squashed name to index map and the packed RGB
+# bytes, built from _TABLE on the first lookup.
+_names = None
+_index = None
+_rgb = None
+
+
+def _build_index():
+    """Parse _TABLE into the name index and the packed RGB bytes."""
+    global _names, _index, _rgb
+    names = []
+    rgb = bytearray()
+    for entry in _TABLE.split():
+        (name, hex_rgb) = entry.split(':')
+        names.append(name)
+        rgb += bytes.fromhex(hex_rgb)
+    _names = tuple(names)
+    _index = {name.replace('_', ''): index for (index, name) in enumerate(names)}
+    _rgb = bytes(rgb)
+
+
+def lookup(name):
+    """Return the RGB tuple for a color name, or None if there is none.
+
+    Names match as written in the table or with every underscore removed.
+    """
+    if _index is None:
+        _build_index()
+    index = _index.get(name.replace('_', ''))
+    if index is None or ('_' in name and _names[index] != name):
+        return None
+    offset = 3 * index
+    return tuple(_rgb[offset:offset + 3])
+
+
+def names():
+    """Return every color name, with and without underscores."""
+    if _names is None:
+        _build_index()
+    squashed = [name.replace('_', '') for name in _names if '_' in name]
+    return _names + tuple(squashed)
+
+
+def __getattr__(name):
+    """Resolve a color the first time it is used and keep it as an
+    attribute, so later uses are plain attribute lookups."""
+    if name.startswith('__'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    color = lookup(name)
+    if color is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = color
+    return color
+
+
+def __dir__():
+    return sorted(set(globals()) | set(names()))
@@ -9,12 +9,17 @@
 
 """Scene objects for making games with PyGame."""
 
-import random
 import pygame
 import assets
+import audio
 import player
+import pools
 import rgbcolors
 import animation
+import projectile
+import simulation
+import sprites
+import text
 
 # If you're interested in using abstract base classes, feel free to rewrite
 # these classes.
@@ -23,11 +28,23 @@ import animation
 
 
 class SceneManager:
-    """Class to manage multiple scenes"""
+    """Class to manage multiple scenes
 
-    def __init__(self):
+    Scenes can be added as instances or as factories, callables that
+    build the scene. A factory is only called the first time
+    set_next_scene() targets its scene. Scenes built from a factory are
+    released when the game moves on from them unless their key is in
+    keep_resident; pass None to keep every scene once it is built.
+    """
+
+    def __init__(self, keep_resident=None):
         self._scene_dict = {}
-        self._current_scene = None
+        self._factories = {}
+        self._keep_resident = None
+        if keep_resident is not None:
+            self._keep_resident = set(keep_resident)
+        self._current_key = None
+        self._next_key = None
         self._next_scene = None
         # This is a safety to ensure that calling
         # next() twice in a row without calling set_next_scene()
@@ -36,14 +53,36 @@ class SceneManager:
 
     def set_next_scene(self, key):
         """Sets next scene"""
+        if key not in self._scene_dict:
+            self._scene_dict[key] = self._factories[key]()
+        self._next_key = key
         self._next_scene = self._scene_dict[key]
         self._reloaded = True
 
     def add(self, scene_list):
-        """Adds new scene to list"""
+        """Adds new scenes or scene factories to list"""
         for (index, scene) in enumerate(scene_list):
-            self._scene_dict[str(index)] = scene
-        self._current_scene = self._scene_dict['0']
+            if isinstance(scene, Scene):
+                self._scene_dict[str(index)] = scene
+            else:
+                self._factories[str(index)] = scene
+
+    def is_built(self, key):
+        """Return True if the scene for key is currently built."""
+        return key in self._scene_dict
+
+    def release(self, key):
+        """Release a scene built from a factory; it is rebuilt on next use."""
+        if key in self._factories and key in self._scene_dict:
+            self._scene_dict.pop(key).release()
+
+    def _release_previous(self):
+        """Release the scene being left unless it should stay resident."""
+        key = self._current_key
+        if (key is None or key == self._next_key or
+                self._keep_resident is None or key in self._keep_resident):
+            return
+        self.release(key)
 
     def __iter__(self):
         return self
@@ -51,6 +90,8 @@ class SceneManager:
     def __next__(self):
         if self._next_scene and self._reloaded:
             self._reloaded = False
+            self._release_previous()
+            self._current_key = self._next_key
             return self._next_scene
         else:
             raise StopIteration
@@ -59,19 +100,71 @@ class SceneManager:
 class Scene:
     """Base class for making PyGame Scenes."""
 
+    # Assets decoded when the scene is built; see assets.preload().
+    preload_assets = ()
+
+    # Longest wait, in milliseconds, for an event while the scene is idle.
+    idle_timeout = 1000
+
     def __init__(self, screen, background_color, soundtrack=None):
-        """Scene initializer"""
+        """Scene initializer; soundtrack is the asset key of its music,
+        decoded in the background from when the scene is built."""
+        assets.preload(self.preload_assets)
+        if soundtrack:
+            audio.default_manager().preload([soundtrack])
         self._screen = screen
         self._background = pygame.Surface(self._screen.get_size())
         self._background.fill(background_color)
         self._frame_rate = 60
+        # Milliseconds simulated by one update_scene() call, and how far
+        # the frame being drawn is between the last two updates.
+        self.delta_time = 0
+        self.alpha = 1.0
         self._is_valid = True
         self._soundtrack = soundtrack
         self._render_updates = None
+        self._full_redraw = True
+        self._drawn_rects = []
+        self._last_drawn_rects = []
+        self._dirty_rects = []
 
     def draw(self):
-        """Draw the scene."""
-        self._screen.blit(self._background, (0, 0))
+        """Draw the scene.
+
+        On a full redraw the whole background is copied; otherwise only the
+        areas drawn over on the previous frame are restored.
+        """
+        if self._full_redraw:
+            self._screen.blit(self._background, (0, 0))
+        else:
+            for rect in self._last_drawn_rects:
+                self._screen.blit(self._background, rect, rect)
+            self._dirty_rects.extend(self._last_drawn_rects)
+        self._last_drawn_rects = []
+
+    def mark_drawn(self, rect):
+        """Record an area drawn this frame; it is cleared on the next frame."""
+        self._drawn_rects.append(rect)
+
+    def mark_dirty(self, rect):
+        """Record an area that changed this frame but should not be cleared."""
+        self._dirty_rects.append(rect)
+
+    def invalidate(self):
+        """Force the next frame to redraw and present the whole screen."""
+        self._full_redraw = True
+
+    def dirty_rects(self):
+        """Return the screen areas changed since the last call."""
+        if self._full_redraw:
+            rects = [self._screen.get_rect()]
+        else:
+            rects = self._dirty_rects + self._drawn_rects
+        self._last_drawn_rects = self._drawn_rects
+        self._drawn_rects = []
+        self._dirty_rects = []
+        self._full_redraw = False
+        return rects
 
     def process_event(self, event):
         """Process a game event by the scene."""
@@ -83,6 +176,8 @@ class Scene:
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
             print("Bye bye!")
             self._is_valid = False
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.invalidate()
 
     def is_valid(self):
         """Is the scene valid? A valid scene can be used to play a scene."""
@@ -96,27 +191,37 @@ class Scene:
 
     def start_scene(self):
         """Start the scene."""
+        self.invalidate()
         if self._soundtrack:
-            try:
-                pygame.mixer.music.load(self._soundtrack)
-                pygame.mixer.music.set_volume(0.2)
-            except pygame.error as pygame_error:
-                print("Cannot open the mixer?")
-                print('\n'.join(pygame_error.args))
-                raise SystemExit("broken!!") from pygame_error
-            pygame.mixer.music.play(-1)
+            audio.default_manager().play_music(self._soundtrack)
 
     def end_scene(self):
         """End the scene."""
-        if self._soundtrack and pygame.mixer.music.get_busy():
-            # Fade music out so there isn't an audible pop
-            pygame.mixer.music.fadeout(500)
-            pygame.mixer.music.stop()
+        if self._soundtrack:
+            # Fade music out so there isn't an audible pop; the next
+            # scene's track fades in over it.
+            audio.default_manager().stop_music()
 
     def frame_rate(self):
         """Return the frame rate the scene desires."""
         return self._frame_rate
 
+    def entity_counts(self):
+        """Return the number of live entities of each kind, for profiling."""
+        return {}
+
+    def is_idle(self):
+        """Return True if nothing changes until the next event arrives."""
+        return False
+
+    def release(self):
+        """Free the scene's surfaces; the scene is not used afterwards."""
+        self._background = None
+        self._render_updates = None
+        self._drawn_rects = []
+        self._last_drawn_rects = []
+        self._dirty_rects = []
+
 
 class PressAnyKeyToExitScene(Scene):
     """Empty scene where it will invalidate when a key is pressed."""
@@ -131,7 +236,35 @@ class PressAnyKeyToExitScene(Scene):
             self._is_valid = True
 
 
-class PolygonTitleScene(PressAnyKeyToExitScene):
+class StaticScene(PressAnyKeyToExitScene):
+    """Scene whose picture never changes once it is built.
+
+    Subclasses draw their text in compose(), which is called once to bake
+    it into the background. After the first frame the scene reports that
+    it is idle, so the game loop can sleep until an event arrives instead
+    of redrawing an unchanged screen.
+    """
+
+    def __init__(self, screen, background_color, soundtrack=None):
+        super().__init__(screen, background_color, soundtrack)
+        self._composed = False
+
+    def compose(self, surface):
+        """Draw everything the scene shows onto surface."""
+
+    def draw(self):
+        """Draw the scene, compositing it the first time."""
+        if not self._composed:
+            self.compose(self._background)
+            self._composed = True
+        super().draw()
+
+    def is_idle(self):
+        """Return True once the cached frame is on screen."""
+        return not self._full_redraw
+
+
+class PolygonTitleScene(StaticScene):
     """Main Menu Scene"""
 
     def __init__(
@@ -145,35 +278,30 @@ class PolygonTitleScene(PressAnyKeyToExitScene):
         soundtrack=None,
     ):
         """Initialize the scene."""
-        super().__init__(screen, background_color, assets.get('music-grid'))
+        super().__init__(screen, background_color, 'music-grid')
         self._scene_manager = scene_manager
-        title_font = pygame.font.SysFont(title, title_size)
-        self._title = pygame.font.Font.render(title_font, title, True,
-                                              title_color, background_color)
-        eighteen = pygame.font.SysFont(title, 20)
-        self._conditions = pygame.font.Font.render(eighteen,
-                                        'Win by: Shooting and getting rid of all aliens.',
-                                                   True, 'Black', background_color)
-        self._conditions1 = pygame.font.Font.render(eighteen,
+        self._title = text.render(title, title_size, title, title_color,
+                                  background_color)
+        self._conditions = text.render(title, 20,
+                                       'Win by: Shooting and getting rid of all aliens.',
+                                       'Black', background_color)
+        self._conditions1 = text.render(title, 20,
                                         'Lose by: Getting shot 1 time(s). OR aliens reach you.',
-                                                    True, 'Black', background_color)
-        self._how_to_play = pygame.font.Font.render(eighteen, 'How to Play:',
-                                                    True, 'Black', background_color)
-        self._how_to_play1 = pygame.font.Font.render(eighteen,
-                                                     'Arrow keys: <-(move left), ->(move right)',
-                                                     True, 'Black', background_color)
-        self._how_to_play2 = pygame.font.Font.render(eighteen,
-                                                     'Spacebar to shoot',
-                                                     True, 'Black', background_color)
-        self._press_any_key = pygame.font.Font.render(eighteen, 'Press TAB to continue.',
-                                                      True, rgbcolors.dark_red, background_color)
-        self._press_esc_key = pygame.font.Font.render(eighteen, 'Press ESC any time to exit.',
-                                                      True, rgbcolors.dark_red, background_color)
-
-    def draw(self):
-        """Draw the scene."""
-        super().draw()
-        scene2 = self._screen
+                                        'Black', background_color)
+        self._how_to_play = text.render(title, 20, 'How to Play:', 'Black',
+                                        background_color)
+        self._how_to_play1 = text.render(title, 20,
+                                         'Arrow keys: <-(move left), ->(move right)',
+                                         'Black', background_color)
+        self._how_to_play2 = text.render(title, 20, 'Spacebar to shoot', 'Black',
+                                         background_color)
+        self._press_any_key = text.render(title, 20, 'Press TAB to continue.',
+                                          rgbcolors.dark_red, background_color)
+        self._press_esc_key = text.render(title, 20, 'Press ESC any time to exit.',
+                                          rgbcolors.dark_red, background_color)
+
+    def compose(self, scene2):
+        """Draw the scene's text onto its cached frame."""
         pygame.Surface.blit(scene2, self._title, ((800/2)-190, 200))
         pygame.Surface.blit(scene2, self._conditions, (270, 350))
         pygame.Surface.blit(scene2, self._conditions1, (260, 380))
@@ -195,7 +323,7 @@ class PolygonTitleScene(PressAnyKeyToExitScene):
         self._is_valid = True
 
 
-class GameOverScene(PressAnyKeyToExitScene):
+class GameOverScene(StaticScene):
     """Game Over Scene"""
 
     def __init__(
@@ -209,26 +337,19 @@ class GameOverScene(PressAnyKeyToExitScene):
         soundtrack=None,
     ):
         """Initialize the scene."""
-        super().__init__(screen, background_color, assets.get('music-grid.BJ'))
+        super().__init__(screen, background_color, 'music-grid.BJ')
         self._scene_manager = scene_manager
-        title_font = pygame.font.SysFont(title, title_size)
-        self._title = pygame.font.Font.render(title_font, title, True,
-                                              title_color, background_color)
-        eighteen = pygame.font.SysFont(title, 20)
-        twenty = pygame.font.SysFont(title, 50)
-        self._press_any_key = pygame.font.Font.render(eighteen, 'Press TAB to try again.',
-                                                      True, rgbcolors.dark_red,
-                                                      background_color)
-        self._press_esc_key = pygame.font.Font.render(eighteen, 'Press ESC any time to exit.',
-                                                      True, rgbcolors.dark_red,
-                                                      background_color)
-        self._you_lose = pygame.font.Font.render(twenty, 'You lose.',
-                                                 True, rgbcolors.dark_red, background_color)
-
-    def draw(self):
-        """Draw the scene."""
-        super().draw()
-        scene2 = self._screen
+        self._title = text.render(title, title_size, title, title_color,
+                                  background_color)
+        self._press_any_key = text.render(title, 20, 'Press TAB to try again.',
+                                          rgbcolors.dark_red, background_color)
+        self._press_esc_key = text.render(title, 20, 'Press ESC any time to exit.',
+                                          rgbcolors.dark_red, background_color)
+        self._you_lose = text.render(title, 50, 'You lose.', rgbcolors.dark_red,
+                                     background_color)
+
+    def compose(self, scene2):
+        """Draw the scene's text onto its cached frame."""
         pygame.Surface.blit(scene2, self._title, ((800/2)-190, 200))
         pygame.Surface.blit(scene2, self._you_lose, ((800/2)-70, 400))
         pygame.Surface.blit(scene2, self._press_any_key, ((800/2)-62, 800-100))
@@ -246,7 +367,7 @@ class GameOverScene(PressAnyKeyToExitScene):
         self._is_valid = True
 
 
-class GameOver2Scene(PressAnyKeyToExitScene):
+class GameOver2Scene(StaticScene):
     """Game Over2 Scene"""
 
     def __init__(
@@ -260,29 +381,19 @@ class GameOver2Scene(PressAnyKeyToExitScene):
         soundtrack=None,
     ):
         """Initialize the scene."""
-        super().__init__(screen, background_color, assets.get('goofy_ahh'))
+        super().__init__(screen, background_color, 'goofy_ahh')
         self._scene_manager = scene_manager
-        title_font = pygame.font.SysFont(title, title_size)
-        self._title = pygame.font.Font.render(title_font, title, True,
-                                              title_color, background_color)
-        eighteen = pygame.font.SysFont(title, 20)
-        twenty = pygame.font.SysFont(title, 50)
-        self._press_esc_key = pygame.font.Font.render(eighteen,
-                                                      'Press ESC any time to exit.',
-                                                      True, rgbcolors.dark_red,
-                                                      background_color)
-        self._you_lost = pygame.font.Font.render(twenty,
-                                                 'This world is taken over by aliens.',
-                                                 True, rgbcolors.dark_red, background_color)
-        self._you_lost2 = pygame.font.Font.render(twenty,
-                                                  'No more coming back.',
-                                                  True, rgbcolors.dark_red,
-                                                  background_color)
-
-    def draw(self):
-        """Draw the scene."""
-        super().draw()
-        scene2 = self._screen
+        self._title = text.render(title, title_size, title, title_color,
+                                  background_color)
+        self._press_esc_key = text.render(title, 20, 'Press ESC any time to exit.',
+                                          rgbcolors.dark_red, background_color)
+        self._you_lost = text.render(title, 50, 'This world is taken over by aliens.',
+                                     rgbcolors.dark_red, background_color)
+        self._you_lost2 = text.render(title, 50, 'No more coming back.',
+                                      rgbcolors.dark_red, background_color)
+
+    def compose(self, scene2):
+        """Draw the scene's text onto its cached frame."""
         pygame.Surface.blit(scene2, self._title, ((800/2)-190, 200))
         pygame.Surface.blit(scene2, self._you_lost, ((800/2)-280, 400))
         pygame.Surface.blit(scene2, self._you_lost2, ((800/2)-190, 450))
@@ -296,7 +407,7 @@ class GameOver2Scene(PressAnyKeyToExitScene):
         self._is_valid = True
 
 
-class GameWinScene(PressAnyKeyToExitScene):
+class GameWinScene(StaticScene):
     """Game Win Scene"""
 
     def __init__(
@@ -310,26 +421,20 @@ class GameWinScene(PressAnyKeyToExitScene):
         soundtrack=None,
     ):
         """Initialize the scene."""
-        super().__init__(screen, background_color, assets.get('music-grid'))
+        super().__init__(screen, background_color, 'music-grid')
         self._scene_manager = scene_manager
-        title_font = pygame.font.SysFont(title, title_size)
-        self._title = pygame.font.Font.render(title_font, title, True,
-                                              title_color, background_color)
-        eighteen = pygame.font.SysFont(title, 20)
-        twenty = pygame.font.SysFont(title, 50)
-        self._press_esc_key = pygame.font.Font.render(eighteen, 'Press ESC any time to exit.',
-                                                      True, rgbcolors.dark_red, background_color)
-        self._you_won = pygame.font.Font.render(twenty,
-                                                'This world is protected from the aliens.',
-                                                True, rgbcolors.dark_red, background_color)
-        self._you_won2 = pygame.font.Font.render(twenty,
-                                                 'You did it!',
-                                                 True, rgbcolors.dark_red, background_color)
-
-    def draw(self):
-        """Draw the scene."""
-        super().draw()
-        scene2 = self._screen
+        self._title = text.render(title, title_size, title, title_color,
+                                  background_color)
+        self._press_esc_key = text.render(title, 20, 'Press ESC any time to exit.',
+                                          rgbcolors.dark_red, background_color)
+        self._you_won = text.render(title, 50,
+                                    'This world is protected from the aliens.',
+                                    rgbcolors.dark_red, background_color)
+        self._you_won2 = text.render(title, 50, 'You did it!', rgbcolors.dark_red,
+                                     background_color)
+
+    def compose(self, scene2):
+        """Draw the scene's text onto its cached frame."""
         pygame.Surface.blit(scene2, self._title, ((800/2)-190, 200))
         pygame.Surface.blit(scene2, self._you_won, ((800/2)-280, 400))
         pygame.Surface.blit(scene2, self._you_won2, ((800/2)-80, 450))
@@ -347,153 +452,138 @@ class AlienScene(PressAnyKeyToExitScene):
     """Scene for Alien Invasion"""
     spriteson = True
     score = 0
+    # The dragon and explosion images come from the atlas.
+    preload_assets = ('soundfx',)
+
+    # Explosions that can play at the same time.
+    max_explosions = 32
 
-    def __init__(self, screen, scene_manager):
-        super().__init__(screen, rgbcolors.snow3, assets.get('soundtrack'))
-        self._explosion_sound = pygame.mixer.Sound(assets.get('soundfx'))
+    def __init__(self, screen, scene_manager, num_rows=None,
+                 aliens_per_row=None, alien_width=40, seed=None,
+                 fire_chance=None, descent_speed=None):
+        """Initialize the scene.
+
+        fire_chance overrides AlienSimulation.fire_chance and descent_speed
+        the formation's default, for tuning.
+        """
+        super().__init__(screen, rgbcolors.snow3, 'soundtrack')
         self._scene_manager = scene_manager
         self.delta_time = 0
-        self._aliens = []
-        self.make_aliens()
-        (width, height) = self._screen.get_size()
-        self._player = player.Player(pygame.math.Vector2(width//2, height - 100))
-        self._bullets = []
-        self._alien_bullets = []
+        # The rules are played by the simulation; the scene draws it and
+        # turns its kills and outcome into explosions, sound and scenes.
+        self._simulation = simulation.AlienSimulation(
+            num_rows, aliens_per_row, alien_width, seed=seed,
+            fire_chance=fire_chance, descent_speed=descent_speed)
+        self._aliens = self._simulation.aliens
+        self._formation = self._simulation.formation
+        self._projectiles = self._simulation.projectiles
+        self._player = player.Player(
+            pygame.math.Vector2(self._simulation.player_position))
         self._shield = player.Shield((600,100))
-        self._render_updates = pygame.sprite.RenderUpdates()
-        animation.Explosion.containers = self._render_updates
-        eighteen = pygame.font.SysFont('title', 20)
-        eighteen2 = pygame.font.SysFont('title', 40)
-        self._press_esc_key = pygame.font.Font.render(eighteen, 'Press ESC any time to exit.',
-                                                      True, rgbcolors.dark_red,
-                                                      rgbcolors.snow3)
-        self._score = pygame.font.Font.render(eighteen2, 'Score:',
-                                              True, rgbcolors.wheat4, rgbcolors.snow3)
-        self._score_amt = pygame.font.Font.render(eighteen2, str(AlienScene.score),
-                                                  True, rgbcolors.wheat4, rgbcolors.snow3)
-        self._lives = pygame.font.Font.render(eighteen2, 'Lives: ',
-                                              True, rgbcolors.wheat4, rgbcolors.snow3)
-        self._lives_amt = pygame.font.Font.render(eighteen2, '1',
-                                              True, rgbcolors.wheat4, rgbcolors.snow3)
+        # Explosions are recycled from a pool; when more are needed at
+        # once the oldest is cut short.
+        self._explosions = pygame.sprite.RenderUpdates()
+        self._explosion_pool = pools.SpritePool(animation.Explosion,
+                                                AlienScene.max_explosions,
+                                                self._explosions, pools.RECYCLE)
+        self._press_esc_key = text.render('title', 20, 'Press ESC any time to exit.',
+                                          rgbcolors.dark_red, rgbcolors.snow3)
+        self._score = text.render('title', 40, 'Score:', rgbcolors.wheat4,
+                                  rgbcolors.snow3)
+        self._score_amt = text.HudLabel((200, 10), lambda: AlienScene.score,
+                                        'title', 40, rgbcolors.wheat4,
+                                        rgbcolors.snow3)
+        self._lives = text.render('title', 40, 'Lives: ', rgbcolors.wheat4,
+                                  rgbcolors.snow3)
+        self._lives_left = 1
+        self._lives_amt = text.HudLabel((700, 10), lambda: self._lives_left,
+                                        'title', 40, rgbcolors.wheat4,
+                                        rgbcolors.snow3)
         if AlienScene.spriteson:
             self._render_updates = pygame.sprite.RenderUpdates(self._player)
             player.Player.containers = self._render_updates
         else:
             self._render_updates = None
 
-    def make_aliens(self):
-        """Makes the alien models."""
-        alien_width = 40
-        alien_radius = alien_width // 2
-        buffer_between = alien_width // 4
-        (width, height) = (600, 250)
-        x_step = buffer_between + alien_width
-        y_step = buffer_between + alien_width
-        aliens_per_row = (width // x_step) - 1
-        num_rows = (height // y_step) - 1
-        self._aliens = [
-            player.Alien(
-                x_step + (j * x_step),
-                y_step + (i * y_step),
-                alien_radius,
-                rgbcolors.red,
-                f"{i+1}, {j+1}",
-            )
-            for i in range(num_rows)
-            for j in range(aliens_per_row)
-        ]
+    @property
+    def simulation(self):
+        """Return the AlienSimulation the scene plays."""
+        return self._simulation
+
+    def alien_count(self):
+        """Return the number of living aliens."""
+        return self._simulation.alien_count()
+
+    def entity_counts(self):
+        """Return the number of live entities of each kind, for profiling."""
+        return {
+            'aliens': len(self._aliens),
+            'bullets': self._projectiles.count(projectile.PLAYER),
+            'alien_bullets': self._projectiles.count(projectile.ALIEN),
+            'explosions': len(self._explosion_pool),
+        }
 
     def update_scene(self):
         super().update_scene()
-        self._player.update()
-        (width, height) = self._screen.get_size()
-        for bullet in self._bullets:
-            bullet.update(self.delta_time)
-            if bullet.should_die():
-                self._bullets.remove(bullet)
+        AlienScene.score += self._simulation.advance(self.delta_time)
+        self._player.place(self._simulation.player_position)
+        for alien in self._simulation.kills:
+            self._explosion_pool.spawn(alien)
+            alien.is_exploding = True
+            audio.default_manager().play_sfx('soundfx')
+        outcome = self._simulation.outcome
+        if outcome is not None:
+            if outcome == simulation.WIN:
+                # If want to make multiple invasions, start a new
+                # simulation here instead.
+                self._scene_manager.set_next_scene('4')
             else:
-                index = bullet.rect.collidelist([c.rect for c in self._aliens])
-                if index > -1:
-                    AlienScene.score += 10
-                    animation.Explosion(self._aliens[index])
-                    self._aliens[index].is_exploding = True
-                    self._aliens.remove(self._aliens[index])
-                    self._explosion_sound.play()
-                    self._bullets.remove(bullet)
-                if not self._aliens:
-                    # AlienScene.make_aliens(self)
-                    # If want to make multiple invasions
-                    self._scene_manager.set_next_scene('4')
-                    self._is_valid = False
-
-        for alienbullet in self._alien_bullets:
-            alienbullet.update(self.delta_time)
-            if alienbullet.should_die():
-                self._alien_bullets.remove(alienbullet)
-            if self._player.rect.colliderect(alienbullet):
                 self._scene_manager.set_next_scene('2')
-                self._is_valid = False
-
-        for move in self._aliens:
-            move._center_y += .25
-            if move._center_y < 280:
-                for all in self._aliens:
-                    all._center_x += .01
-            elif move._center_y >= 250 and move._center_y < 480:
-                for all in self._aliens:
-                    all._center_x -= .01
-            else:
-                for all in self._aliens:
-                    all._center_x += .01
-            if move._center_y == 650:
-                self._scene_manager.set_next_scene('2')
-                self._is_valid = False
-            if random.randint(0, 4000) == random.randint(0, 4000):
-                (width, height) = self._screen.get_size()
-                rand_posi = random.randint(int(move._center_x), int(move._center_x))
-                bullet_target = pygame.math.Vector2(rand_posi, height)
-                velocity = .2
-                self._alien_bullets.append(
-                    player.AlienBullet(pygame.math.Vector2(rand_posi,
-                                        int(move._center_y)), bullet_target, velocity))
+            self._is_valid = False
 
     def process_event(self, event):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-            (width, height) = self._screen.get_size()
-            bullet_target = self._player.position - pygame.math.Vector2(0, height)
-            velocity = 1
-            self._bullets.append(player.Bullet(self._player.position,
-                                                bullet_target, velocity))
+            self._simulation.fire()
         elif event.type == pygame.KEYDOWN and event.key == pygame.K_LEFT:
-            self._player.move_left()
+            self._simulation.move_left()
         elif event.type == pygame.KEYUP and event.key == pygame.K_LEFT:
-            self._player.stop()
+            self._simulation.stop()
         elif event.type == pygame.KEYDOWN and event.key == pygame.K_RIGHT:
-            self._player.move_right()
+            self._simulation.move_right()
         elif event.type == pygame.KEYUP and event.key == pygame.K_RIGHT:
-            self._player.stop()
+            self._simulation.stop()
         else:
             super().process_event(event)
 
     def render_updates(self):
         super().render_updates()
-        self._render_updates.clear(self._screen, self._background)
-        self._render_updates.update()
-        dirty = self._render_updates.draw(self._screen)
+        # Sprite areas from the last frame were already restored by draw().
+        for group in (self._render_updates, self._explosions):
+            group.update()
+            for rect in group.draw(self._screen):
+                self.mark_drawn(rect)
 
     def draw(self):
         super().draw()
         scene2 = self._screen
-        for aliens in self._aliens:
-            aliens.draw(scene2)
-        for bullet in self._bullets:
-            bullet.draw(scene2)
-        for alienbullets in self._alien_bullets:
-            alienbullets.draw(scene2)
+        scene2.blits(self._aliens.blit_sequence(self.alpha), False)
+        if self._aliens:
+            self.mark_drawn(
+                self._formation.interpolated_extent(self.alpha).inflate(4, 4))
+        projectiles = sprites.circle_blits(self._projectiles.items(self.alpha))
+        for rect in scene2.blits(projectiles):
+            self.mark_drawn(rect)
+        # The shield and HUD never move, so they are only presented when a
+        # cleared area overlaps them.
         self._shield.draw(scene2)
+        self._player.interpolate(self.alpha)
         self._player.draw(scene2)
+        self.mark_drawn(self._player.rect.copy())
         pygame.Surface.blit(scene2, self._press_esc_key, ((800/2)-70, 800-50))
         pygame.Surface.blit(scene2, self._score, (50, 10))
-        pygame.Surface.blit(scene2, self._score_amt, (200, 10))
         pygame.Surface.blit(scene2, self._lives, (600, 10))
-        pygame.Surface.blit(scene2, self._lives_amt, (700, 10))
+        # The amounts are only re-rendered and presented when they change.
+        for label in (self._score_amt, self._lives_amt):
+            rect = label.draw(scene2, self._background)
+            if rect is not None:
+                self.mark_dirty(rect)
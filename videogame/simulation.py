@@ -0,0 +1,813 @@
+"""The rules of the alien invasion, stepped without a display.
+
+AlienSimulation holds everything that decides how a game of AlienScene
+plays out: the player's position, the alien formation, the projectiles,
+the score and whether the game was won or lost. It never touches a
+surface, a font or the mixer, so it runs without pygame being
+initialized:
+
+    game = AlienSimulation(seed=1)
+    observation = game.reset(seed=1)
+    while not game.done:
+        (observation, reward, done) = game.step(LEFT | FIRE)
+
+VectorAlienSimulation keeps many games in one set of arrays, steps them
+in lockstep from one call and returns their observations, rewards and
+done flags as arrays; the games play out exactly as AlienSimulations.
+"""
+
+import random
+import numpy as np
+import pygame
+import collision
+import player
+import projectile
+import rgbcolors
+import swarm
+
+# Size of the playing field in pixels.
+WIDTH = 800
+HEIGHT = 800
+
+# Action flags, combined with |. Holding both directions stands still.
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+FIRE = 4
+
+# How a game ended.
+WIN = 'win'
+LOSS = 'loss'
+
+POINTS_PER_ALIEN = 10
+
+# Entries of an observation vector, in order. Positions are in pixels;
+# the nearest alien is the front line alien closest to the player
+# horizontally and the nearest shot the closest alien projectile, both
+# relative to the player and zero when there is none.
+OBSERVATION_FIELDS = (
+    'player_x',
+    'formation_x',
+    'formation_y',
+    'aliens_left',
+    'lowest_alien_y',
+    'nearest_alien_dx',
+    'nearest_alien_dy',
+    'nearest_shot_dx',
+    'nearest_shot_dy',
+    'player_shots',
+    'alien_shots',
+)
+OBSERVATION_SIZE = len(OBSERVATION_FIELDS)
+
+
+def _new_formation(descent_speed=None):
+    """Return a Formation spanning the field, at its default descent
+    speed if descent_speed is None."""
+    if descent_speed is None:
+        return player.Formation(bounds=(0, WIDTH))
+    return player.Formation(descent_speed=descent_speed, bounds=(0, WIDTH))
+
+
+def _alien_layout(num_rows, aliens_per_row, alien_width):
+    """Return (num_rows, aliens_per_row, step, radius) of a formation; a
+    count that is None fills a 600x250 area."""
+    alien_radius = alien_width // 2
+    buffer_between = alien_width // 4
+    (width, height) = (600, 250)
+    x_step = buffer_between + alien_width
+    y_step = buffer_between + alien_width
+    if aliens_per_row is None:
+        aliens_per_row = (width // x_step) - 1
+    if num_rows is None:
+        num_rows = (height // y_step) - 1
+    return (num_rows, aliens_per_row, x_step, alien_radius)
+
+
+class AlienSimulation:
+    """One game of the alien invasion, advanced in fixed steps.
+
+    The formation and fire rate are set once; reset() starts a new game
+    with the same settings and a new seed.
+    """
+
+    # Shots per alien per millisecond; about once every 4001 frames at
+    # 60 FPS.
+    fire_chance = 60 / (4001 * 1000)
+
+    # Speeds in pixels per millisecond.
+    player_speed = .6
+    shot_speed = 1
+    alien_shot_speed = .2
+
+    # Aliens reaching this far down have landed.
+    landing_y = 650
+
+    # Most shot and alien pairs tested together before falling back to
+    # the grid.
+    pairwise_limit = 4096
+
+    def __init__(self, num_rows=None, aliens_per_row=None, alien_width=40,
+                 seed=None, fire_chance=None, descent_speed=None,
+                 simulation_rate=120, player_size=(64, 64)):
+        """Set up the first game.
+
+        By default the formation fills a 600x250 area; pass num_rows and
+        aliens_per_row to build larger formations. player_size is the
+        size of the player's hit box, that of the dragon sprite.
+        """
+        self._layout = (num_rows, aliens_per_row, alien_width)
+        if fire_chance is None:
+            fire_chance = AlienSimulation.fire_chance
+        self._fire_chance = fire_chance
+        self._descent_speed = descent_speed
+        self._step_ms = 1000 / simulation_rate
+        self._player_rect = pygame.Rect((0, 0), player_size)
+        self._shot_color = rgbcolors.mult_color(1, rgbcolors.blue)
+        self._alien_shot_color = rgbcolors.mult_color(.2, rgbcolors.red)
+        # Aliens shot down by the last advance(), for explosions.
+        self.kills = []
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a new game; return the first observation."""
+        self._seed = seed
+        self._formation = _new_formation(self._descent_speed)
+        self._aliens = swarm.AlienSwarm(self._formation)
+        self._make_aliens(*self._layout)
+        self._fire_scheduler = swarm.FireScheduler(self._fire_chance, seed)
+        self._projectiles = projectile.ProjectilePool()
+        # Reused for every shot's grid lookup instead of a Rect per shot.
+        diameter = 2 * self._projectiles.radius
+        self._query_rect = pygame.Rect(0, 0, diameter, diameter)
+        self._player_x = WIDTH // 2
+        self._player_y = HEIGHT - 100
+        self._player_velocity = 0
+        self._player_rect.center = (self._player_x, self._player_y)
+        self._score = 0
+        self._steps = 0
+        self._outcome = None
+        self.kills = []
+        return self.observation()
+
+    def _make_aliens(self, num_rows, aliens_per_row, alien_width):
+        (num_rows, aliens_per_row, x_step, alien_radius) = _alien_layout(
+            num_rows, aliens_per_row, alien_width)
+        self._aliens.add_grid(num_rows, aliens_per_row, x_step, alien_radius)
+        self._alien_grid = collision.SpatialGrid(x_step)
+        self._rebuild_alien_grid()
+
+    def _rebuild_alien_grid(self):
+        """Bucket every living alien by index.
+
+        The grid is kept in formation coordinates so it only changes
+        when an alien dies, never when the formation moves.
+        """
+        self._alien_grid.clear()
+        for index in np.flatnonzero(self._aliens.alive).tolist():
+            self._alien_grid.insert(index, self._aliens.local_rect(index))
+
+    @property
+    def seed(self):
+        """Return the seed the game was started with."""
+        return self._seed
+
+    @property
+    def step_ms(self):
+        """Return the length of one step() in milliseconds."""
+        return self._step_ms
+
+    @property
+    def steps(self):
+        """Return the number of steps advanced since the last reset."""
+        return self._steps
+
+    @property
+    def score(self):
+        """Return the points scored since the last reset."""
+        return self._score
+
+    @property
+    def outcome(self):
+        """Return WIN, LOSS or None while the game is still being played."""
+        return self._outcome
+
+    @property
+    def done(self):
+        """Return True once the game has been won or lost."""
+        return self._outcome is not None
+
+    @property
+    def aliens(self):
+        """Return the AlienSwarm."""
+        return self._aliens
+
+    @property
+    def formation(self):
+        """Return the Formation the aliens move with."""
+        return self._formation
+
+    @property
+    def projectiles(self):
+        """Return the ProjectilePool shared by the player and the aliens."""
+        return self._projectiles
+
+    @property
+    def player_position(self):
+        """Return the player's center."""
+        return (self._player_x, self._player_y)
+
+    @property
+    def player_rect(self):
+        """Return the player's hit box."""
+        return self._player_rect
+
+    def alien_count(self):
+        """Return the number of living aliens."""
+        return len(self._aliens)
+
+    def move_left(self):
+        """Start moving the player left."""
+        self._player_velocity = -AlienSimulation.player_speed
+
+    def move_right(self):
+        """Start moving the player right."""
+        self._player_velocity = AlienSimulation.player_speed
+
+    def stop(self):
+        """Stop moving the player."""
+        self._player_velocity = 0
+
+    def fire(self):
+        """Fire a shot straight up from the player; return its slot, or -1."""
+        if self._outcome is not None:
+            return -1
+        return self._projectiles.spawn(
+            (self._player_x, self._player_y),
+            (self._player_x, self._player_y - HEIGHT),
+            AlienSimulation.shot_speed, projectile.PLAYER, self._shot_color)
+
+    def act(self, action):
+        """Steer and fire as the action flags ask, for the next step."""
+        left = action & LEFT
+        right = action & RIGHT
+        if left and not right:
+            self.move_left()
+        elif right and not left:
+            self.move_right()
+        else:
+            self.stop()
+        if action & FIRE:
+            self.fire()
+
+    def advance(self, delta_time):
+        """Advance the game by delta_time milliseconds; return the points
+        scored."""
+        self.kills = []
+        if self._outcome is not None:
+            return 0
+        self._steps += 1
+        player_x = self._player_x + self._player_velocity * delta_time
+        if 0 < player_x < WIDTH:
+            self._player_x = player_x
+        self._player_rect.center = (self._player_x, self._player_y)
+        self._projectiles.update(delta_time)
+        points = 0
+        offset = self._formation.offset
+        radius = self._projectiles.radius
+        query = self._query_rect
+        # Only shots near the formation can hit; the extent is grown to
+        # cover the pixel it may lose to rounding on either side.
+        shots = self._projectiles.collide_rect(
+            self._formation.extent.inflate(4, 4), projectile.PLAYER)
+        if 0 < len(shots) * len(self._aliens) <= AlienSimulation.pairwise_limit:
+            # Few enough pairs to test them all at once and leave only
+            # the shots that hit something to the grid.
+            shots = shots[self._aliens.hit_mask(self._projectiles.x[shots],
+                                                self._projectiles.y[shots],
+                                                radius)]
+        for slot in shots.tolist():
+            shot_x = self._projectiles.x[slot]
+            shot_y = self._projectiles.y[slot]
+            query.topleft = (shot_x - radius - offset.x,
+                             shot_y - radius - offset.y)
+            candidates = self._alien_grid.query(query)
+            index = -1
+            if candidates:
+                index = self._aliens.hit_test(shot_x, shot_y, radius, candidates)
+            if index > -1:
+                points += POINTS_PER_ALIEN
+                self.kills.append(self._aliens.alien(index))
+                self._aliens.kill(index)
+                self._alien_grid.remove(index)
+                if self._aliens.should_compact():
+                    self._aliens.compact()
+                    self._rebuild_alien_grid()
+                self._projectiles.release(slot)
+            if not self._aliens:
+                self._outcome = WIN
+                break
+        self._score += points
+
+        if len(self._projectiles.collide_rect(self._player_rect, projectile.ALIEN)):
+            self._outcome = LOSS
+
+        self._formation.update(delta_time)
+        if self._aliens and self._aliens.lowest() >= AlienSimulation.landing_y:
+            self._outcome = LOSS
+        shots = self._fire_scheduler.update(delta_time, len(self._aliens))
+        if shots:
+            # Only the lowest living alien in each column may shoot.
+            front_line = self._aliens.front_line()
+            for _ in range(shots):
+                index = front_line[self._fire_scheduler.choose(len(front_line))]
+                (alien_x, alien_y) = self._aliens.position(index)
+                shot_x = int(alien_x)
+                self._projectiles.spawn((shot_x, int(alien_y)), (shot_x, HEIGHT),
+                                        AlienSimulation.alien_shot_speed,
+                                        projectile.ALIEN, self._alien_shot_color)
+        return points
+
+    def step(self, action=NOOP):
+        """Play one fixed step with the action flags; return
+        (observation, reward, done)."""
+        self.act(action)
+        reward = self.advance(self._step_ms)
+        return (self.observation(), reward, self.done)
+
+    def observation(self, out=None):
+        """Return the game state as a float32 vector laid out as
+        OBSERVATION_FIELDS, written into out if given."""
+        if out is None:
+            out = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        else:
+            out.fill(0)
+        offset = self._formation.offset
+        out[0] = self._player_x
+        out[1] = offset.x
+        out[2] = offset.y
+        out[3] = len(self._aliens)
+        if self._aliens:
+            out[4] = self._aliens.lowest()
+            front_line = self._aliens.front_line()
+            front_x = self._aliens.local_x[front_line] + offset.x
+            nearest = front_line[np.argmin(np.abs(front_x - self._player_x))]
+            (alien_x, alien_y) = self._aliens.position(nearest)
+            out[5] = alien_x - self._player_x
+            out[6] = alien_y - self._player_y
+        slots = self._projectiles.live(projectile.ALIEN)
+        if len(slots):
+            delta_x = self._projectiles.x[slots] - self._player_x
+            delta_y = self._projectiles.y[slots] - self._player_y
+            nearest = np.argmin(np.hypot(delta_x, delta_y))
+            out[7] = delta_x[nearest]
+            out[8] = delta_y[nearest]
+        out[9] = self._projectiles.count(projectile.PLAYER)
+        out[10] = len(slots)
+        return out
+
+
+class VectorAlienSimulation:
+    """Many games with the same settings, stepped in lockstep as arrays.
+
+    Every game is a row of the same arrays: the player, which aliens are
+    alive, the formation's offset and extent, the projectiles and the
+    fire clocks. A step of all the games is one pass of NumPy operations
+    over those rows; Python only runs per game for the rare events, a
+    shot touching an alien and an alien firing. The rules themselves are
+    the functions AlienSimulation's parts use, applied to every row, so
+    the games play out exactly as AlienSimulations with the same seeds
+    and actions would; lockstep.py checks that they do.
+
+    Observations come back as one (count, OBSERVATION_SIZE) array and
+    rewards and done flags as arrays of length count. The arrays are
+    reused, so each call overwrites what the previous one returned. A
+    game that has ended is not stepped again until the next reset; its
+    last observation is kept and its reward is zero.
+    """
+
+    # Most shot and alien pairs tested together in one array.
+    pairwise_limit = 1 << 16
+
+    def __init__(self, count, num_rows=None, aliens_per_row=None,
+                 alien_width=40, fire_chance=None, descent_speed=None,
+                 simulation_rate=120, player_size=(64, 64)):
+        """Build count games; the settings are those of AlienSimulation."""
+        if fire_chance is None:
+            fire_chance = AlienSimulation.fire_chance
+        self._count = count
+        self._fire_chance = fire_chance
+        self._step_ms = 1000 / simulation_rate
+        formation = _new_formation(descent_speed)
+        self._descent_speed = formation.descent_speed
+        self._drift_speed = formation.drift_speed
+        self._bounds = formation.bounds
+
+        # The formation every game starts from; only which aliens are
+        # alive differs between games.
+        aliens = swarm.AlienSwarm(formation)
+        (num_rows, aliens_per_row, step, radius) = _alien_layout(
+            num_rows, aliens_per_row, alien_width)
+        aliens.add_grid(num_rows, aliens_per_row, step, radius)
+        self._alien_x = aliens.local_x
+        self._alien_y = aliens.local_y
+        self._alien_radius = aliens.radius
+        self._alien_column = aliens.column
+        self._start_extent = tuple(formation.extent)
+        self._start_front = aliens.front_line()
+        self._alien_rects = [aliens.local_rect(index)
+                             for index in range(aliens.capacity)]
+        # Each game buckets its aliens as AlienSimulation does, so shots
+        # meet candidates in the same order.
+        self._grids = [collision.SpatialGrid(step) for _ in range(count)]
+
+        pool = projectile.ProjectilePool()
+        self._capacity = pool.capacity
+        self._shot_radius = pool.radius
+        diameter = 2 * pool.radius
+        self._query_rect = pygame.Rect(0, 0, diameter, diameter)
+        self._player_y = HEIGHT - 100
+        # The player's hit box sits at the rounded center, as a Rect's would.
+        player_rect = pygame.Rect((0, 0), player_size)
+        player_rect.center = (0, self._player_y)
+        self._player_half_width = -player_rect.left
+        self._player_width = player_rect.width
+        self._player_top = player_rect.top
+        self._player_bottom = player_rect.bottom
+
+        shape = (count, self._capacity)
+        self._alive = np.ones((count, aliens.capacity), dtype=np.bool_)
+        self._alive_count = np.zeros(count, dtype=np.int64)
+        self._front = np.full((count, aliens_per_row), -1, dtype=np.intp)
+        self._extent = np.zeros((count, 4), dtype=np.int64)
+        self._lowest = np.zeros(count, dtype=np.float64)
+        self._offset_x = np.zeros(count, dtype=np.float64)
+        self._offset_y = np.zeros(count, dtype=np.float64)
+        self._player_x = np.zeros(count, dtype=np.float64)
+        self._player_velocity = np.zeros(count, dtype=np.float64)
+        self._shot_x = np.zeros(shape, dtype=np.float64)
+        self._shot_y = np.zeros(shape, dtype=np.float64)
+        self._target_x = np.zeros(shape, dtype=np.float64)
+        self._target_y = np.zeros(shape, dtype=np.float64)
+        self._shot_speed = np.zeros(shape, dtype=np.float64)
+        self._owner = np.zeros(shape, dtype=np.uint8)
+        self._shot_alive = np.zeros(shape, dtype=np.bool_)
+        # A stack of free slots per game, popped from the top so the
+        # lowest slots are handed out first as in a ProjectilePool.
+        self._free = np.zeros(shape, dtype=np.intp)
+        self._free_top = np.zeros(count, dtype=np.intp)
+        # One past the highest slot any game has used; the rest are idle.
+        self._slots_used = 0
+        self._score = np.zeros(count, dtype=np.int64)
+        self._steps = np.zeros(count, dtype=np.int64)
+        self._won = np.zeros(count, dtype=np.bool_)
+        self._lost = np.zeros(count, dtype=np.bool_)
+        self._rngs = [None] * count
+        self._clock = np.zeros(count, dtype=np.float64)
+        # NaN while no shot is scheduled.
+        self._next_shot = np.full(count, np.nan)
+        self._rows = np.arange(count)
+        self._observations = np.zeros((count, OBSERVATION_SIZE), dtype=np.float32)
+        self._rewards = np.zeros(count, dtype=np.float32)
+        self._dones = np.zeros(count, dtype=np.bool_)
+        self.reset()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def step_ms(self):
+        """Return the length of one step() in milliseconds."""
+        return self._step_ms
+
+    def reset(self, seeds=None):
+        """Start every game again; return the observations.
+
+        seeds is a seed per game, or the seed of the first game with the
+        others numbered after it, or None.
+        """
+        if seeds is None or isinstance(seeds, int):
+            first = seeds
+            seeds = [None if first is None else first + index
+                     for index in range(self._count)]
+        self._rngs = [random.Random(seed) for seed in seeds]
+        for grid in self._grids:
+            grid.clear()
+            for (index, rect) in enumerate(self._alien_rects):
+                grid.insert(index, rect)
+        self._alive.fill(True)
+        self._alive_count.fill(len(self._alien_x))
+        self._front.fill(-1)
+        self._front[:, self._alien_column[self._start_front]] = self._start_front
+        self._extent[:] = self._start_extent
+        self._lowest.fill(self._alien_y.max())
+        self._offset_x.fill(0)
+        self._offset_y.fill(0)
+        self._player_x.fill(WIDTH // 2)
+        self._player_velocity.fill(0)
+        self._shot_alive.fill(False)
+        self._free[:] = np.arange(self._capacity - 1, -1, -1)
+        self._free_top.fill(self._capacity)
+        self._slots_used = 0
+        self._score.fill(0)
+        self._steps.fill(0)
+        self._won.fill(False)
+        self._lost.fill(False)
+        self._clock.fill(0)
+        self._next_shot.fill(np.nan)
+        self._observe()
+        self._rewards.fill(0)
+        self._dones.fill(False)
+        return self._observations
+
+    def step(self, actions):
+        """Play one fixed step of every unfinished game; return
+        (observations, rewards, dones).
+
+        actions holds the action flags of each game, or one set of flags
+        for all of them.
+        """
+        actions = np.broadcast_to(np.asarray(actions), (self._count,))
+        playing = ~self._dones
+        left = (actions & LEFT) != 0
+        right = (actions & RIGHT) != 0
+        speed = AlienSimulation.player_speed
+        self._player_velocity.fill(0)
+        self._player_velocity[left & ~right] = -speed
+        self._player_velocity[right & ~left] = speed
+        games = np.flatnonzero(playing & ((actions & FIRE) != 0))
+        self._spawn(games, self._player_x[games], self._player_y,
+                    self._player_x[games], self._player_y - HEIGHT,
+                    AlienSimulation.shot_speed, projectile.PLAYER)
+
+        points = self._advance(playing)
+        self._score += points
+        self._rewards[:] = points
+        self._observe()
+        np.logical_or(self._won, self._lost, out=self._dones)
+        return (self._observations, self._rewards, self._dones)
+
+    def scores(self):
+        """Return the score of every game."""
+        return self._score.copy()
+
+    def outcomes(self):
+        """Return WIN, LOSS or None for every game."""
+        return [LOSS if lost else WIN if won else None
+                for (won, lost) in zip(self._won.tolist(), self._lost.tolist())]
+
+    def _spawn(self, games, x, y, target_x, target_y, speed, owner):
+        """Fire a shot in each of games, which are distinct; games whose
+        pool is full do not fire."""
+        has_room = self._free_top[games] > 0
+        games = games[has_room]
+        if not len(games):
+            return
+        top = self._free_top[games] - 1
+        slots = self._free[games, top]
+        self._free_top[games] = top
+        self._shot_x[games, slots] = np.asarray(x)[has_room] if np.ndim(x) else x
+        self._shot_y[games, slots] = y
+        self._target_x[games, slots] = (np.asarray(target_x)[has_room]
+                                        if np.ndim(target_x) else target_x)
+        self._target_y[games, slots] = target_y
+        self._shot_speed[games, slots] = speed
+        self._owner[games, slots] = owner
+        self._shot_alive[games, slots] = True
+        self._slots_used = max(self._slots_used, int(slots.max()) + 1)
+
+    def _release(self, games, slots):
+        """Free the slots, pushing each game's in the order given as
+        ProjectilePool.release would one at a time; games is sorted."""
+        if not len(games):
+            return
+        self._shot_alive[games, slots] = False
+        counts = np.bincount(games, minlength=self._count)
+        first = np.cumsum(counts) - counts
+        rank = np.arange(len(games)) - first[games]
+        self._free[games, self._free_top[games] + rank] = slots
+        self._free_top += counts
+
+    def _advance(self, playing):
+        """Advance every game still playing by one step; return the
+        points each scored."""
+        delta_time = self._step_ms
+        self._steps += playing
+        player_x = self._player_x + self._player_velocity * delta_time
+        inside = playing & (player_x > 0) & (player_x < WIDTH)
+        self._player_x[inside] = player_x[inside]
+        self._move_shots(playing, delta_time)
+        points = self._hit_aliens(playing)
+        self._won |= playing & (self._alive_count == 0)
+        self._hit_player(playing)
+        self._move_formations(playing, delta_time)
+        self._lost |= (playing & (self._alive_count > 0) &
+                       (self._lowest + self._offset_y >= AlienSimulation.landing_y))
+        self._fire(playing, delta_time)
+        return points
+
+    def _move_shots(self, playing, delta_time):
+        """Move the live projectiles towards their targets, freeing those
+        that arrive, as ProjectilePool.update does."""
+        used = self._slots_used
+        (games, slots) = np.nonzero(self._shot_alive[:, :used] & playing[:, np.newaxis])
+        if not len(games):
+            return
+        (self._shot_x[games, slots], self._shot_y[games, slots], arrived) = (
+            projectile.step_towards(self._shot_x[games, slots],
+                                    self._shot_y[games, slots],
+                                    self._target_x[games, slots],
+                                    self._target_y[games, slots],
+                                    self._shot_speed[games, slots], delta_time))
+        self._release(games[arrived], slots[arrived])
+
+    def _hit_aliens(self, playing):
+        """Kill the aliens the player's shots hit; return the points each
+        game scored."""
+        points = np.zeros(self._count, dtype=np.int64)
+        used = self._slots_used
+        shots = (self._shot_alive[:, :used] & playing[:, np.newaxis] &
+                 (self._owner[:, :used] == projectile.PLAYER))
+        (games, slots) = np.nonzero(shots)
+        if not len(games):
+            return points
+        radius = self._shot_radius
+        shot_x = self._shot_x[games, slots]
+        shot_y = self._shot_y[games, slots]
+        offset_x = self._offset_x[games]
+        offset_y = self._offset_y[games]
+        # Only shots within a pixel of the formation's extent can hit.
+        extent = self._extent[games]
+        left = extent[:, 0] + offset_x
+        top = extent[:, 1] + offset_y
+        near = ((shot_x + radius > left - 1) &
+                (shot_x - radius < left + extent[:, 2] + 1) &
+                (shot_y + radius > top - 1) &
+                (shot_y - radius < top + extent[:, 3] + 1))
+        (games, slots) = (games[near], slots[near])
+        (shot_x, shot_y) = (shot_x[near], shot_y[near])
+        (offset_x, offset_y) = (offset_x[near], offset_y[near])
+        touching = np.zeros(len(games), dtype=np.bool_)
+        chunk = max(1, VectorAlienSimulation.pairwise_limit // len(self._alien_x))
+        for start in range(0, len(games), chunk):
+            part = slice(start, start + chunk)
+            hits = swarm.circle_hits(self._alien_x, self._alien_y, self._alien_radius,
+                                     shot_x[part, np.newaxis], shot_y[part, np.newaxis],
+                                     offset_x[part, np.newaxis],
+                                     offset_y[part, np.newaxis], radius)
+            touching[part] = (hits & self._alive[games[part]]).any(axis=1)
+
+        # Few shots touch an alien; resolve those one at a time, in slot
+        # order within each game, as AlienSimulation does.
+        changed = []
+        for (game, slot) in zip(games[touching].tolist(), slots[touching].tolist()):
+            if not self._alive_count[game]:
+                continue
+            index = self._hit_test(game, slot)
+            if index > -1:
+                points[game] += POINTS_PER_ALIEN
+                self._alive[game, index] = False
+                self._alive_count[game] -= 1
+                self._grids[game].remove(index)
+                self._release(np.array([game]), np.array([slot]))
+                if not changed or changed[-1] != game:
+                    changed.append(game)
+        for game in changed:
+            self._reshape(game)
+        return points
+
+    def _hit_test(self, game, slot):
+        """Return the living alien a shot hits, -1 for none, testing the
+        game's grid candidates as AlienSimulation does."""
+        radius = self._shot_radius
+        shot_x = self._shot_x[game, slot]
+        shot_y = self._shot_y[game, slot]
+        offset_x = self._offset_x[game]
+        offset_y = self._offset_y[game]
+        query = self._query_rect
+        query.topleft = (shot_x - radius - offset_x, shot_y - radius - offset_y)
+        candidates = np.asarray(self._grids[game].query(query), dtype=np.intp)
+        if not len(candidates):
+            return -1
+        hits = np.flatnonzero(swarm.circle_hits(
+            self._alien_x[candidates], self._alien_y[candidates],
+            self._alien_radius[candidates], shot_x, shot_y, offset_x, offset_y,
+            radius))
+        if not len(hits):
+            return -1
+        return int(candidates[hits[0]])
+
+    def _reshape(self, game):
+        """Update a game's extent, lowest alien and front line after
+        aliens died."""
+        alive = np.flatnonzero(self._alive[game])
+        if not len(alive):
+            return
+        # Rounded as the Rect a Formation keeps its extent in.
+        self._extent[game] = tuple(pygame.Rect(swarm.extent_of(
+            self._alien_x[alive], self._alien_y[alive], self._alien_radius[alive])))
+        self._lowest[game] = float(self._alien_y[alive].max())
+        front_line = swarm.front_line_of(alive, self._alien_y, self._alien_column)
+        self._front[game] = -1
+        self._front[game, self._alien_column[front_line]] = front_line
+
+    def _hit_player(self, playing):
+        """End the games whose player an alien shot touches."""
+        used = self._slots_used
+        if not used:
+            return
+        radius = self._shot_radius
+        x = self._shot_x[:, :used]
+        y = self._shot_y[:, :used]
+        # A Rect's center rounds half away from zero; the player is
+        # never left of the field.
+        left = (np.floor(self._player_x + .5) - self._player_half_width)[:, np.newaxis]
+        touching = (self._shot_alive[:, :used] &
+                    (self._owner[:, :used] == projectile.ALIEN) &
+                    projectile.overlaps_rect(x, y, radius, left, self._player_top,
+                                             left + self._player_width,
+                                             self._player_bottom))
+        self._lost |= playing & touching.any(axis=1)
+
+    def _move_formations(self, playing, delta_time):
+        """Move every formation as Formation.update does."""
+        offset_x = self._offset_x
+        # A Rect moved by the offset drops its fraction.
+        left = self._extent[:, 0] + np.trunc(offset_x)
+        drift = player.formation_drift(self._offset_y, left, left + self._extent[:, 2],
+                                       self._drift_speed, self._bounds, delta_time)
+        offset_x[playing] += (drift * delta_time)[playing]
+        self._offset_y[playing] += self._descent_speed * delta_time
+
+    def _fire(self, playing, delta_time):
+        """Run each game's FireScheduler and fire the shots due."""
+        rate = self._fire_chance
+        clock = self._clock
+        next_shot = self._next_shot
+        alive_count = self._alive_count
+        armed = playing & (alive_count > 0)
+        if rate <= 0:
+            armed[:] = False
+        next_shot[playing & ~armed] = np.nan
+        for game in np.flatnonzero(armed & np.isnan(next_shot)).tolist():
+            next_shot[game] = clock[game] + swarm.shot_gap(
+                self._rngs[game], rate, int(alive_count[game]))
+        clock[playing] += delta_time
+        for game in np.flatnonzero(armed & (next_shot <= clock)).tolist():
+            rng = self._rngs[game]
+            (shots, next_shot[game]) = swarm.due_shots(
+                rng, rate, int(alive_count[game]), float(next_shot[game]),
+                float(clock[game]))
+            # Only the lowest living alien in each column may shoot.
+            front_line = self._front[game]
+            front_line = front_line[front_line > -1]
+            offset_x = self._offset_x[game]
+            offset_y = self._offset_y[game]
+            one = np.array([game])
+            for _ in range(shots):
+                index = front_line[swarm.choose_shooter(rng, len(front_line))]
+                shot_x = int(float(self._alien_x[index]) + offset_x)
+                shot_y = int(float(self._alien_y[index]) + offset_y)
+                self._spawn(one, shot_x, shot_y, shot_x, HEIGHT,
+                            AlienSimulation.alien_shot_speed, projectile.ALIEN)
+
+    def _observe(self):
+        """Write every game's observation, as AlienSimulation.observation."""
+        out = self._observations
+        rows = self._rows
+        player_x = self._player_x
+        offset_x = self._offset_x
+        offset_y = self._offset_y
+        has_aliens = self._alive_count > 0
+        out[:, 0] = player_x
+        out[:, 1] = offset_x
+        out[:, 2] = offset_y
+        out[:, 3] = self._alive_count
+        out[:, 4] = np.where(has_aliens, self._lowest + offset_y, 0)
+        front = self._front
+        in_front = front > -1
+        distance = np.abs(self._alien_x[front] + offset_x[:, np.newaxis] -
+                          player_x[:, np.newaxis])
+        distance[~in_front] = np.inf
+        nearest = front[rows, np.argmin(distance, axis=1)]
+        out[:, 5] = np.where(has_aliens,
+                             self._alien_x[nearest] + offset_x - player_x, 0)
+        out[:, 6] = np.where(has_aliens,
+                             self._alien_y[nearest] + offset_y - self._player_y, 0)
+        used = self._slots_used
+        if not used:
+            out[:, 7:] = 0
+            return
+        live = self._shot_alive[:, :used]
+        alien_shots = live & (self._owner[:, :used] == projectile.ALIEN)
+        delta_x = self._shot_x[:, :used] - player_x[:, np.newaxis]
+        delta_y = self._shot_y[:, :used] - self._player_y
+        distance = np.hypot(delta_x, delta_y)
+        distance[~alien_shots] = np.inf
+        nearest = np.argmin(distance, axis=1)
+        has_shots = alien_shots.any(axis=1)
+        out[:, 7] = np.where(has_shots, delta_x[rows, nearest], 0)
+        out[:, 8] = np.where(has_shots, delta_y[rows, nearest], 0)
+        count = alien_shots.sum(axis=1)
+        out[:, 9] = live.sum(axis=1) - count
+        out[:, 10] = count
@@ -0,0 +1,49 @@
+"""Pre-rendered sprite surfaces for shapes drawn many times a frame."""
+
+import pygame
+
+# Circle surfaces keyed by (radius, color).
+_circles = {}
+
+
+def _color_key(color):
+    if isinstance(color, str):
+        return color
+    return tuple(color)
+
+
+def circle(radius, color):
+    """Return a colorkeyed surface holding a filled circle.
+
+    The circle is rasterized once per radius and color; the returned
+    surface is shared and must not be modified.
+    """
+    radius = int(round(radius))
+    key = (radius, _color_key(color))
+    image = _circles.get(key)
+    if image is None:
+        image = pygame.Surface((2 * radius, 2 * radius))
+        background = (255, 0, 255)
+        if pygame.Color(color)[:3] == background:
+            background = (0, 0, 0)
+        image.fill(background)
+        pygame.draw.circle(image, color, (radius, radius), radius)
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        image.set_colorkey(background, pygame.RLEACCEL)
+        _circles[key] = image
+    return image
+
+
+def circle_blits(items):
+    """Return a Surface.blits sequence for (x, y, radius, color) circles."""
+    sequence = []
+    append = sequence.append
+    for (center_x, center_y, radius, color) in items:
+        append((circle(radius, color), (center_x - radius, center_y - radius)))
+    return sequence
+
+
+def clear_cache():
+    """Drop every pre-rendered surface."""
+    _circles.clear()
@@ -0,0 +1,340 @@
+"""NumPy backed storage for large alien formations."""
+
+import itertools
+import random
+import numpy as np
+import pygame
+import player
+import rgbcolors
+import sprites
+
+
+def circle_hits(center_x, center_y, radius, point_x, point_y, offset_x, offset_y,
+                pad=0):
+    """Return whether each screen point lies in each circle grown by pad;
+    circles are relative to the offset and the arguments broadcast."""
+    delta_x = center_x - (point_x - offset_x)
+    delta_y = center_y - (point_y - offset_y)
+    reach = radius + pad
+    return delta_x * delta_x + delta_y * delta_y <= reach * reach
+
+
+def extent_of(x, y, radius):
+    """Return the (left, top, width, height) bounding a set of circles."""
+    left = float((x - radius).min())
+    top = float((y - radius).min())
+    right = float((x + radius).max())
+    bottom = float((y + radius).max())
+    return (left, top, right - left, bottom - top)
+
+
+def front_line_of(indices, y, column):
+    """Return which of indices is the lowest alien in each column,
+    ordered by column."""
+    # Sort by column, then by y, so the last entry of each column run is
+    # the lowest alien in that column.
+    order = indices[np.lexsort((y[indices], column[indices]))]
+    columns = column[order]
+    last = np.ones(len(order), dtype=np.bool_)
+    last[:-1] = columns[:-1] != columns[1:]
+    return order[last]
+
+
+def shot_gap(rng, rate, alive_count):
+    """Return the milliseconds until a formation of alive_count aliens,
+    each firing rate shots per millisecond, fires next."""
+    return rng.expovariate(rate * alive_count)
+
+
+def due_shots(rng, rate, alive_count, next_shot, clock):
+    """Return (shots, next_shot): how many shots scheduled from next_shot
+    on are due by clock, and when the one after them is."""
+    shots = 0
+    while next_shot <= clock:
+        shots += 1
+        next_shot += shot_gap(rng, rate, alive_count)
+    return (shots, next_shot)
+
+
+def choose_shooter(rng, count):
+    """Return which of count candidate shooters fires."""
+    return rng.randrange(count)
+
+
+class AlienSwarm:
+    """Structure-of-arrays storage for every alien in a formation.
+
+    Positions are stored relative to a player.Formation, so moving the
+    swarm only moves the formation; screen positions are computed for the
+    whole swarm at once when they are needed.
+    """
+
+    def __init__(self, formation, palette=(rgbcolors.red,)):
+        self._formation = formation
+        self._palette = list(palette)
+        self._x = np.empty(0, dtype=np.float64)
+        self._y = np.empty(0, dtype=np.float64)
+        self._radius = np.empty(0, dtype=np.float64)
+        self._alive = np.empty(0, dtype=np.bool_)
+        self._color = np.empty(0, dtype=np.uint8)
+        self._column = np.empty(0, dtype=np.int32)
+        self._alive_count = 0
+        self._front_line = None
+
+    @property
+    def formation(self):
+        """Return the formation the swarm moves with."""
+        return self._formation
+
+    @property
+    def palette(self):
+        """Return the colors indexed by the color array."""
+        return self._palette
+
+    @property
+    def local_x(self):
+        """Return the x coordinates relative to the formation."""
+        return self._x
+
+    @property
+    def local_y(self):
+        """Return the y coordinates relative to the formation."""
+        return self._y
+
+    @property
+    def radius(self):
+        """Return the radius of every alien."""
+        return self._radius
+
+    @property
+    def alive(self):
+        """Return the alive mask."""
+        return self._alive
+
+    @property
+    def color_index(self):
+        """Return the palette index of every alien."""
+        return self._color
+
+    @property
+    def column(self):
+        """Return the formation column of every alien."""
+        return self._column
+
+    def __len__(self):
+        """Return the number of living aliens."""
+        return self._alive_count
+
+    @property
+    def capacity(self):
+        """Return the number of slots, living or dead."""
+        return len(self._alive)
+
+    def add_grid(self, num_rows, aliens_per_row, step, radius, color_index=0):
+        """Add a rectangular block of aliens spaced step apart."""
+        (rows, columns) = np.mgrid[0:num_rows, 0:aliens_per_row]
+        count = num_rows * aliens_per_row
+        self._x = np.concatenate((self._x, step + columns.ravel() * step))
+        self._y = np.concatenate((self._y, step + rows.ravel() * step))
+        self._radius = np.concatenate((self._radius, np.full(count, radius,
+                                                             dtype=np.float64)))
+        self._alive = np.concatenate((self._alive, np.ones(count, dtype=np.bool_)))
+        self._color = np.concatenate((self._color, np.full(count, color_index,
+                                                           dtype=np.uint8)))
+        self._column = np.concatenate((self._column,
+                                       columns.ravel().astype(np.int32)))
+        self._alive_count += count
+        self._front_line = None
+        self.update_extent()
+
+    def positions(self, alpha=None):
+        """Return the screen x and y arrays of the living aliens.
+
+        With alpha, positions are interpolated between the formation's
+        last two updates for drawing.
+        """
+        if alpha is None:
+            offset = self._formation.offset
+        else:
+            offset = self._formation.interpolated_offset(alpha)
+        alive = self._alive
+        return (self._x[alive] + offset.x, self._y[alive] + offset.y)
+
+    def move(self, delta_x, delta_y, mask=None):
+        """Move aliens relative to the formation; all of them if mask is None."""
+        if mask is None:
+            self._x += delta_x
+            self._y += delta_y
+        else:
+            self._x[mask] += delta_x
+            self._y[mask] += delta_y
+        self.update_extent()
+
+    def position(self, index):
+        """Return the screen position of one alien."""
+        offset = self._formation.offset
+        return (float(self._x[index]) + offset.x, float(self._y[index]) + offset.y)
+
+    def local_rect(self, index):
+        """Return the bounding rect of one alien relative to the formation."""
+        radius = self._radius[index]
+        return pygame.Rect(self._x[index] - radius, self._y[index] - radius,
+                           2 * radius, 2 * radius)
+
+    def hit_test(self, point_x, point_y, pad=0, candidates=None):
+        """Return the index of the first living alien whose circle, grown by
+        pad, contains the screen point; -1 if there is none."""
+        offset = self._formation.offset
+        if candidates is None:
+            indices = np.flatnonzero(self._alive)
+        else:
+            indices = np.asarray(candidates, dtype=np.intp)
+            indices = indices[self._alive[indices]]
+        if not len(indices):
+            return -1
+        hits = np.flatnonzero(circle_hits(self._x[indices], self._y[indices],
+                                          self._radius[indices], point_x, point_y,
+                                          offset.x, offset.y, pad))
+        if not len(hits):
+            return -1
+        return int(indices[hits[0]])
+
+    def kill(self, index):
+        """Mark an alien as dead."""
+        if self._alive[index]:
+            self._alive[index] = False
+            self._alive_count -= 1
+            self._front_line = None
+            self.update_extent()
+
+    def alien(self, index):
+        """Return a standalone player.Alien at the alien's screen position."""
+        offset = self._formation.offset
+        return player.Alien(self._x[index] + offset.x,
+                            self._y[index] + offset.y,
+                            self._radius[index],
+                            self._palette[self._color[index]],
+                            str(index))
+
+    def should_compact(self):
+        """Return True when at least half of the slots hold dead aliens."""
+        return self.capacity and self._alive_count * 2 <= self.capacity
+
+    def compact(self):
+        """Drop dead aliens; return the array mapping new index to old."""
+        keep = np.flatnonzero(self._alive)
+        self._x = self._x[keep]
+        self._y = self._y[keep]
+        self._radius = self._radius[keep]
+        self._alive = self._alive[keep]
+        self._color = self._color[keep]
+        self._column = self._column[keep]
+        self._front_line = None
+        return keep
+
+    def front_line(self):
+        """Return the indices of the lowest living alien in each column.
+
+        The result is cached until an alien dies or the swarm changes.
+        """
+        if self._front_line is None:
+            self._front_line = front_line_of(np.flatnonzero(self._alive),
+                                             self._y, self._column)
+        return self._front_line
+
+    def hit_mask(self, points_x, points_y, pad=0):
+        """Return whether each screen point lies in some living alien's
+        circle grown by pad, testing every pair at once."""
+        offset = self._formation.offset
+        alive = self._alive
+        return circle_hits(self._x[alive], self._y[alive], self._radius[alive],
+                           points_x[:, np.newaxis], points_y[:, np.newaxis],
+                           offset.x, offset.y, pad).any(axis=1)
+
+    def update_extent(self):
+        """Tell the formation the bounding rect of the living aliens."""
+        if not self._alive_count:
+            return
+        alive = self._alive
+        self._formation.set_extent(extent_of(self._x[alive], self._y[alive],
+                                             self._radius[alive]))
+
+    def lowest(self):
+        """Return the largest screen y of any living alien's center."""
+        if not self._alive_count:
+            return None
+        return float(self._y[self._alive].max()) + self._formation.offset.y
+
+    def __iter__(self):
+        """Yield (x, y, radius, color) for each living alien."""
+        return self.items()
+
+    def items(self, alpha=None):
+        """Yield (x, y, radius, color) for each living alien, optionally
+        at the interpolated position."""
+        (x, y) = self.positions(alpha)
+        radius = self._radius[self._alive]
+        colors = self._color[self._alive]
+        palette = self._palette
+        for (center_x, center_y, rad, color) in zip(x.tolist(), y.tolist(),
+                                                    radius.tolist(),
+                                                    colors.tolist()):
+            yield (center_x, center_y, rad, palette[color])
+
+    def blit_sequence(self, alpha=None):
+        """Return a Surface.blits sequence drawing every living alien from
+        pre-rendered circles.
+
+        Aliens are grouped by radius and color so the sequence is built
+        with zip() rather than a Python loop per alien.
+        """
+        (x, y) = self.positions(alpha)
+        alive = self._alive
+        radius = self._radius[alive]
+        colors = self._color[alive]
+        left = x - radius
+        top = y - radius
+        sequence = []
+        for color in np.unique(colors).tolist():
+            same_color = colors == color
+            for rad in np.unique(radius[same_color]).tolist():
+                group = same_color & (radius == rad)
+                image = sprites.circle(rad, self._palette[color])
+                sequence.extend(zip(itertools.repeat(image),
+                                    zip(left[group].tolist(), top[group].tolist())))
+        return sequence
+
+
+class FireScheduler:
+    """Schedule alien shots for a whole formation from a seeded RNG.
+
+    Each living alien fires at rate shots per millisecond on average, so
+    the formation fires as a Poisson process at rate times the number of
+    living aliens. Instead of rolling dice for every alien on every
+    frame, the time until the next shot is drawn from the matching
+    exponential distribution.
+    """
+
+    def __init__(self, rate, seed=None):
+        self._rate = rate
+        self._rng = random.Random(seed)
+        self._clock = 0.0
+        self._next_shot = None
+
+    def update(self, delta_time, alive_count):
+        """Advance by delta_time milliseconds; return the number of shots due."""
+        if not alive_count or self._rate <= 0:
+            self._clock += delta_time
+            self._next_shot = None
+            return 0
+        if self._next_shot is None:
+            self._next_shot = self._clock + shot_gap(self._rng, self._rate,
+                                                     alive_count)
+        self._clock += delta_time
+        (shots, self._next_shot) = due_shots(self._rng, self._rate, alive_count,
+                                             self._next_shot, self._clock)
+        return shots
+
+    def choose(self, count):
+        """Return which of count candidate shooters fires."""
+        return choose_shooter(self._rng, count)
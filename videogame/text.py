@@ -0,0 +1,116 @@
+"""Cached text rendering for the scenes."""
+
+import collections
+import pygame
+import fonts
+
+
+def _color_key(color):
+    """Return a hashable key for a color given as a name, tuple or Color."""
+    if color is None or isinstance(color, str):
+        return color
+    return tuple(color)
+
+
+class TextCache:
+    """Memoize rendered text surfaces, evicting the least recently used.
+
+    Surfaces are keyed by (font, size, string, fg, bg, antialias), so
+    rendering the same text again is a dictionary lookup. Returned
+    surfaces are shared and must not be modified.
+    """
+
+    def __init__(self, max_entries=256, registry=None):
+        self._max_entries = max_entries
+        # None uses fonts.default_registry(), looked up on first use.
+        self._registry = registry
+        self._surfaces = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def font(self, name, size):
+        """Return the shared Font for a family name and size."""
+        if self._registry is None:
+            self._registry = fonts.default_registry()
+        return self._registry.font(name, size)
+
+    def render(self, name, size, string, fg, bg=None, antialias=True):
+        """Return the surface for string rendered in the named font."""
+        key = (name, size, string, _color_key(fg), _color_key(bg), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self._hits += 1
+            return surface
+        self._misses += 1
+        surface = self.font(name, size).render(string, antialias, fg, bg)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self._max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def info(self):
+        """Return the number of cached surfaces, hits and misses."""
+        return {'entries': len(self._surfaces), 'hits': self._hits,
+                'misses': self._misses}
+
+    def clear(self):
+        """Drop every cached surface."""
+        self._surfaces.clear()
+
+
+default_cache = TextCache()
+
+
+def render(name, size, string, fg, bg=None, antialias=True):
+    """Render text through the shared TextCache."""
+    return default_cache.render(name, size, string, fg, bg, antialias)
+
+
+class HudLabel:
+    """A line of text bound to a value, re-rendered only when it changes.
+
+    getter is called every frame; the text is only rendered again, through
+    the TextCache, when the formatted value differs from the last one.
+    """
+
+    def __init__(self, position, getter, name, size, fg, bg=None,
+                 fmt='{}', cache=None):
+        self._position = position
+        self._getter = getter
+        self._name = name
+        self._size = size
+        self._fg = fg
+        self._bg = bg
+        self._fmt = fmt
+        self._cache = cache if cache is not None else default_cache
+        self._string = None
+        self._surface = None
+        self._rect = pygame.Rect(position, (0, 0))
+
+    @property
+    def rect(self):
+        """Return the area the label covers."""
+        return self._rect
+
+    def update(self):
+        """Re-render if the value changed; return True if it did."""
+        string = self._fmt.format(self._getter())
+        if string == self._string:
+            return False
+        self._string = string
+        self._surface = self._cache.render(self._name, self._size, string,
+                                           self._fg, self._bg)
+        return True
+
+    def draw(self, screen, background):
+        """Draw the label; return the changed area, or None if unchanged."""
+        changed = self.update()
+        if changed:
+            old_rect = self._rect
+            screen.blit(background, old_rect, old_rect)
+            self._rect = self._surface.get_rect(topleft=self._position)
+        screen.blit(self._surface, self._rect)
+        if changed:
+            return old_rect.union(self._rect)
+        return None